@@ -0,0 +1 @@
+"""Benchmarks reproducibles y sin red para Lazarus."""
@@ -0,0 +1,58 @@
+"""Comparar dos resultados de ``benchmarks.run``.
+
+Uso::
+
+    uv run python -m benchmarks.compare base.json nuevo.json --threshold 0.1
+
+Muestra la variación de p50/p95 por medición y termina con código 1 si
+alguna empeora más que ``--threshold`` (fracción).
+"""
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, Tuple
+
+METRICS = ("p50_ms", "p95_ms", "batch_ms")
+
+
+def _key(entry: Dict[str, Any]) -> Tuple[Any, ...]:
+    return (entry["name"], entry["size"], entry.get("scenario"), entry.get("pipeline_mode"))
+
+
+def load(path: str) -> Dict[Tuple[Any, ...], Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        report = json.load(handle)
+    return {_key(entry): entry for entry in report["results"]}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Comparar resultados de benchmarks")
+    parser.add_argument("base")
+    parser.add_argument("new")
+    parser.add_argument("--threshold", type=float, default=0.1,
+                        help="Empeoramiento relativo que cuenta como regresión")
+    args = parser.parse_args()
+
+    base, new = load(args.base), load(args.new)
+    regressions = 0
+    for key in sorted(base.keys() & new.keys(), key=str):
+        label = "/".join(str(part) for part in key if part is not None)
+        for metric in METRICS:
+            before, after = base[key].get(metric), new[key].get(metric)
+            if not before or after is None:
+                continue
+            change = (after - before) / before
+            flag = ""
+            if change > args.threshold:
+                flag = "  REGRESION"
+                regressions += 1
+            print(f"{label:<40} {metric:<8} {before:10.3f} -> {after:10.3f} ({change:+.1%}){flag}")
+
+    for key in sorted(base.keys() ^ new.keys(), key=str):
+        print(f"solo en {'base' if key in base else 'nuevo'}: {key}")
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""Corpus sintéticos de FAQ con el esquema de ``faq_limpio.csv``.
+
+La generación es determinista para una semilla dada, de modo que dos
+ejecuciones del benchmark en commits distintos usan exactamente los mismos
+datos y consultas.
+"""
+
+import csv
+import random
+from typing import List, Tuple
+
+COLUMNS = [
+    "pregunta",
+    "respuesta",
+    "categoria",
+    "limpiar",
+    "razon_para_la_limpieza_(escenario_de_practica)",
+]
+
+CATEGORIES = ["Productos", "Servicios", "Contacto", "Ubicaciones", "Biblioteca", "Testimonios"]
+
+INTERROGATIVES = [
+    "¿Qué es", "¿Cómo se aplica", "¿Dónde puedo comprar", "¿Cuánto cuesta",
+    "¿Para qué sirve", "¿Cuál es la garantía de", "¿Tienen disponible",
+    "¿Qué rendimiento tiene", "¿Cómo se almacena", "¿Quién distribuye",
+]
+
+NOUNS = [
+    "impermeabilizante", "aditivo", "sellador", "mortero", "adhesivo",
+    "pintura", "membrana", "resina", "cemento", "epóxico", "acelerante",
+    "desmoldante", "curador", "plastificante", "revestimiento", "primer",
+]
+
+QUALIFIERS = [
+    "para techos", "para pisos", "de alto desempeño", "en clima húmedo",
+    "para concreto", "de secado rápido", "para exteriores", "industrial",
+    "para piscinas", "acrílico", "elastomérico", "para fachadas",
+]
+
+ANSWER_PHRASES = [
+    "Se aplica con brocha o rodillo en dos capas.",
+    "Está disponible en todas nuestras sucursales.",
+    "Tiene una garantía de cinco años.",
+    "Rinde aproximadamente diez metros cuadrados por galón.",
+    "Debe almacenarse en un lugar fresco y seco.",
+    "Nuestro equipo técnico puede asesorarle sin costo.",
+    "Es compatible con superficies de concreto y mampostería.",
+]
+
+GREETINGS = ["hola", "buenas", "saludos", "qué tal", "buen día", "hey", "adiós", "gracias", "chao"]
+
+ADDRESSEES = ["equipo", "amigos", "Lazarus", "soporte", "asesor", "señorita", "joven", "a todos"]
+
+OUT_OF_DOMAIN = [
+    "receta de pastel de chocolate", "resultado del partido de ayer",
+    "clima en Tegucigalpa mañana", "precio del bitcoin",
+    "horóscopo de la semana", "mejor película del año",
+]
+
+
+def faq_question(index: int, rng: random.Random) -> str:
+    # El código de producto garantiza preguntas distintas para cualquier tamaño
+    return (
+        f"{rng.choice(INTERROGATIVES)} el {rng.choice(NOUNS)} "
+        f"{rng.choice(QUALIFIERS)} LZ-{index}?"
+    )
+
+
+def generate_rows(size: int, seed: int = 0) -> List[List[str]]:
+    """Filas del corpus sintético (sin encabezado)."""
+    rng = random.Random(seed)
+    rows = []
+    for index in range(size):
+        question = faq_question(index, rng)
+        answer = " ".join(rng.sample(ANSWER_PHRASES, 2))
+        rows.append([question, answer, rng.choice(CATEGORIES), "No", "Sintético."])
+    return rows
+
+
+def write_corpus(path: str, size: int, seed: int = 0) -> List[str]:
+    """Escribir un CSV sintético de ``size`` filas y devolver sus preguntas."""
+    rows = generate_rows(size, seed)
+    with open(path, "w", newline="", encoding="utf-8") as handle:
+        writer = csv.writer(handle)
+        writer.writerow(COLUMNS)
+        writer.writerows(rows)
+    return [row[0] for row in rows]
+
+
+def small_talk_lexicon(size: int, seed: int = 0) -> Tuple[List[str], List[str]]:
+    """Léxico sintético de small talk: ``size`` frases y ``size // 10`` prefijos."""
+    rng = random.Random(seed + 2)
+    phrases = [
+        f"{rng.choice(GREETINGS)} {rng.choice(ADDRESSEES)} {index}" for index in range(size)
+    ]
+    prefixes = [f"{rng.choice(GREETINGS)}{index}" for index in range(size // 10)]
+    return phrases, prefixes
+
+
+def _perturb(question: str, rng: random.Random) -> str:
+    """Variante de una pregunta como la escribiría un usuario."""
+    words = question.strip("¿?").split()
+    roll = rng.random()
+    if roll < 0.3 and len(words) > 3:
+        del words[rng.randrange(len(words))]
+    elif roll < 0.6:
+        words = [word.lower() for word in words]
+    elif roll < 0.8 and len(words) > 2:
+        position = rng.randrange(len(words) - 1)
+        words[position], words[position + 1] = words[position + 1], words[position]
+    return " ".join(words)
+
+
+def generate_queries(
+    questions: List[str],
+    count: int,
+    seed: int = 0,
+    out_of_domain_rate: float = 0.2,
+) -> List[str]:
+    """Consultas de prueba: variantes de preguntas del corpus y algunas ajenas a él."""
+    rng = random.Random(seed + 1)
+    queries = []
+    for _ in range(count):
+        if rng.random() < out_of_domain_rate:
+            queries.append(f"{rng.choice(OUT_OF_DOMAIN)} {rng.randrange(10**6)}")
+        else:
+            queries.append(_perturb(rng.choice(questions), rng))
+    return queries
@@ -0,0 +1,189 @@
+"""Modelo de lenguaje local y determinista para los benchmarks.
+
+Responde con todos los campos de salida de las firmas del chatbot en el
+formato de ``ChatAdapter``, o en JSON cuando DSPy reintenta con
+``JSONAdapter`` (los campos que una firma no usa se ignoran). Puede inyectar
+latencia y errores del proveedor sin salir a la red y reporta un uso de
+tokens aproximado (caracteres / 4).
+
+El error se decide por solicitud: si una llamada falla, el reintento con
+``JSONAdapter`` que DSPy hace dentro de la misma solicitud falla igual, como
+con un proveedor caído. Sin esto la mitad de los errores se enmascaraban.
+"""
+
+import asyncio
+import contextvars
+import json
+import random
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import dspy
+from litellm import ModelResponse, ModelResponseStream
+from litellm.types.utils import Delta, StreamingChoices
+
+
+class RateLimitError(Exception):
+    """Error 429 simulado."""
+
+
+class Timeout(TimeoutError):
+    """Timeout simulado del proveedor."""
+
+
+class AuthenticationError(Exception):
+    """Error 401 simulado."""
+
+
+# Mensajes que reconoce ``categorize_llm_error``; los nombres de tipo coinciden
+# con los de litellm para ``classify_llm_exception``
+ERRORS = {
+    "rate_limit": (RateLimitError, "429 rate limit exceeded (fake LM)"),
+    "timeout": (Timeout, "Request timed out (fake LM)"),
+    "auth": (AuthenticationError, "401 unauthorized: invalid api key (fake LM)"),
+}
+
+JSON_REQUEST_MARKER = "Respond with a JSON object"
+
+# Error de la última llamada fallida del contexto actual (hilo o tarea), que
+# el reintento de DSPy con JSONAdapter debe repetir
+_failed_request: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "fake_lm_failed_request", default=False)
+
+
+class FakeLM(dspy.BaseLM):
+    """LM sintético con latencia configurable e inyección de errores.
+
+    Args:
+        latency: Segundos de cada respuesta
+        jitter: Variación uniforme máxima (+/-) sobre ``latency``
+        error_rate: Probabilidad de fallar en cada llamada
+        error_kind: ``rate_limit``, ``timeout`` o ``auth``
+        timeout_delay: Segundos antes de un timeout (por defecto ``latency``)
+        transfer_rate: Probabilidad de recomendar transferencia
+        seed: Semilla de las decisiones aleatorias
+        chunk_size: Caracteres por fragmento cuando DSPy pide streaming
+        chunk_delay: Segundos entre fragmentos
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        error_kind: str = "rate_limit",
+        timeout_delay: Optional[float] = None,
+        transfer_rate: float = 0.0,
+        seed: int = 0,
+        chunk_size: int = 8,
+        chunk_delay: float = 0.0,
+    ) -> None:
+        if error_kind not in ERRORS:
+            raise ValueError(f"error_kind invalido: {error_kind!r} (opciones: {', '.join(ERRORS)})")
+        super().__init__(model="fake/benchmark", cache=False)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_kind = error_kind
+        self.timeout_delay = latency if timeout_delay is None else timeout_delay
+        self.transfer_rate = transfer_rate
+        self.chunk_size = chunk_size
+        self.chunk_delay = chunk_delay
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {"calls": 0, "errors": 0}
+
+    def _plan(self, request: str) -> Dict[str, Any]:
+        """Decidir de forma reproducible la latencia y el resultado de una llamada."""
+        # El reintento con JSONAdapter es la misma solicitud: repite el fallo
+        retry_of_failure = JSON_REQUEST_MARKER in request and _failed_request.get()
+        with self._lock:
+            self.counters["calls"] += 1
+            fails = self._rng.random() < self.error_rate
+            transfer = self._rng.random() < self.transfer_rate
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+            if retry_of_failure:
+                fails = True
+            elif fails:
+                self.counters["errors"] += 1
+        _failed_request.set(fails and not retry_of_failure)
+        if fails and self.error_kind == "timeout":
+            delay = self.timeout_delay
+        return {"delay": max(delay, 0.0), "fails": fails, "transfer": transfer}
+
+    @staticmethod
+    def _fields(plan: Dict[str, Any]) -> Dict[str, str]:
+        return {
+            "reasoning": "La pregunta coincide con la informacion recuperada.",
+            "saludo_y_reconocimiento": "Hola, gracias por escribirnos.",
+            "respuesta_directa": "Segun nuestra base de conocimientos, el producto esta disponible.",
+            "proxima_accion_sugerida": "Si necesita mas detalles, nuestro equipo puede ayudarle.",
+            "should_transfer": "si" if plan["transfer"] else "no",
+            "reason": "Caso complejo" if plan["transfer"] else "Respuesta suficiente",
+        }
+
+    @staticmethod
+    def _request_text(prompt: Optional[str], messages: Optional[List[Dict[str, Any]]]) -> str:
+        messages = messages or [{"role": "user", "content": prompt or ""}]
+        return "\n".join(str(message.get("content", "")) for message in messages)
+
+    def _respond(self, plan: Dict[str, Any], request: str) -> ModelResponse:
+        if plan["fails"]:
+            error_type, message = ERRORS[self.error_kind]
+            raise error_type(message)
+
+        fields = self._fields(plan)
+        if JSON_REQUEST_MARKER in request:
+            text = json.dumps(fields, ensure_ascii=False)
+        else:
+            text = "\n\n".join(
+                f"[[ ## {name} ## ]]\n{value}" for name, value in fields.items()
+            ) + "\n\n[[ ## completed ## ]]"
+
+        prompt_tokens = len(request) // 4
+        completion_tokens = len(text) // 4
+        response = ModelResponse(
+            model=self.model,
+            choices=[{"message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+            usage={
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        )
+        # Como ``dspy.LM``: el uso llega a ``track_usage`` (BaseLM no lo reporta)
+        if dspy.settings.usage_tracker:
+            dspy.settings.usage_tracker.add_usage(self.model, dict(response.usage))
+        return response
+
+    def forward(self, prompt=None, messages=None, **kwargs):
+        request = self._request_text(prompt, messages)
+        plan = self._plan(request)
+        time.sleep(plan["delay"])
+        return self._respond(plan, request)
+
+    async def _send_chunks(self, response: ModelResponse) -> None:
+        """Emitir el texto por fragmentos, como ``dspy.LM`` bajo ``dspy.streamify``."""
+        caller = dspy.settings.caller_predict
+        text = response.choices[0].message.content
+        for start in range(0, len(text), self.chunk_size):
+            if start:
+                await asyncio.sleep(self.chunk_delay)
+            chunk = ModelResponseStream(
+                model=self.model,
+                choices=[StreamingChoices(delta=Delta(content=text[start:start + self.chunk_size]))],
+            )
+            if caller is not None:
+                # Los StreamListener identifican el predictor por este id
+                chunk.predict_id = id(caller)
+            await dspy.settings.send_stream.send(chunk)
+
+    async def aforward(self, prompt=None, messages=None, **kwargs):
+        request = self._request_text(prompt, messages)
+        plan = self._plan(request)
+        await asyncio.sleep(plan["delay"])
+        response = self._respond(plan, request)
+        if dspy.settings.send_stream is not None:
+            await self._send_chunks(response)
+        return response
@@ -0,0 +1,290 @@
+"""Benchmark sin red de la base de conocimientos y del chatbot.
+
+Uso::
+
+    uv run python -m benchmarks.run --sizes 100 1000 10000 --output resultados.json
+
+Mide la carga (CSV y snapshot), ``search``, ``search_many`` y
+``FAQRetriever.forward`` sobre corpus sintéticos, la detección de small talk
+con léxicos de distintos tamaños, ``LazarusChatbot.answer``
+de punta a punta con ``FakeLM`` en varios escenarios de error y el arranque
+en frío en modo solo FAQ (``benchmarks.startup``). El resultado
+es JSON para comparar commits con ``benchmarks.compare``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import dspy
+from lazarus_core import LazarusChatbot
+from lazarus_core.constants import SMALL_TALK_PHRASES, SMALL_TALK_PREFIXES
+from lazarus_core.handoff import HandoffQueue, HandoffSink
+from lazarus_core.logs import configure_logging
+from lazarus_core.retriever import FAQRetriever
+from lazarus_core.small_talk import DEFAULT_SMALL_TALK, SmallTalkMatcher
+from lazarus_kb import FAQKnowledgeBase
+
+from .corpus import generate_queries, generate_rows, small_talk_lexicon, write_corpus
+from .fake_lm import ERRORS, FakeLM
+from .startup import measure_startup
+
+SCENARIOS = ["ok", *ERRORS]
+
+
+class NullHandoffSink(HandoffSink):
+    """Descarta las transferencias para no medir escrituras a disco."""
+
+    def write_batch(self, records) -> None:
+        pass
+
+
+def summarize(samples: List[float], total: Optional[float] = None) -> Dict[str, Any]:
+    """Percentiles en milisegundos y throughput por segundo de una serie de tiempos."""
+    ordered = sorted(samples)
+    count = len(ordered)
+
+    def percentile(fraction: float) -> float:
+        return ordered[min(count - 1, int(round(fraction * (count - 1))))] * 1000
+
+    elapsed = total if total is not None else sum(ordered)
+    return {
+        "count": count,
+        "mean_ms": statistics.fmean(ordered) * 1000,
+        "p50_ms": percentile(0.50),
+        "p90_ms": percentile(0.90),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+        "max_ms": ordered[-1] * 1000,
+        "throughput_per_s": count / elapsed if elapsed > 0 else None,
+    }
+
+
+def time_each(fn: Callable[[Any], Any], items: Iterable[Any]) -> List[float]:
+    samples = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        samples.append(time.perf_counter() - started)
+    return samples
+
+
+def record(results: List[Dict[str, Any]], name: str, size: int,
+           samples: List[float], **extra: Any) -> None:
+    results.append({"name": name, "size": size, **summarize(samples), **extra})
+    entry = results[-1]
+    print(
+        f"{name:<24} n={size:<7} p50={entry['p50_ms']:9.3f}ms "
+        f"p95={entry['p95_ms']:9.3f}ms p99={entry['p99_ms']:9.3f}ms",
+        file=sys.stderr,
+    )
+
+
+def bench_retrieval(results: List[Dict[str, Any]], workdir: str, size: int,
+                    args: argparse.Namespace) -> None:
+    csv_path = os.path.join(workdir, f"faq_{size}.csv")
+    questions = write_corpus(csv_path, size, seed=args.seed)
+    queries = generate_queries(questions, args.queries, seed=args.seed)
+
+    samples = time_each(
+        lambda _: FAQKnowledgeBase(csv_path, use_snapshot=False), range(args.repeat))
+    record(results, "kb.load_data", size, samples)
+
+    snapshot_path = csv_path + FAQKnowledgeBase.SNAPSHOT_SUFFIX
+    FAQKnowledgeBase(csv_path, snapshot_path=snapshot_path)
+    samples = time_each(
+        lambda _: FAQKnowledgeBase(csv_path, snapshot_path=snapshot_path), range(args.repeat))
+    record(results, "kb.load_snapshot", size, samples)
+
+    # Instancias nuevas: la cache de top-k no debe favorecer a la medición siguiente
+    kb = FAQKnowledgeBase(csv_path, use_snapshot=False)
+    samples = time_each(kb.search, queries)
+    record(results, "kb.search", size, samples)
+
+    kb = FAQKnowledgeBase(csv_path, use_snapshot=False)
+    try:
+        started = time.perf_counter()
+        kb.search_many(queries)
+        elapsed = time.perf_counter() - started
+    except ImportError:
+        print("kb.search_many omitido: falta el extra lazarus-kb[batch]", file=sys.stderr)
+    else:
+        # Una sola medición del lote; la latencia por consulta es el promedio
+        results.append({
+            "name": "kb.search_many",
+            "size": size,
+            "count": len(queries),
+            "batch_ms": elapsed * 1000,
+            "throughput_per_s": len(queries) / elapsed if elapsed > 0 else None,
+        })
+
+    kb = FAQKnowledgeBase(csv_path, use_snapshot=False)
+    retriever = FAQRetriever(kb, k=args.retrieval_k)
+    samples = time_each(retriever, queries)
+    record(results, "retriever.forward", size, samples, k=args.retrieval_k)
+
+
+def bench_small_talk(results: List[Dict[str, Any]], args: argparse.Namespace) -> None:
+    """``SmallTalkMatcher.matches`` con el léxico predeterminado y con léxicos
+    grandes: el costo por consulta no debe crecer con el tamaño."""
+    questions = [row[0] for row in generate_rows(1000, seed=args.seed)]
+    queries = generate_queries(questions, args.queries, seed=args.seed)
+    queries += ["hola", "Buenos días", "muchas gracias", "qué tal equipo"] * (args.queries // 4)
+
+    matchers = [DEFAULT_SMALL_TALK]
+    for size in args.small_talk_sizes:
+        matcher = SmallTalkMatcher(SMALL_TALK_PHRASES, SMALL_TALK_PREFIXES)
+        matcher.add(*small_talk_lexicon(size, seed=args.seed))
+        matchers.append(matcher)
+    for matcher in matchers:
+        record(results, "small_talk.matches", len(matcher), time_each(matcher.matches, queries))
+
+
+def bench_answer(results: List[Dict[str, Any]], workdir: str, args: argparse.Namespace) -> None:
+    size = args.e2e_size
+    csv_path = os.path.join(workdir, f"faq_e2e_{size}.csv")
+    questions = write_corpus(csv_path, size, seed=args.seed)
+    queries = generate_queries(questions, args.e2e_questions, seed=args.seed)
+
+    for scenario in args.scenarios:
+        lm = FakeLM(
+            latency=args.lm_latency,
+            jitter=args.lm_jitter,
+            error_rate=0.0 if scenario == "ok" else args.error_rate,
+            error_kind="rate_limit" if scenario == "ok" else scenario,
+            seed=args.seed,
+        )
+        # Se configura como con un proveedor real y luego se sustituye el LM
+        chatbot = LazarusChatbot(
+            api_key="benchmark",
+            model="openai/benchmark",
+            excel_file=csv_path,
+            answer_cache_size=0,
+            semantic_cache_size=0,
+            pipeline_mode=args.pipeline_mode,
+            handoff_queue=HandoffQueue(NullHandoffSink()),
+        )
+        dspy.settings.configure(lm=lm)
+        started = time.perf_counter()
+        responses = []
+        samples = []
+        for query in queries:
+            call_started = time.perf_counter()
+            responses.append(chatbot.answer(query))
+            samples.append(time.perf_counter() - call_started)
+        total = time.perf_counter() - started
+        chatbot.close()
+
+        results.append({
+            "name": "chatbot.answer",
+            "size": size,
+            "scenario": scenario,
+            "pipeline_mode": args.pipeline_mode,
+            **summarize(samples, total),
+            "sources": dict(Counter(response["source"] for response in responses)),
+            "transfers": sum(bool(response["transfer_to_agent"]) for response in responses),
+            "lm_calls": lm.counters["calls"],
+            "lm_errors": lm.counters["errors"],
+            "breaker": chatbot.breaker.snapshot()["state"],
+            "limiter": chatbot.limiter.stats(),
+        })
+        entry = results[-1]
+        print(
+            f"chatbot.answer[{scenario}]".ljust(24)
+            + f" n={size:<7} p50={entry['p50_ms']:9.3f}ms p95={entry['p95_ms']:9.3f}ms "
+            f"fuentes={entry['sources']}",
+            file=sys.stderr,
+        )
+
+
+def bench_startup(results: List[Dict[str, Any]], workdir: str, args: argparse.Namespace) -> None:
+    report = measure_startup(workdir, args.e2e_size or 1000, args.startup_samples, seed=args.seed)
+    # ``p50_ms`` es la mediana del proceso completo, para que ``compare`` la vigile
+    results.append({"name": "startup.faq_only", "size": args.e2e_size or 1000,
+                    "p50_ms": report["process_ms"], **report})
+    print(
+        f"{'startup.faq_only':<24} proceso={report['process_ms']:9.3f}ms "
+        f"import={report['import_ms']:9.3f}ms pesados={report['heavy_modules']}",
+        file=sys.stderr,
+    )
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks sin red del chatbot Lazarus")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000, 100000],
+                        help="Tamaños de corpus para la recuperación")
+    parser.add_argument("--queries", type=int, default=1000, help="Consultas por tamaño")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones de cada carga")
+    parser.add_argument("--retrieval-k", type=int, default=1)
+    parser.add_argument("--small-talk-sizes", type=int, nargs="*", default=[1000, 10000],
+                        help="Tamaños de léxico sintético de small talk (vacío lo omite)")
+    parser.add_argument("--e2e-size", type=int, default=1000,
+                        help="Tamaño del corpus de punta a punta (0 lo omite)")
+    parser.add_argument("--e2e-questions", type=int, default=200)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--pipeline-mode", default="sequential")
+    parser.add_argument("--lm-latency", type=float, default=0.02, help="Segundos por llamada LM")
+    parser.add_argument("--lm-jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.2,
+                        help="Probabilidad de error en los escenarios con fallos")
+    parser.add_argument("--startup-samples", type=int, default=5,
+                        help="Arranques en frío en modo solo FAQ (0 lo omite)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--log-level", default="ERROR",
+                        help="Nivel de los registros de Lazarus durante la medición")
+    parser.add_argument("--output", help="Archivo JSON de salida (por defecto stdout)")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    # Cargas y transferencias registran en INFO/WARNING; no deben pesar en la medición
+    configure_logging(level=args.log_level, fmt="text")
+    results: List[Dict[str, Any]] = []
+
+    with tempfile.TemporaryDirectory(prefix="lazarus-bench-") as workdir:
+        for size in args.sizes:
+            bench_retrieval(results, workdir, size, args)
+        bench_small_talk(results, args)
+        if args.e2e_size > 0:
+            bench_answer(results, workdir, args)
+        if args.startup_samples > 0:
+            bench_startup(results, workdir, args)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "results": results,
+    }
+    payload = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            handle.write(payload + "\n")
+    else:
+        print(payload)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""Arranque en frío del chatbot en modo solo FAQ.
+
+Uso::
+
+    uv run python -m benchmarks.startup --budget 1.0
+
+Cada muestra corre en un intérprete nuevo: importa ``lazarus_core``, crea el
+chatbot sin credenciales de LLM y responde una pregunta. Termina con código 1
+si la mediana supera ``--budget`` segundos o si se cargó alguna dependencia
+pesada (DSPy, litellm, openai, pandas), que solo deben importarse al
+configurar un LLM o al usar el ETL.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, List, Optional
+
+from .corpus import write_corpus
+
+HEAVY_MODULES = ("dspy", "litellm", "openai", "pandas", "numpy")
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+from lazarus_core import LazarusChatbot
+imported = time.perf_counter()
+chatbot = LazarusChatbot(excel_file=sys.argv[1])
+ready = time.perf_counter()
+chatbot.answer(sys.argv[2])
+answered = time.perf_counter()
+chatbot.close()
+print(json.dumps({
+    "import_s": imported - started,
+    "init_s": ready - imported,
+    "first_answer_s": answered - ready,
+    "heavy_modules": [name for name in sys.argv[3].split(",") if name in sys.modules],
+}))
+"""
+
+
+def probe_env() -> Dict[str, str]:
+    """Entorno del proceso hijo: sin credenciales de LLM y con registros mínimos."""
+    env = {key: value for key, value in os.environ.items() if not key.startswith("DSPY_")}
+    env["LAZARUS_LOG_LEVEL"] = "ERROR"
+    return env
+
+
+def run_probe(csv_path: str, question: str) -> Dict[str, Any]:
+    started = time.perf_counter()
+    completed = subprocess.run(
+        [sys.executable, "-c", PROBE, csv_path, question, ",".join(HEAVY_MODULES)],
+        capture_output=True, text=True, check=True, env=probe_env(),
+    )
+    sample = json.loads(completed.stdout.strip().splitlines()[-1])
+    # Incluye el arranque del intérprete: lo que paga un CLI o una función serverless
+    sample["process_s"] = time.perf_counter() - started
+    return sample
+
+
+def measure_startup(workdir: str, size: int, samples: int, seed: int = 0) -> Dict[str, Any]:
+    """Medianas de ``samples`` arranques en frío con un corpus de ``size`` filas."""
+    csv_path = os.path.join(workdir, f"faq_startup_{size}.csv")
+    questions = write_corpus(csv_path, size, seed=seed)
+    # El primer arranque escribe el snapshot; los medidos lo reutilizan
+    run_probe(csv_path, questions[0])
+    runs = [run_probe(csv_path, questions[0]) for _ in range(samples)]
+
+    report: Dict[str, Any] = {"count": samples}
+    for key in ("import_s", "init_s", "first_answer_s", "process_s"):
+        report[key.replace("_s", "_ms")] = statistics.median(run[key] for run in runs) * 1000
+    report["heavy_modules"] = sorted({name for run in runs for name in run["heavy_modules"]})
+    return report
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Arranque en frío del modo solo FAQ")
+    parser.add_argument("--size", type=int, default=1000, help="Filas del corpus")
+    parser.add_argument("--samples", type=int, default=5, help="Procesos medidos")
+    parser.add_argument("--budget", type=float, default=1.0,
+                        help="Segundos máximos para la mediana del proceso completo")
+    parser.add_argument("--seed", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = parse_args(argv)
+    with tempfile.TemporaryDirectory(prefix="lazarus-startup-") as workdir:
+        report = measure_startup(workdir, args.size, args.samples, seed=args.seed)
+    print(json.dumps(report, indent=2))
+
+    failures = []
+    if report["process_ms"] > args.budget * 1000:
+        failures.append(f"arranque de {report['process_ms']:.0f}ms supera {args.budget:.2f}s")
+    if report["heavy_modules"]:
+        failures.append(f"módulos pesados importados: {', '.join(report['heavy_modules'])}")
+    for failure in failures:
+        print(f"FALLO: {failure}", file=sys.stderr)
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""FakeLM: los errores inyectados llegan al chatbot aunque DSPy reintente con JSONAdapter."""
+
+import dspy
+
+from benchmarks.corpus import generate_queries, write_corpus
+from benchmarks.fake_lm import FakeLM
+from benchmarks.run import NullHandoffSink
+from lazarus_core import LazarusChatbot
+from lazarus_core.handoff import HandoffQueue
+from lazarus_core.limiter import LLMLimiter
+from lazarus_core.signatures import CustomerServiceSignature
+
+
+def test_failed_request_also_fails_json_adapter_retry():
+    lm = FakeLM(latency=0.0, error_rate=0.3, error_kind="auth", seed=1)
+    program = dspy.ChainOfThought(CustomerServiceSignature)
+
+    raised = 0
+    with dspy.context(lm=lm):
+        for number in range(40):
+            try:
+                program(question=f"pregunta {number}", retrieved_passages="")
+            except Exception:
+                raised += 1
+
+    assert raised > 0
+    assert raised == lm.counters["errors"]
+
+
+def run_scenario(tmp_path, error_kind: str):
+    csv_path = str(tmp_path / "faq.csv")
+    queries = generate_queries(write_corpus(csv_path, 50), 40)
+    lm = FakeLM(latency=0.0, error_rate=0.2, error_kind=error_kind)
+    chatbot = LazarusChatbot(
+        api_key="test", model="openai/test", excel_file=csv_path,
+        answer_cache_size=0,
+        llm_limiter=LLMLimiter(rate=None, base_delay=0.001, max_delay=0.001),
+        handoff_queue=HandoffQueue(NullHandoffSink()),
+    )
+    dspy.settings.configure(lm=lm)
+    try:
+        responses = [chatbot.answer(query) for query in queries]
+    finally:
+        chatbot.close()
+    return lm, chatbot, responses
+
+
+def test_rate_limit_scenario_retries(tmp_path):
+    lm, chatbot, _ = run_scenario(tmp_path, "rate_limit")
+
+    assert lm.counters["errors"] > 0
+    assert chatbot.limiter.stats()["retries"] > 0
+
+
+def test_auth_scenario_transfers(tmp_path):
+    lm, _, responses = run_scenario(tmp_path, "auth")
+
+    assert lm.counters["errors"] > 0
+    assert sum(response["transfer_to_agent"] for response in responses) > 0
@@ -0,0 +1,119 @@
+"""Loop de asyncio compartido para ejecutar corutinas desde codigo sincrono."""
+
+import asyncio
+import concurrent.futures
+import contextvars
+import queue
+import threading
+from typing import Any, AsyncIterator, Coroutine, Iterator, Optional, Tuple, TypeVar
+
+T = TypeVar("T")
+
+
+class BackgroundLoop:
+    """Loop de asyncio en un hilo daemon, creado al primer uso.
+
+    Las llamadas sincronas (grupos paralelos de ``answer``, ``stream_answer``)
+    ejecutan sus corutinas aqui en vez de crear un hilo y un loop por
+    solicitud, y pueden cancelarlas: cancelar una tarea cancela la llamada
+    LLM en curso y libera su cupo del limitador.
+    """
+
+    def __init__(self, name: str = "lazarus-loop") -> None:
+        self.name = name
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._lock = threading.Lock()
+
+    @property
+    def loop(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                threading.Thread(
+                    target=loop.run_forever, name=self.name, daemon=True).start()
+                self._loop = loop
+            return self._loop
+
+    def submit(
+        self,
+        coro: Coroutine[Any, Any, T],
+        context: Optional[contextvars.Context] = None,
+    ) -> "concurrent.futures.Future[T]":
+        """Programar ``coro`` en el loop con una copia del contexto del llamador.
+
+        El contexto lleva la configuracion de DSPy del hilo que llama. Cancelar
+        el futuro devuelto cancela la tarea.
+        """
+        if context is None:
+            context = contextvars.copy_context()
+        loop = self.loop
+        future: "concurrent.futures.Future[T]" = concurrent.futures.Future()
+
+        def start() -> None:
+            if future.cancelled():
+                coro.close()
+                return
+            task = context.run(loop.create_task, coro)
+
+            def on_done(done: "asyncio.Task[T]") -> None:
+                try:
+                    if done.cancelled():
+                        future.cancel()
+                    elif done.exception() is not None:
+                        future.set_exception(done.exception())
+                    else:
+                        future.set_result(done.result())
+                except concurrent.futures.InvalidStateError:
+                    # El llamador ya cancelo el futuro
+                    pass
+
+            def on_cancel(finished: "concurrent.futures.Future[T]") -> None:
+                if finished.cancelled() and not task.done():
+                    loop.call_soon_threadsafe(task.cancel)
+
+            task.add_done_callback(on_done)
+            future.add_done_callback(on_cancel)
+
+        loop.call_soon_threadsafe(start)
+        return future
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Ejecutar ``coro`` en el loop y esperar su resultado."""
+        return self.submit(coro).result()
+
+    def iterate(self, async_iterator: AsyncIterator[T]) -> Iterator[T]:
+        """Consumir un iterador asincrono desde codigo sincrono.
+
+        Los errores del iterador se relanzan aqui. Cerrar el generador devuelto
+        (o dejar de consumirlo) cancela la tarea y cierra el iterador, lo que
+        libera su cupo del limitador.
+        """
+        items: "queue.Queue[Tuple[bool, Any]]" = queue.Queue()
+
+        async def drain() -> None:
+            try:
+                async for item in async_iterator:
+                    items.put((True, item))
+            finally:
+                aclose = getattr(async_iterator, "aclose", None)
+                if aclose is not None:
+                    await aclose()
+
+        future = self.submit(drain())
+        # La tarea termina despues de encolar su ultimo elemento
+        future.add_done_callback(lambda _: items.put((False, None)))
+        try:
+            while True:
+                more, item = items.get()
+                if not more:
+                    break
+                yield item
+            future.result()
+        finally:
+            future.cancel()
+
+
+# Un solo loop por proceso, compartido por todas las instancias del chatbot
+BACKGROUND_LOOP = BackgroundLoop()
+
+__all__ = ["BACKGROUND_LOOP", "BackgroundLoop"]
@@ -1,24 +1,70 @@
 """Modulo principal del chatbot Lazarus."""
 
+import asyncio
+import contextvars
+import logging
 import os
-from typing import Dict, Optional, Sequence, Tuple
-
-import dspy
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Dict,
+    Generator,
+    Hashable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from lazarus_kb import FAQKnowledgeBase
 
+from .background import BACKGROUND_LOOP
+from .breaker import CircuitBreaker
+from .cache import AnswerCache, SemanticCache
+from .confidence import BAND_DIRECT, ConfidencePolicy, ConfidenceStats
 from .constants import (
     AGENT_CONTEXT_LIMIT,
-    SMALL_TALK_PHRASES,
-    SMALL_TALK_PREFIXES,
+    ANSWER_STREAM_FIELDS,
+    DEFAULT_FAQ_FILE,
+    PIPELINE_MODES,
     TRANSFER_MESSAGES,
 )
+from .errors import categorize_llm_error, classify_llm_exception
+from .handoff import HandoffQueue, SQLiteHandoffSink, handoff_db_path
+from .limiter import LLMLimiter
+from .metrics import NOOP, Instrumentation, MetricsRegistry, timed_stage
 from .retriever import FAQRetriever
-from .signatures import CustomerServiceSignature, TransferDecisionSignature
-from .structures import ChatResult
+from .small_talk import DEFAULT_SMALL_TALK, SmallTalkMatcher
+from .structures import (
+    BatchItem,
+    ChatResult,
+    LLMCall,
+    PipelineOutcome,
+    Retrieval,
+    StreamEvent,
+    TransferRecord,
+)
+
+if TYPE_CHECKING:
+    # DSPy (y con el litellm) se importa en _configure_dspy: el modo solo FAQ no lo carga
+    import dspy
+
+    from .dspy_modules import LazarusModule
+
+logger = logging.getLogger(__name__)
+
+# Paso de un flujo: una llamada LLM, o varias que se ejecutan en paralelo
+FlowStep = Union[LLMCall, Tuple[LLMCall, ...]]
+
+# Flujo de respuesta: produce llamadas LLM pendientes y recibe sus predicciones
+AnswerFlow = Generator[FlowStep, Any, ChatResult]
 
 
-class LazarusChatbot(dspy.Module):
+class LazarusChatbot:
     """Chatbot inteligente para Grupo Lazarus."""
 
     def __init__(
@@ -26,73 +72,156 @@ class LazarusChatbot(dspy.Module):
         api_key: Optional[str] = None,
         model: Optional[str] = None,
         excel_file: Optional[str] = None,
+        retrieval_k: int = 1,
+        auto_reload: bool = False,
+        answer_cache_size: int = 1024,
+        answer_cache_ttl: float = 3600.0,
+        semantic_cache_size: int = 0,
+        semantic_cache_threshold: float = 0.9,
+        pipeline_mode: str = "sequential",
+        direct_answer_threshold: Optional[float] = None,
+        direct_answer_template: Optional[str] = None,
+        llm_limiter: Optional[LLMLimiter] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        handoff_queue: Optional[HandoffQueue] = None,
+        metrics: Optional[Instrumentation] = None,
+        collect_timings: bool = False,
+        small_talk_matcher: Optional[SmallTalkMatcher] = None,
     ) -> None:
-        super().__init__()
+        if pipeline_mode not in PIPELINE_MODES:
+            raise ValueError(
+                f"pipeline_mode invalido: {pipeline_mode!r} (opciones: {', '.join(PIPELINE_MODES)})"
+            )
+        self.pipeline_mode = pipeline_mode
 
         self.api_key = api_key or os.getenv("DSPY_API_KEY")
         self.model = model or os.getenv("DSPY_MODEL")
         self.api_base = os.getenv("DSPY_API_BASE")
 
         if not self.api_key or not self.model:
-            print(
-                "Advertencia: No se proporcionaron clave API o modelo. Establezca las variables de entorno DSPY_API_KEY y DSPY_MODEL."
+            logger.warning(
+                "No se proporcionaron clave API o modelo. Establezca las variables de "
+                "entorno DSPY_API_KEY y DSPY_MODEL. Ejecutandose en modo demo con "
+                "funcionalidad limitada.",
+                extra={"event": "config_missing"},
             )
-            print("Ejecutandose en modo demo con funcionalidad limitada.")
 
         if excel_file is None:
-            excel_file = "./data_limpia/faq_limpio.csv"
+            excel_file = DEFAULT_FAQ_FILE
 
-        self.kb = FAQKnowledgeBase(excel_file)
-        self.retriever = FAQRetriever(self.kb)
+        self.kb = FAQKnowledgeBase(excel_file, auto_reload=auto_reload)
+        self.retriever = FAQRetriever(self.kb, k=retrieval_k)
+        self.answer_cache = AnswerCache(
+            max_size=answer_cache_size, ttl=answer_cache_ttl)
+        self.semantic_cache = SemanticCache(
+            max_size=semantic_cache_size,
+            threshold=semantic_cache_threshold,
+            ttl=answer_cache_ttl,
+        )
+        self.confidence = ConfidencePolicy(
+            direct_threshold=direct_answer_threshold,
+            template=direct_answer_template,
+        )
+        self.confidence_stats = ConfidenceStats()
+        # Se puede compartir un mismo limitador entre varias instancias del chatbot
+        self.limiter = llm_limiter or LLMLimiter()
+        # Abierto: las solicitudes se responden en modo solo FAQ sin llamar al LLM
+        self.breaker = circuit_breaker or CircuitBreaker()
+        # Las transferencias se encolan y se escriben en segundo plano (SQLite junto al CSV)
+        self.handoff = handoff_queue or HandoffQueue(
+            SQLiteHandoffSink(handoff_db_path(excel_file)))
+        # Lexico de small talk: el predeterminado, o el de LAZARUS_SMALL_TALK_FILE sumado a el
+        small_talk_file = os.getenv("LAZARUS_SMALL_TALK_FILE")
+        if small_talk_matcher is None and small_talk_file:
+            small_talk_matcher = SmallTalkMatcher.from_file(small_talk_file)
+        self.small_talk_matcher = small_talk_matcher or DEFAULT_SMALL_TALK
+        # Ganchos por etapa (NOOP por defecto) y desglose opcional en ChatResult.timings
+        self.metrics = metrics or NOOP
+        self.collect_timings = collect_timings
+        if isinstance(self.metrics, MetricsRegistry):
+            self._register_gauges(self.metrics)
 
-        self.answer_chain: Optional[dspy.ChainOfThought] = None
-        self.transfer_chain: Optional[dspy.ChainOfThought] = None
+        self.answer_chain: Optional["dspy.ChainOfThought"] = None
+        self.transfer_chain: Optional["dspy.ChainOfThought"] = None
+        self.early_transfer_chain: Optional["dspy.ChainOfThought"] = None
+        self.merged_chain: Optional["dspy.ChainOfThought"] = None
 
         if self.api_key and self.model:
             self._configure_dspy()
         else:
-            print("Modo fallback: sin LLM, usando solo FAQ")
+            logger.info("Modo fallback: sin LLM, usando solo FAQ",
+                        extra={"event": "llm_disabled"})
 
     def _configure_dspy(self) -> None:
-        """Configurar DSPy con el proveedor de IA."""
+        """Configurar DSPy con el proveedor de IA (primer punto que importa DSPy)."""
 
         try:
+            import dspy
+
+            from .signatures import (
+                AnswerWithTransferSignature,
+                CustomerServiceSignature,
+                EarlyTransferDecisionSignature,
+                TransferDecisionSignature,
+            )
+
             lm_kwargs = {
                 "model": self.model,
                 "api_key": self.api_key,
+                # Los reintentos los hace solo LLMLimiter: los de litellm se sumarian
+                # a los suyos y anularian el backoff AIMD durante una rafaga de 429
+                "num_retries": 0,
             }
             if self.api_base:
                 lm_kwargs["api_base"] = self.api_base
 
             lm = dspy.LM(**lm_kwargs)
-            dspy.settings.configure(lm=lm)
+            # El conteo de tokens por etapa necesita el seguimiento de uso de DSPy
+            dspy.settings.configure(lm=lm, track_usage=self.metrics.enabled)
 
             self.answer_chain = dspy.ChainOfThought(CustomerServiceSignature)
             self.transfer_chain = dspy.ChainOfThought(
                 TransferDecisionSignature)
+            if self.pipeline_mode == "parallel":
+                self.early_transfer_chain = dspy.ChainOfThought(
+                    EarlyTransferDecisionSignature)
+            elif self.pipeline_mode == "merged":
+                self.merged_chain = dspy.ChainOfThought(
+                    AnswerWithTransferSignature)
 
             api_base_info = f" (API base: {self.api_base})" if self.api_base else ""
-            print(
-                f"DSPy configurado con modelo: {self.model}{api_base_info}")
+            logger.info(
+                "DSPy configurado con modelo: %s%s", self.model, api_base_info,
+                extra={"event": "llm_configured", "model": self.model,
+                       "api_base": self.api_base},
+            )
         except Exception as exc:
-            print(f"Error al configurar DSPy: {exc}")
-            print("Ejecutandose en modo fallback (solo FAQ)")
+            logger.error(
+                "Error al configurar DSPy: %s. Ejecutandose en modo fallback (solo FAQ)", exc,
+                extra={"event": "llm_config_error", "model": self.model},
+            )
             self.answer_chain = None
             self.transfer_chain = None
+            self.early_transfer_chain = None
+            self.merged_chain = None
 
     def _try_generate_answer(
         self,
         context: str,
         question: str,
         fallback_answer: str,
-    ) -> Tuple[str, Optional[Exception]]:
+    ) -> Generator[LLMCall, Any, Tuple[str, Optional[Exception]]]:
         if not self.answer_chain:
             return fallback_answer, None
 
         try:
-            prediction = self.answer_chain(
-                question=question,
-                retrieved_passages=context,
+            prediction = yield LLMCall(
+                stage="answer",
+                chain=self.answer_chain,
+                kwargs={
+                    "question": question,
+                    "retrieved_passages": context,
+                },
             )
             structured_answer = self._compose_structured_answer(prediction)
             return structured_answer or fallback_answer, None
@@ -100,7 +229,7 @@ class LazarusChatbot(dspy.Module):
             return fallback_answer, exc
 
     @staticmethod
-    def _compose_structured_answer(prediction: dspy.Prediction) -> str:
+    def _compose_structured_answer(prediction: Any) -> str:
         segments = [
             getattr(prediction, "saludo_y_reconocimiento", ""),
             getattr(prediction, "respuesta_directa", ""),
@@ -110,6 +239,129 @@ class LazarusChatbot(dspy.Module):
             segment.strip() for segment in segments if isinstance(segment, str) and segment.strip()
         )
 
+    def _answer_and_decide(
+        self,
+        context: str,
+        question: str,
+        fallback_answer: str,
+        require_answer: bool,
+        use_llm: bool = True,
+    ) -> Generator[FlowStep, Any, PipelineOutcome]:
+        """Generar la respuesta y la decision de transferencia segun ``pipeline_mode``.
+
+        ``require_answer`` omite la decision cuando la respuesta generada queda vacia;
+        ``use_llm=False`` devuelve la respuesta de respaldo (modo solo FAQ).
+        """
+        if not use_llm:
+            return PipelineOutcome(answer=fallback_answer)
+        if self.pipeline_mode == "merged" and self.merged_chain:
+            return (yield from self._merged_pipeline(
+                context, question, fallback_answer, require_answer))
+        if (self.pipeline_mode == "parallel" and self.answer_chain
+                and self.early_transfer_chain):
+            return (yield from self._parallel_pipeline(context, question, fallback_answer))
+
+        answer, error = yield from self._try_generate_answer(
+            context=context,
+            question=question,
+            fallback_answer=fallback_answer,
+        )
+        outcome = PipelineOutcome(answer=answer, answer_error=error)
+        generated_answer = answer or fallback_answer
+        if error or not self.transfer_chain or (require_answer and not generated_answer.strip()):
+            return outcome
+
+        try:
+            outcome.transfer_prediction = yield LLMCall(
+                stage="transfer",
+                chain=self.transfer_chain,
+                kwargs={
+                    "question": question,
+                    "retrieved_passages": context or "sin_resultados",
+                    "generated_answer": generated_answer,
+                },
+            )
+            outcome.should_transfer = self._parse_transfer_decision(
+                outcome.transfer_prediction.should_transfer,
+            )
+        except Exception as exc:
+            outcome.transfer_prediction = None
+            outcome.transfer_error = exc
+        return outcome
+
+    def _parallel_pipeline(
+        self,
+        context: str,
+        question: str,
+        fallback_answer: str,
+    ) -> Generator[FlowStep, Any, PipelineOutcome]:
+        """Decision temprana (sin la respuesta) en paralelo con la generacion."""
+        answer_outcome, transfer_outcome = yield (
+            LLMCall(
+                stage="answer",
+                chain=self.answer_chain,
+                kwargs={"question": question, "retrieved_passages": context},
+            ),
+            LLMCall(
+                stage="transfer",
+                chain=self.early_transfer_chain,
+                kwargs={
+                    "question": question,
+                    "retrieved_passages": context or "sin_resultados",
+                },
+                short_circuit=lambda prediction: self._parse_transfer_decision(
+                    getattr(prediction, "should_transfer", "")),
+            ),
+        )
+
+        outcome = PipelineOutcome(answer=fallback_answer)
+        if isinstance(answer_outcome, Exception):
+            outcome.answer_error = answer_outcome
+        elif answer_outcome is not None:
+            outcome.answer = self._compose_structured_answer(answer_outcome) or fallback_answer
+
+        if isinstance(transfer_outcome, Exception):
+            outcome.transfer_error = transfer_outcome
+        elif transfer_outcome is not None:
+            try:
+                outcome.should_transfer = self._parse_transfer_decision(
+                    transfer_outcome.should_transfer,
+                )
+                outcome.transfer_prediction = transfer_outcome
+            except Exception as exc:
+                outcome.transfer_error = exc
+
+        # Si la decision canceló la respuesta, solo cuenta la transferencia
+        if outcome.should_transfer and answer_outcome is None:
+            outcome.answer_error = None
+        return outcome
+
+    def _merged_pipeline(
+        self,
+        context: str,
+        question: str,
+        fallback_answer: str,
+        require_answer: bool,
+    ) -> Generator[FlowStep, Any, PipelineOutcome]:
+        """Respuesta y decision de transferencia en una sola llamada."""
+        try:
+            prediction = yield LLMCall(
+                stage="answer",
+                chain=self.merged_chain,
+                kwargs={"question": question, "retrieved_passages": context},
+            )
+            answer = self._compose_structured_answer(prediction) or fallback_answer
+        except Exception as exc:
+            return PipelineOutcome(answer=fallback_answer, answer_error=exc)
+
+        outcome = PipelineOutcome(answer=answer)
+        if require_answer and not answer.strip():
+            return outcome
+        outcome.should_transfer = self._parse_transfer_decision(
+            getattr(prediction, "should_transfer", ""))
+        outcome.transfer_prediction = prediction
+        return outcome
+
     def _handle_llm_failure(
         self,
         result: ChatResult,
@@ -118,9 +370,12 @@ class LazarusChatbot(dspy.Module):
         agent_context: Dict[str, str],
     ) -> ChatResult:
         error_message = str(error)
-        print(f"Error al procesar con LLM: {error_message}")
-
-        error_kind = self._categorize_llm_error(error_message)
+        error_kind = classify_llm_exception(error)
+        logger.warning(
+            "Error al procesar con LLM: %s", error_message,
+            extra={"event": "llm_failure", "kind": error_kind,
+                   "error_type": type(error).__name__},
+        )
         technical_reason = self._technical_reason_for_kind(error_kind)
 
         enriched_context = dict(agent_context)
@@ -148,27 +403,26 @@ class LazarusChatbot(dspy.Module):
             reason_kind, TRANSFER_MESSAGES["generic"])
         result.source = "transfer"
 
-        self._simulate_transfer(
-            question=question,
-            reason=technical_reason,
-            agent_context=agent_context or {},
+        self.metrics.increment("transfers", reason_kind=reason_kind)
+        with timed_stage(self.metrics, "handoff", result.timings):
+            record = TransferRecord(
+                question=question,
+                reason=technical_reason,
+                reason_kind=reason_kind,
+                agent_context=self._agent_context(agent_context or {}),
+            )
+            self.handoff.submit(record)
+        logger.info(
+            "Transferencia a agente humano: %s", technical_reason,
+            extra={"event": "transfer", "reason_kind": reason_kind,
+                   "transfer_id": record.transfer_id},
         )
 
         return result
 
     @staticmethod
     def _categorize_llm_error(message: str) -> str:
-        lowered = message.lower()
-
-        if "rate limit" in lowered or "429" in lowered:
-            return "rate_limit"
-        if "unauthorized" in lowered or "invalid api key" in lowered or "401" in lowered:
-            return "auth"
-        if "timeout" in lowered or "timed out" in lowered:
-            return "timeout"
-        if "connection" in lowered or "network" in lowered:
-            return "network"
-        return "generic"
+        return categorize_llm_error(message)
 
     @staticmethod
     def _technical_reason_for_kind(kind: str) -> str:
@@ -183,35 +437,457 @@ class LazarusChatbot(dspy.Module):
         }
         return mapping.get(kind, mapping["generic"])
 
+    def as_dspy_module(self) -> "LazarusModule":
+        """``dspy.Module`` sobre este chatbot, para ``named_predictors()``, ``save``
+        y los optimizadores de DSPy (importa DSPy)."""
+        from .dspy_modules import LazarusModule
+
+        return LazarusModule(self)
+
+    def __call__(self, question: str) -> Dict[str, str]:
+        return self.forward(question)
+
+    async def acall(self, question: str) -> Dict[str, str]:
+        return await self.aforward(question)
+
     def forward(self, question: str) -> Dict[str, str]:
         return self.answer(question)
 
+    async def aforward(self, question: str) -> Dict[str, str]:
+        return await self.aanswer(question)
+
     def answer(self, question: str) -> Dict[str, str]:
-        result = ChatResult(question)
-        retrieval = self.retriever(question)
+        return self._run_flow(self._answer_flow(question)).to_dict()
+
+    async def aanswer(self, question: str) -> Dict[str, str]:
+        """Version asincrona de ``answer``: las llamadas LLM se esperan sin bloquear."""
+        return (await self._arun_flow(self._answer_flow(question))).to_dict()
+
+    def answer_batch(self, questions: Sequence[str], max_workers: int = 8) -> List[BatchItem]:
+        """Responder un lote de preguntas recuperando las FAQ de todo el lote a la vez.
+
+        Las llamadas LLM se reparten con asyncio (``aanswer_batch``); si ya hay un
+        loop en curso en este hilo se usa un pool de ``max_workers`` hilos. Los
+        resultados conservan el orden de ``questions`` y un error en una pregunta
+        queda en su ``BatchItem`` sin interrumpir el resto.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.aanswer_batch(questions, max_workers=max_workers))
+
+        flows = self._batch_flows(questions)
+        with ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="lazarus-batch"
+        ) as executor:
+            futures = [
+                executor.submit(contextvars.copy_context().run, self._run_batch_item,
+                                question, flow)
+                for question, flow in zip(questions, flows)
+            ]
+            return [future.result() for future in futures]
+
+    async def aanswer_batch(
+        self, questions: Sequence[str], max_workers: int = 8
+    ) -> List[BatchItem]:
+        """Version asincrona de ``answer_batch``: como maximo ``max_workers``
+        preguntas en curso a la vez."""
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def run(question: str, flow: AnswerFlow) -> BatchItem:
+            async with semaphore:
+                try:
+                    result = await self._arun_flow(flow)
+                except Exception as exc:
+                    return BatchItem(question, error=exc)
+                return BatchItem(question, result=result.to_dict())
+
+        flows = self._batch_flows(questions)
+        return list(await asyncio.gather(
+            *(run(question, flow) for question, flow in zip(questions, flows))
+        ))
+
+    def _batch_flows(self, questions: Sequence[str]) -> List[AnswerFlow]:
+        """Flujos de un lote con la recuperacion ya resuelta para todas las preguntas."""
+        kb_version = self.kb.version
+        retrievals = self.retriever.forward_many(questions)
+        return [
+            self._answer_flow(question, retrieval=retrieval, kb_version=kb_version)
+            for question, retrieval in zip(questions, retrievals)
+        ]
+
+    def _run_batch_item(self, question: str, flow: AnswerFlow) -> BatchItem:
+        try:
+            result = self._run_flow(flow)
+        except Exception as exc:
+            return BatchItem(question, error=exc)
+        return BatchItem(question, result=result.to_dict())
+
+    def stream_answer(self, question: str) -> Iterator[StreamEvent]:
+        """Version sincrona de ``astream_answer``.
+
+        El flujo corre en el loop compartido; cerrar el iterador antes de tiempo
+        cancela la llamada LLM en curso.
+        """
+        return BACKGROUND_LOOP.iterate(self.astream_answer(question))
+
+    async def astream_answer(self, question: str) -> AsyncIterator[StreamEvent]:
+        """Responder emitiendo la respuesta generada a medida que llega.
+
+        Produce eventos con ``text`` mientras ``answer_chain`` genera y termina con
+        un evento cuyo ``result`` es el diccionario que devolveria ``answer``. Si no
+        se emitio nada (FAQ directa, cache, small talk) se emite la respuesta final
+        como un solo fragmento. Si la respuesta final difiere de lo emitido (p. ej.
+        una transferencia decidida despues), se debe mostrar ``result["answer"]``.
+        Los grupos paralelos (``pipeline_mode="parallel"``) no se emiten en streaming.
+        """
+        flow = self._answer_flow(question)
+        streamed = False
+        try:
+            step = next(flow)
+            while True:
+                if not isinstance(step, LLMCall):
+                    step = flow.send(await self._arun_parallel(step))
+                    continue
+                if step.stage != "answer":
+                    try:
+                        prediction = await self._acall_chain(step)
+                    except Exception as exc:
+                        step = flow.throw(exc)
+                    else:
+                        step = flow.send(prediction)
+                    continue
+
+                prediction = None
+                try:
+                    async for item in self._astream_chain(step):
+                        if isinstance(item, StreamEvent):
+                            streamed = True
+                            yield item
+                        else:
+                            prediction = item
+                except Exception as exc:
+                    step = flow.throw(exc)
+                else:
+                    step = flow.send(prediction)
+        except StopIteration as stop:
+            result: ChatResult = stop.value
+
+        if not streamed and result.answer:
+            yield StreamEvent(text=result.answer)
+        yield StreamEvent(result=result.to_dict())
+
+    async def _astream_chain(self, call: LLMCall) -> AsyncIterator[Any]:
+        """Llamar a una cadena con ``dspy.streamify``; produce ``StreamEvent`` por
+        fragmento y al final la prediccion completa."""
+        import dspy
+
+        listeners = [
+            dspy.streaming.StreamListener(signature_field_name=field)
+            for field in ANSWER_STREAM_FIELDS
+        ]
+        program = dspy.streamify(call.chain, stream_listeners=listeners, is_async_program=True)
+        current_field = None
+        emitted = False
+        try:
+            async with self.limiter.areserve():
+                async for item in program(**call.kwargs):
+                    if isinstance(item, dspy.Prediction):
+                        yield item
+                        continue
+                    if not isinstance(item, dspy.streaming.StreamResponse):
+                        continue
+                    text = item.chunk
+                    if item.signature_field_name != current_field:
+                        # Mismo separador que _compose_structured_answer entre segmentos
+                        current_field = item.signature_field_name
+                        text = text.lstrip()
+                        if emitted and text:
+                            text = " " + text
+                    if text:
+                        emitted = True
+                        yield StreamEvent(text=text, field=current_field)
+        except Exception as exc:
+            self._record_llm_failure(call, exc)
+            raise
+        self.breaker.record_success()
+
+    def _run_flow(self, flow: AnswerFlow) -> ChatResult:
+        """Ejecutar un flujo llamando a las cadenas DSPy de forma sincrona."""
+        try:
+            step = next(flow)
+            while True:
+                if not isinstance(step, LLMCall):
+                    step = flow.send(self._run_parallel(step))
+                    continue
+                try:
+                    prediction = self._call_chain(step)
+                except Exception as exc:
+                    step = flow.throw(exc)
+                else:
+                    step = flow.send(prediction)
+        except StopIteration as stop:
+            return stop.value
+
+    async def _arun_flow(self, flow: AnswerFlow) -> ChatResult:
+        """Ejecutar un flujo esperando las cadenas DSPy con ``acall``."""
+        try:
+            step = next(flow)
+            while True:
+                if not isinstance(step, LLMCall):
+                    step = flow.send(await self._arun_parallel(step))
+                    continue
+                try:
+                    prediction = await self._acall_chain(step)
+                except Exception as exc:
+                    step = flow.throw(exc)
+                else:
+                    step = flow.send(prediction)
+        except StopIteration as stop:
+            return stop.value
+
+    def _call_chain(self, call: LLMCall) -> Any:
+        """Llamar a una cadena a traves del limitador y reportar el resultado al breaker."""
+        try:
+            prediction = self.limiter.call(call.chain, **call.kwargs)
+        except Exception as exc:
+            self._record_llm_failure(call, exc)
+            raise
+        self.breaker.record_success()
+        return prediction
+
+    async def _acall_chain(self, call: LLMCall) -> Any:
+        try:
+            prediction = await self.limiter.acall(call.chain.acall, **call.kwargs)
+        except Exception as exc:
+            self._record_llm_failure(call, exc)
+            raise
+        self.breaker.record_success()
+        return prediction
+
+    def _record_llm_failure(self, call: LLMCall, error: Exception) -> None:
+        # Misma clasificacion que LLMLimiter, por tipo antes que por mensaje
+        kind = classify_llm_exception(error)
+        self.metrics.increment("llm_errors", stage=call.stage, kind=kind)
+        self.breaker.record_failure(kind)
+
+    def close(self) -> None:
+        """Detener la vigilancia del CSV y la cola de transferencias (escribiendo lo pendiente)."""
+        self.kb.stop_watching()
+        self.handoff.close()
+
+    def _run_parallel(self, calls: Sequence[LLMCall]) -> List[Any]:
+        """Ejecutar un grupo paralelo desde codigo sincrono.
+
+        Corre ``_arun_parallel`` en el loop compartido: un hilo por llamada no
+        podria interrumpir la respuesta ya iniciada cuando la decision temprana
+        transfiere, y seguiria gastando tokens y cupo del limitador.
+        """
+        return BACKGROUND_LOOP.run(self._arun_parallel(calls))
+
+    async def _arun_parallel(self, calls: Sequence[LLMCall]) -> List[Any]:
+        """Ejecutar llamadas concurrentes; por llamada devuelve la prediccion, la
+        excepcion, o None si se cancelo porque otra cumplio su ``short_circuit``
+        (la tarea cancelada interrumpe su llamada LLM y libera el cupo)."""
+        tasks = {
+            asyncio.ensure_future(self._acall_chain(call)): position
+            for position, call in enumerate(calls)
+        }
+        outcomes: List[Any] = [None] * len(calls)
+        pending = set(tasks)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    position = tasks[task]
+                    error = task.exception()
+                    outcomes[position] = error if error is not None else task.result()
+                    if error is None and self._should_short_circuit(calls[position], outcomes[position]):
+                        return outcomes
+            return outcomes
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
+    @staticmethod
+    def _should_short_circuit(call: LLMCall, prediction: Any) -> bool:
+        return call.short_circuit is not None and call.short_circuit(prediction)
+
+    def _answer_flow(
+        self,
+        question: str,
+        retrieval: Optional[Retrieval] = None,
+        kb_version: Optional[int] = None,
+    ) -> AnswerFlow:
+        """Enrutamiento comun de ``answer`` y ``aanswer`` (sin E/S propia).
+
+        ``answer_batch`` pasa la recuperacion ya hecha junto con la version de
+        la base leida antes de recuperar. Con instrumentacion o
+        ``collect_timings`` se mide cada etapa.
+        """
+        if not self.metrics.enabled and not self.collect_timings:
+            return (yield from self._route_question(question, retrieval, kb_version, None))
+
+        timings: Optional[Dict[str, float]] = {} if self.collect_timings else None
+        with timed_stage(self.metrics, "total", timings):
+            result = yield from self._timed_steps(
+                self._route_question(question, retrieval, kb_version, timings), timings)
+        self.metrics.increment("answers", source=result.source)
+        # Los resultados de cache son copias: el desglose es el de esta solicitud
+        result.timings = timings
+        return result
+
+    def _timed_steps(self, flow: AnswerFlow,
+                     timings: Optional[Dict[str, float]]) -> AnswerFlow:
+        """Medir cada paso LLM de un flujo (incluye la espera en el limitador)."""
+        try:
+            step = next(flow)
+            while True:
+                if isinstance(step, LLMCall):
+                    stage = step.stage
+                else:
+                    stage = "+".join(call.stage for call in step)
+                try:
+                    with timed_stage(self.metrics, stage, timings):
+                        outcome = yield step
+                except Exception as exc:
+                    step = flow.throw(exc)
+                    continue
+                self._record_usage(step, outcome)
+                step = flow.send(outcome)
+        except StopIteration as stop:
+            return stop.value
+
+    def _record_usage(self, step: FlowStep, outcome: Any) -> None:
+        """Sumar los tokens de las predicciones (requiere ``track_usage`` en DSPy)."""
+        if not self.metrics.enabled:
+            return
+        pairs = [(step, outcome)] if isinstance(step, LLMCall) else zip(step, outcome)
+        for call, prediction in pairs:
+            get_usage = getattr(prediction, "get_lm_usage", None)
+            usage = get_usage() if callable(get_usage) else None
+            for model_usage in (usage or {}).values():
+                for token_type in ("prompt_tokens", "completion_tokens"):
+                    tokens = model_usage.get(token_type)
+                    if tokens:
+                        self.metrics.increment(
+                            "llm_tokens", tokens, stage=call.stage, type=token_type[:-7])
+
+    def _count_cache_lookup(self, cache: str, enabled: bool, hit: bool) -> None:
+        if enabled:
+            self.metrics.increment("cache_lookups", cache=cache, result="hit" if hit else "miss")
+
+    def _register_gauges(self, registry: MetricsRegistry) -> None:
+        registry.register_gauge(
+            "handoff_queue_depth", "Transferencias pendientes de escribir",
+            lambda: self.handoff.stats()["depth"])
+        registry.register_gauge(
+            "llm_in_flight", "Llamadas LLM en curso", lambda: self.limiter.stats()["in_flight"])
+        registry.register_gauge(
+            "llm_concurrency_limit", "Limite de concurrencia LLM vigente",
+            lambda: self.limiter.stats()["limit"])
+        registry.register_gauge(
+            "breaker_state", "Estado del circuito LLM (1 en el estado actual)",
+            lambda: {
+                (("state", state),): float(state == self.breaker.state)
+                for state in ("closed", "open", "half_open")
+            })
+
+    def _route_question(
+        self,
+        question: str,
+        retrieval: Optional[Retrieval],
+        kb_version: Optional[int],
+        timings: Optional[Dict[str, float]],
+    ) -> AnswerFlow:
+        result = ChatResult(question, timings=timings)
+        # La version se lee antes de recuperar: una recarga posterior vacia la cache
+        if kb_version is None:
+            kb_version = self.kb.version
+        self.answer_cache.sync_version(kb_version)
+        self.semantic_cache.sync_version(kb_version, self._semantic_corpus)
+        if retrieval is None:
+            with timed_stage(self.metrics, "retrieval", timings):
+                retrieval = self.retriever(question)
         passages = getattr(retrieval, "passages", [])
         faq_match = getattr(retrieval, "metadata", None)
 
-        if not faq_match and self._is_small_talk(question):
+        with timed_stage(self.metrics, "small_talk", timings):
+            small_talk = not faq_match and self._is_small_talk(question)
+        if small_talk:
             result.answer = self._small_talk_reply(question)
             result.source = "small_talk"
-            return result.to_dict()
+            return result
+
+        score = faq_match.get("score") if faq_match else None
+        band = self.confidence.band(score)
+        self.confidence_stats.record(band, score)
+        if band == BAND_DIRECT:
+            # Coincidencia de alta confianza: se omiten answer_chain y transfer_chain
+            return self._direct_answer(result, faq_match)
+
+        cache_key = self._answer_cache_key(question, faq_match, kb_version)
+        with timed_stage(self.metrics, "cache", timings):
+            cached = self.answer_cache.get(cache_key, question)
+        self._count_cache_lookup("answer", self.answer_cache.enabled, cached is not None)
+        if cached is not None:
+            return cached
+
+        if not faq_match and self.answer_chain is not None:
+            # Preguntas parafraseadas reutilizan la respuesta generada antes
+            with timed_stage(self.metrics, "cache", timings):
+                cached = self.semantic_cache.get(self.kb.normalize_question(question), question)
+            self._count_cache_lookup("semantic", self.semantic_cache.enabled, cached is not None)
+            if cached is not None:
+                return cached
+
+        # Con el circuito abierto se usa el mismo camino que sin LLM configurado. Se
+        # consulta despues de las caches: en semiabierto reserva la unica prueba, que
+        # solo se libera al reportar el resultado de una llamada LLM
+        use_llm = self.answer_chain is None or self.breaker.allow_request()
 
         if faq_match:
-            result = self._handle_faq_found(
+            result = yield from self._handle_faq_found(
                 result,
                 question,
                 passages,
                 faq_match,
+                use_llm=use_llm,
             )
         else:
-            result = self._handle_faq_not_found(
+            result = yield from self._handle_faq_not_found(
                 result,
                 question,
                 passages,
+                use_llm=use_llm,
+                small_talk=small_talk,
             )
 
-        return result.to_dict()
+        if use_llm:
+            self.answer_cache.put(cache_key, result)
+        return result
+
+    def _direct_answer(self, result: ChatResult, search_result: Dict[str, Any]) -> ChatResult:
+        category = search_result.get("categoria", "FAQ")
+        result.answer = self.confidence.render(search_result)
+        result.source = f"FAQ - Categoria: {category}"
+        result.transfer_to_agent = False
+        result.transfer_reason = ""
+        return result
+
+    def _semantic_corpus(self) -> List[str]:
+        return [self.kb.normalize_question(faq["pregunta"]) for faq in self.kb.faqs]
+
+    def _answer_cache_key(
+        self,
+        question: str,
+        faq_match: Optional[Dict[str, Any]],
+        kb_version: int,
+    ) -> Hashable:
+        faq_id = faq_match.get("faq_id") if faq_match else None
+        return (self.kb.normalize_question(question), faq_id, kb_version)
 
     def _handle_faq_found(
         self,
@@ -219,7 +895,8 @@ class LazarusChatbot(dspy.Module):
         question: str,
         passages: Sequence[str],
         search_result: Dict[str, str],
-    ) -> ChatResult:
+        use_llm: bool = True,
+    ) -> AnswerFlow:
         category = search_result.get("categoria", "FAQ")
         default_answer = search_result.get("respuesta", "")
         context = "\n\n".join(passages)
@@ -228,15 +905,17 @@ class LazarusChatbot(dspy.Module):
         result.transfer_to_agent = False
         result.transfer_reason = ""
 
-        answer, error = self._try_generate_answer(
+        outcome = yield from self._answer_and_decide(
             context=context,
             question=question,
             fallback_answer=default_answer,
+            require_answer=False,
+            use_llm=use_llm,
         )
 
-        result.answer = answer or default_answer
+        result.answer = outcome.answer or default_answer
 
-        if error:
+        if outcome.answer_error:
             agent_context = {
                 "pregunta_relacionada": search_result.get("pregunta", ""),
                 "categoria": category,
@@ -245,50 +924,40 @@ class LazarusChatbot(dspy.Module):
             return self._handle_llm_failure(
                 result=result,
                 question=question,
-                error=error,
+                error=outcome.answer_error,
                 agent_context=agent_context,
             )
 
-        if self.transfer_chain:
-            try:
-                transfer_prediction = self.transfer_chain(
-                    question=question,
-                    retrieved_passages=context or "sin_resultados",
-                    generated_answer=result.answer or default_answer,
-                )
-                should_transfer = self._parse_transfer_decision(
-                    transfer_prediction.should_transfer,
-                )
-            except Exception as error:
-                agent_context = {
-                    "pregunta_relacionada": search_result.get("pregunta", ""),
-                    "categoria": category,
-                    "contexto": "fallo en pipeline de transferencia",
-                }
-                return self._handle_llm_failure(
-                    result=result,
-                    question=question,
-                    error=error,
-                    agent_context=agent_context,
-                )
+        if outcome.transfer_error:
+            agent_context = {
+                "pregunta_relacionada": search_result.get("pregunta", ""),
+                "categoria": category,
+                "contexto": "fallo en pipeline de transferencia",
+            }
+            return self._handle_llm_failure(
+                result=result,
+                question=question,
+                error=outcome.transfer_error,
+                agent_context=agent_context,
+            )
 
-            if should_transfer:
-                model_reason = getattr(transfer_prediction, "reason", None)
-                reason_text = model_reason or self._technical_reason_for_kind(
-                    "llm_transfer")
-                agent_context = {
-                    "pregunta_relacionada": search_result.get("pregunta", ""),
-                    "categoria": category,
-                    "respuesta_llm": result.answer,
-                    "razon_modelo": model_reason,
-                }
-                return self._trigger_transfer(
-                    result=result,
-                    question=question,
-                    reason_kind="llm_transfer",
-                    technical_reason=reason_text,
-                    agent_context=agent_context,
-                )
+        if outcome.should_transfer:
+            model_reason = getattr(outcome.transfer_prediction, "reason", None)
+            reason_text = model_reason or self._technical_reason_for_kind(
+                "llm_transfer")
+            agent_context = {
+                "pregunta_relacionada": search_result.get("pregunta", ""),
+                "categoria": category,
+                "respuesta_llm": result.answer,
+                "razon_modelo": model_reason,
+            }
+            return self._trigger_transfer(
+                result=result,
+                question=question,
+                reason_kind="llm_transfer",
+                technical_reason=reason_text,
+                agent_context=agent_context,
+            )
 
         return result
 
@@ -297,25 +966,33 @@ class LazarusChatbot(dspy.Module):
         result: ChatResult,
         question: str,
         passages: Sequence[str],
-    ) -> ChatResult:
+        use_llm: bool = True,
+        small_talk: Optional[bool] = None,
+    ) -> AnswerFlow:
+        # ``_route_question`` ya evaluo el small talk de esta pregunta
+        if small_talk is None:
+            small_talk = self._is_small_talk(question)
+        use_llm = use_llm and self.answer_chain is not None
         result.answer = ""
-        result.source = "LLM" if self.answer_chain else "transfer"
+        result.source = "LLM" if use_llm else "transfer"
         result.transfer_to_agent = False
         result.transfer_reason = ""
 
-        if self.answer_chain:
+        if use_llm:
             context = "\n\n".join(passages) if passages else (
                 "No hay informacion relevante en la base de conocimientos para esta pregunta. "
                 "Ofrece una respuesta breve y util basada en tu conocimiento general."
             )
 
-            answer, error = self._try_generate_answer(
+            outcome = yield from self._answer_and_decide(
                 context=context,
                 question=question,
                 fallback_answer="",
+                require_answer=True,
             )
+            answer = outcome.answer
 
-            if error:
+            if outcome.answer_error:
                 agent_context = {
                     "question": question,
                     "contexto": "sin resultados en la base de conocimiento",
@@ -323,14 +1000,14 @@ class LazarusChatbot(dspy.Module):
                 return self._handle_llm_failure(
                     result=result,
                     question=question,
-                    error=error,
+                    error=outcome.answer_error,
                     agent_context=agent_context,
                 )
 
             if answer.strip():
                 result.answer = answer
                 result.source = "LLM"
-            else:
+            elif not outcome.should_transfer:
                 return self._trigger_transfer(
                     result=result,
                     question=question,
@@ -343,48 +1020,39 @@ class LazarusChatbot(dspy.Module):
                     },
                 )
 
-            if self.transfer_chain:
-                try:
-                    transfer_prediction = self.transfer_chain(
-                        question=question,
-                        retrieved_passages=context if context else "sin_resultados",
-                        generated_answer=result.answer or "",
-                    )
-                    should_transfer = self._parse_transfer_decision(
-                        transfer_prediction.should_transfer,
-                    )
-                except Exception as error:
-                    agent_context = {
-                        "question": question,
-                        "contexto": "fallo en pipeline de transferencia",
-                    }
-                    return self._handle_llm_failure(
-                        result=result,
-                        question=question,
-                        error=error,
-                        agent_context=agent_context,
-                    )
-
-                if should_transfer and not self._is_small_talk(question):
-                    model_reason = getattr(transfer_prediction, "reason", None)
-                    reason_text = model_reason or self._technical_reason_for_kind(
-                        "llm_transfer")
-                    agent_context = {
-                        "question": question,
-                        "respuesta_llm": result.answer,
-                        "razon_modelo": model_reason,
-                    }
-                    return self._trigger_transfer(
-                        result=result,
-                        question=question,
-                        reason_kind="llm_transfer",
-                        technical_reason=reason_text,
-                        agent_context=agent_context,
-                    )
+            if outcome.transfer_error:
+                agent_context = {
+                    "question": question,
+                    "contexto": "fallo en pipeline de transferencia",
+                }
+                return self._handle_llm_failure(
+                    result=result,
+                    question=question,
+                    error=outcome.transfer_error,
+                    agent_context=agent_context,
+                )
+
+            if outcome.should_transfer and not small_talk:
+                model_reason = getattr(outcome.transfer_prediction, "reason", None)
+                reason_text = model_reason or self._technical_reason_for_kind(
+                    "llm_transfer")
+                agent_context = {
+                    "question": question,
+                    "respuesta_llm": result.answer,
+                    "razon_modelo": model_reason,
+                }
+                return self._trigger_transfer(
+                    result=result,
+                    question=question,
+                    reason_kind="llm_transfer",
+                    technical_reason=reason_text,
+                    agent_context=agent_context,
+                )
 
+            self.semantic_cache.put(self.kb.normalize_question(question), result)
             return result
 
-        if self._is_small_talk(question):
+        if small_talk:
             result.answer = self._small_talk_reply(question)
             result.source = "small_talk"
             result.transfer_to_agent = False
@@ -406,32 +1074,16 @@ class LazarusChatbot(dspy.Module):
         decision_lower = (decision_text or "").strip().lower()
         return decision_lower in {"si", "si", "yes", "true", "si.", "si.", "yes."}
 
-    def _simulate_transfer(
-        self,
-        question: str,
-        reason: str,
-        agent_context: Dict[str, str],
-    ) -> None:
-        print("\n" + "=" * 60)
-        print("TRANSFERENCIA A AGENTE HUMANO")
-        print("=" * 60)
-        print(f"Pregunta original: {question}")
-        print(f"Motivo tecnico: {reason}")
-
-        if agent_context:
-            print("-" * 60)
-            print("Contexto sugerido para el agente:")
-            for key, value in agent_context.items():
-                if value is None:
-                    continue
-                printable = self._truncate_for_agent(str(value))
-                if printable:
-                    print(f"- {key}: {printable}")
-
-        print("-" * 60)
-        print("Estado: Conectando con agente disponible...")
-        print("Tiempo estimado de espera: 2-3 minutos")
-        print("=" * 60 + "\n")
+    def _agent_context(self, agent_context: Dict[str, str]) -> Dict[str, str]:
+        """Contexto para el agente con cada valor compactado y truncado."""
+        context = {}
+        for key, value in agent_context.items():
+            if value is None:
+                continue
+            printable = self._truncate_for_agent(str(value))
+            if printable:
+                context[key] = printable
+        return context
 
     @staticmethod
     def _truncate_for_agent(text: str) -> str:
@@ -441,14 +1093,8 @@ class LazarusChatbot(dspy.Module):
             return clean_text[:limit].rstrip() + "..."
         return clean_text
 
-    @staticmethod
-    def _is_small_talk(question: str) -> bool:
-        normalized = question.lower().strip()
-        if normalized in SMALL_TALK_PHRASES:
-            return True
-        return len(normalized) <= 20 and any(
-            normalized.startswith(prefix) for prefix in SMALL_TALK_PREFIXES
-        )
+    def _is_small_talk(self, question: str) -> bool:
+        return self.small_talk_matcher.matches(question)
 
     @staticmethod
     def _small_talk_reply(question: str) -> str:
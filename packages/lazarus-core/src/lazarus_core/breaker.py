@@ -0,0 +1,149 @@
+"""Circuit breaker para el proveedor LLM."""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, FrozenSet, Optional
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """Corta las llamadas LLM cuando el proveedor esta fallando.
+
+    Cuenta los resultados de las ultimas ``window`` llamadas; solo las
+    categorias de ``trip_kinds`` (segun ``classify_llm_exception``) cuentan
+    como fallo del proveedor; los demas errores no cuentan ni como exito ni
+    como fallo. Con al menos ``min_calls`` resultados y una tasa
+    de fallos >= ``failure_rate`` el circuito se abre: durante
+    ``reset_timeout`` segundos el chatbot responde en modo solo FAQ. Despues
+    pasa a semiabierto y deja pasar ``half_open_probes`` solicitudes de
+    prueba; un exito lo cierra y un fallo lo vuelve a abrir.
+    """
+
+    DEFAULT_TRIP_KINDS = frozenset({"rate_limit", "timeout", "network", "auth"})
+
+    def __init__(
+        self,
+        failure_rate: float = 0.5,
+        window: int = 20,
+        min_calls: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_probes: int = 1,
+        trip_kinds: Optional[FrozenSet[str]] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_probes = half_open_probes
+        self.trip_kinds = trip_kinds if trip_kinds is not None else self.DEFAULT_TRIP_KINDS
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._state = CLOSED
+        self._results: Deque[bool] = deque(maxlen=window)
+        self._opened_at = float("-inf")
+        self._probes = 0
+        self._probe_started_at = float("-inf")
+        self.rejected = 0
+        self.failures_by_kind: Dict[str, int] = {}
+        self.transitions: Dict[str, int] = {OPEN: 0, HALF_OPEN: 0, CLOSED: 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(self._clock())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == OPEN and now - self._opened_at >= self.reset_timeout:
+            self._transition(HALF_OPEN)
+            self._probes = 0
+        return self._state
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        self.transitions[state] += 1
+        if state == OPEN:
+            logger.warning(
+                "Circuito LLM abierto; modo solo FAQ durante %.0fs", self.reset_timeout,
+                extra={"event": "breaker_open", "reset_timeout": self.reset_timeout},
+            )
+        elif state == CLOSED:
+            logger.info("Circuito LLM cerrado: se reanudan las respuestas con IA",
+                        extra={"event": "breaker_closed"})
+
+    def allow_request(self) -> bool:
+        """Indica si la solicitud puede usar el LLM (si no, modo solo FAQ)."""
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN:
+                # Una prueba que nunca reporto resultado no bloquea el circuito para siempre
+                if (self._probes < self.half_open_probes
+                        or now - self._probe_started_at >= self.reset_timeout):
+                    self._probes += 1
+                    self._probe_started_at = now
+                    return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._current_state(self._clock()) == HALF_OPEN:
+                self._transition(CLOSED)
+                self._results.clear()
+            self._results.append(True)
+
+    def record_failure(self, kind: str) -> None:
+        """Registrar un error LLM; las categorias ajenas al proveedor no abren el circuito."""
+        with self._lock:
+            now = self._clock()
+            if kind not in self.trip_kinds:
+                # No dice nada de la salud del proveedor: si era una prueba en
+                # semiabierto se devuelve para otra solicitud sin cerrar el circuito
+                if self._current_state(now) == HALF_OPEN and self._probes:
+                    self._probes -= 1
+                    if not self._probes:
+                        self._probe_started_at = float("-inf")
+                return
+            self.failures_by_kind[kind] = self.failures_by_kind.get(kind, 0) + 1
+            state = self._current_state(now)
+            if state == OPEN:
+                return
+            self._results.append(False)
+            failures = self._results.count(False)
+            if state == HALF_OPEN or (
+                len(self._results) >= self.min_calls
+                and failures / len(self._results) >= self.failure_rate
+            ):
+                self._opened_at = now
+                self._transition(OPEN)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Estado actual para monitoreo."""
+        with self._lock:
+            now = self._clock()
+            state = self._current_state(now)
+            total = len(self._results)
+            failures = self._results.count(False)
+            return {
+                "state": state,
+                "window_calls": total,
+                "window_failure_rate": failures / total if total else 0.0,
+                "open_for": (max(self.reset_timeout - (now - self._opened_at), 0.0)
+                             if state == OPEN else 0.0),
+                "rejected": self.rejected,
+                "failures_by_kind": dict(self.failures_by_kind),
+                "transitions": dict(self.transitions),
+            }
+
+
+__all__ = ["CLOSED", "HALF_OPEN", "OPEN", "CircuitBreaker"]
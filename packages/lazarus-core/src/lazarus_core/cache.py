@@ -0,0 +1,227 @@
+"""Caches de respuestas: exacta (TTL + LRU) y por similitud semantica."""
+
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import replace
+from typing import TYPE_CHECKING, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple
+
+from .structures import ChatResult
+
+if TYPE_CHECKING:
+    # numpy (con los embeddings) se importa solo al activar una SemanticCache
+    from .embeddings import HashedNgramEmbedder
+
+
+class AnswerCache:
+    """Cache LRU acotada con expiracion por tiempo para objetos ChatResult.
+
+    Las claves incluyen la version de la base de conocimiento; al detectar una
+    version nueva se vacia la cache completa. Es segura entre hilos.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 3600.0,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max_size
+        self.ttl = ttl
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, ChatResult]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def sync_version(self, version: int) -> None:
+        """Vaciar la cache si la base de conocimiento cambio de version."""
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+
+    def get(self, key: Hashable, question: str) -> Optional[ChatResult]:
+        """Devolver una copia del resultado guardado con la pregunta original."""
+        if not self.enabled:
+            return None
+
+        now = self._clock()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return replace(entry[1], question=question)
+
+    def put(self, key: Hashable, result: ChatResult) -> None:
+        """Guardar un resultado; las transferencias nunca se cachean."""
+        if not self.enabled or result.source == "transfer" or result.transfer_to_agent:
+            return
+
+        expires_at = self._clock() + self.ttl
+        with self._lock:
+            self._entries[key] = (expires_at, replace(result, timings=None))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# Palabras que invierten el sentido de una pregunta casi identica
+NEGATIONS = frozenset({"no", "nunca", "ni", "sin", "tampoco", "jamas", "ningun", "ninguna"})
+
+
+def semantic_guard(text: str) -> FrozenSet[str]:
+    """Numeros y negaciones del texto: dos preguntas que difieren en ellos
+    ("el 5 de mayo" / "el 6 de mayo", "puedo" / "no puedo") no comparten respuesta."""
+    return frozenset(
+        word for word in text.split()
+        if word in NEGATIONS or any(char.isdigit() for char in word)
+    )
+
+
+class SemanticCache:
+    """Cache por similitud para respuestas generadas sin coincidencia en la KB.
+
+    Los vectores viven en una matriz float32 preasignada (una fila por
+    entrada) y la busqueda es un solo producto matriz-vector. Si la mejor
+    similitud coseno alcanza ``threshold`` y la pregunta tiene los mismos
+    numeros y negaciones (``semantic_guard``) se reutiliza esa respuesta; al
+    llenarse se expulsa la entrada usada hace mas tiempo.
+
+    Esta desactivada por defecto (``max_size=0``): la similitud es lexica y
+    puede confundir preguntas parecidas que piden cosas distintas. Desactivada
+    no importa numpy ni crea el embedder.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 0,
+        threshold: float = 0.9,
+        ttl: float = 3600.0,
+        embedder: Optional["HashedNgramEmbedder"] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_size = max(max_size, 0)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.embedder = embedder
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._version: Optional[int] = None
+
+        self._results: List[Optional[ChatResult]] = [None] * self.max_size
+        self._guards: List[FrozenSet[str]] = [frozenset()] * self.max_size
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        if not self.enabled:
+            return
+
+        import numpy as np
+
+        if self.embedder is None:
+            from .embeddings import HashedNgramEmbedder
+
+            self.embedder = HashedNgramEmbedder()
+        self._vectors = np.zeros((self.max_size, self.embedder.dim), dtype=np.float32)
+        self._expires_at = np.full(self.max_size, -np.inf)
+        self._last_used = np.full(self.max_size, -np.inf)
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    def __len__(self) -> int:
+        return sum(result is not None for result in self._results)
+
+    def sync_version(self, version: int, corpus: Callable[[], Iterable[str]]) -> None:
+        """Vaciar la cache y reajustar el IDF si la KB cambio de version."""
+        if version == self._version or not self.enabled:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            self.embedder.fit(corpus())
+            self._clear()
+            self._version = version
+
+    def get(self, text: str, question: str) -> Optional[ChatResult]:
+        """Devolver la respuesta mas similar si supera el umbral."""
+        if not self.enabled:
+            return None
+        import numpy as np
+
+        vector = self.embedder.embed(text)
+        now = self._clock()
+        with self._lock:
+            similarities = self._vectors @ vector
+            similarities[self._expires_at <= now] = -1.0
+            slot = int(np.argmax(similarities))
+            if (similarities[slot] < self.threshold or self._results[slot] is None
+                    or self._guards[slot] != semantic_guard(text)):
+                self.misses += 1
+                return None
+            self._last_used[slot] = now
+            self.hits += 1
+            return replace(self._results[slot], question=question)
+
+    def put(self, text: str, result: ChatResult) -> None:
+        """Guardar una respuesta; las transferencias nunca se cachean."""
+        if not self.enabled or result.source == "transfer" or result.transfer_to_agent:
+            return
+        import numpy as np
+
+        vector = self.embedder.embed(text)
+        if not vector.any():
+            return
+        now = self._clock()
+        with self._lock:
+            slot = int(np.argmin(np.where(self._expires_at <= now, -np.inf, self._last_used)))
+            if self._results[slot] is not None and self._expires_at[slot] > now:
+                self.evictions += 1
+            self._vectors[slot] = vector
+            self._expires_at[slot] = now + self.ttl
+            self._last_used[slot] = now
+            self._results[slot] = replace(result, timings=None)
+            self._guards[slot] = semantic_guard(text)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "size": len(self),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def clear(self) -> None:
+        with self._lock:
+            self._clear()
+
+    def _clear(self) -> None:
+        self._results = [None] * self.max_size
+        self._guards = [frozenset()] * self.max_size
+        if not self.enabled:
+            return
+        self._vectors[:] = 0
+        self._expires_at[:] = float("-inf")
+        self._last_used[:] = float("-inf")
+
+
+__all__ = ["AnswerCache", "SemanticCache"]
@@ -0,0 +1,88 @@
+"""Politica de confianza para responder FAQ sin pasar por el LLM."""
+
+import bisect
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Optional
+
+BAND_DIRECT = "direct"
+BAND_LLM = "llm"
+BAND_NOT_FOUND = "not_found"
+
+
+@dataclass
+class ConfidencePolicy:
+    """Define la banda de una coincidencia segun su puntuacion.
+
+    Por encima de ``direct_threshold`` la respuesta de la FAQ se devuelve tal
+    cual (o formateada con ``template``); por debajo se mantiene el flujo LLM.
+    Por defecto (``None``) la respuesta directa esta desactivada: la puntuacion
+    de la KB suma un bono por coincidencia de la consulta completa, asi que una
+    sola palabra clave ("lazarus", "hilti") ya supera 1.0. El umbral se calibra
+    con ``ConfidenceStats`` sobre el corpus propio.
+    """
+
+    direct_threshold: Optional[float] = None
+    template: Optional[str] = None
+
+    def band(self, score: Optional[float]) -> str:
+        if score is None:
+            return BAND_NOT_FOUND
+        if self.direct_threshold is not None and score >= self.direct_threshold:
+            return BAND_DIRECT
+        return BAND_LLM
+
+    def render(self, faq: Mapping[str, Any]) -> str:
+        """Texto de la respuesta directa; la plantilla recibe los campos de la FAQ."""
+        answer = faq.get("respuesta", "")
+        if not self.template:
+            return answer
+        return self.template.format_map({**faq, "respuesta": answer})
+
+
+class ConfidenceStats:
+    """Conteo por banda e histograma de puntuaciones para ajustar umbrales."""
+
+    # Limites superiores (inclusivos) de los buckets del histograma
+    BUCKETS = (0.2, 0.4, 0.6, 0.8, 1.0, 1.2, 1.5, 2.0, 3.0)
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._bands: Dict[str, int] = {
+            BAND_DIRECT: 0, BAND_LLM: 0, BAND_NOT_FOUND: 0}
+        self._histogram: List[int] = [0] * (len(self.BUCKETS) + 1)
+        self._score_sum = 0.0
+        self._scored = 0
+
+    def record(self, band: str, score: Optional[float]) -> None:
+        with self._lock:
+            self._bands[band] = self._bands.get(band, 0) + 1
+            if score is not None:
+                self._histogram[bisect.bisect_left(self.BUCKETS, score)] += 1
+                self._score_sum += score
+                self._scored += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copia de los contadores: bandas, tasas, histograma y puntuacion media."""
+        with self._lock:
+            total = sum(self._bands.values())
+            labels = [f"<={bound}" for bound in self.BUCKETS] + [f">{self.BUCKETS[-1]}"]
+            return {
+                "total": total,
+                "bands": dict(self._bands),
+                "rates": {
+                    band: (count / total if total else 0.0)
+                    for band, count in self._bands.items()
+                },
+                "score_histogram": dict(zip(labels, self._histogram)),
+                "mean_score": self._score_sum / self._scored if self._scored else None,
+            }
+
+
+__all__ = [
+    "BAND_DIRECT",
+    "BAND_LLM",
+    "BAND_NOT_FOUND",
+    "ConfidencePolicy",
+    "ConfidenceStats",
+]
@@ -60,3 +60,19 @@ TRANSFER_MESSAGES = {
 }
 
 AGENT_CONTEXT_LIMIT = 220
+
+# Campos de CustomerServiceSignature que se emiten en streaming, en orden
+ANSWER_STREAM_FIELDS = (
+    "saludo_y_reconocimiento",
+    "respuesta_directa",
+    "proxima_accion_sugerida",
+)
+
+# sequential: respuesta y luego decision de transferencia (dos llamadas en serie)
+# parallel: decision temprana en paralelo con la respuesta; si transfiere, se cancela la
+#   llamada de respuesta en curso (tambien desde la API sincrona, via el loop compartido)
+# merged: una sola llamada que devuelve la respuesta y la decision
+PIPELINE_MODES = ("sequential", "parallel", "merged")
+
+# CSV de FAQ por defecto, relativo al directorio de trabajo
+DEFAULT_FAQ_FILE = "./data_limpia/faq_limpio.csv"
@@ -0,0 +1,83 @@
+"""Adaptadores ``dspy.Module`` del chatbot y del recuperador.
+
+``LazarusChatbot`` y ``FAQRetriever`` no heredan de ``dspy.Module`` para que
+el modo solo FAQ arranque sin DSPy. Este modulo si importa DSPy y solo se
+carga desde ``as_dspy_module()``: ahi estan ``named_predictors()``,
+``save``/``load`` y los optimizadores (``compile``) sobre las cadenas del bot.
+"""
+
+import copy
+from typing import TYPE_CHECKING, Any, Dict
+
+import dspy
+
+from .cache import AnswerCache, SemanticCache
+
+if TYPE_CHECKING:
+    from .bot import LazarusChatbot
+    from .retriever import FAQRetriever
+
+# Cadenas DSPy del chatbot que se exponen como predictores
+CHAIN_NAMES = ("answer_chain", "transfer_chain", "early_transfer_chain", "merged_chain")
+
+
+class LazarusModule(dspy.Module):
+    """``dspy.Module`` sobre un ``LazarusChatbot``.
+
+    Las cadenas del bot son atributos del modulo, asi que los optimizadores
+    las ven y las copias compiladas tienen las suyas. ``forward`` responde con
+    las cadenas de este modulo, sin las caches de respuestas del bot, y
+    devuelve un ``dspy.Prediction`` con los campos de ``answer``.
+    """
+
+    def __init__(self, chatbot: "LazarusChatbot") -> None:
+        super().__init__()
+        self.chatbot = chatbot
+        for name in CHAIN_NAMES:
+            setattr(self, name, getattr(chatbot, name))
+        self._answer_cache = AnswerCache(max_size=0)
+        self._semantic_cache = SemanticCache(max_size=0)
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "LazarusModule":
+        # Se copian las cadenas; el chatbot (KB, limitador, cola) se comparte
+        new = self.__class__.__new__(self.__class__)
+        for name, value in self.__dict__.items():
+            shared = name == "chatbot" or name.startswith("_")
+            setattr(new, name, value if shared else copy.deepcopy(value, memo))
+        return new
+
+    def _bound_chatbot(self) -> "LazarusChatbot":
+        chatbot = copy.copy(self.chatbot)
+        for name in CHAIN_NAMES:
+            setattr(chatbot, name, getattr(self, name))
+        chatbot.answer_cache = self._answer_cache
+        chatbot.semantic_cache = self._semantic_cache
+        return chatbot
+
+    def forward(self, question: str) -> dspy.Prediction:
+        return dspy.Prediction(**self._bound_chatbot().answer(question))
+
+    async def aforward(self, question: str) -> dspy.Prediction:
+        return dspy.Prediction(**(await self._bound_chatbot().aanswer(question)))
+
+
+class FAQRetrieverModule(dspy.Module):
+    """``dspy.Module`` sobre un ``FAQRetriever``: ``forward`` devuelve un
+    ``dspy.Prediction`` con ``passages`` y ``metadata``."""
+
+    def __init__(self, retriever: "FAQRetriever") -> None:
+        super().__init__()
+        self.retriever = retriever
+
+    def __deepcopy__(self, memo: Dict[int, Any]) -> "FAQRetrieverModule":
+        # No tiene parametros: la copia comparte el recuperador y su KB
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
+        return new
+
+    def forward(self, query: str) -> dspy.Prediction:
+        retrieval = self.retriever(query)
+        return dspy.Prediction(passages=retrieval.passages, metadata=retrieval.metadata)
+
+
+__all__ = ["FAQRetrieverModule", "LazarusModule"]
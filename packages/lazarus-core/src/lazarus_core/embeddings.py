@@ -0,0 +1,58 @@
+"""Embeddings locales de texto con n-gramas de caracteres hasheados (TF-IDF)."""
+
+import math
+import zlib
+from typing import Iterable, List, Tuple
+
+import numpy as np
+
+
+class HashedNgramEmbedder:
+    """Vectoriza textos con TF-IDF sobre n-gramas de caracteres hasheados.
+
+    No requiere modelo ni GPU: cada n-grama se asigna a una de ``dim``
+    cubetas con CRC32 (estable entre procesos), el TF es sublineal y el IDF
+    se ajusta sobre un corpus de referencia (las preguntas de la KB). Los
+    vectores se devuelven normalizados, por lo que el producto punto es el
+    coseno.
+    """
+
+    def __init__(self, dim: int = 4096, ngram_range: Tuple[int, int] = (3, 5)) -> None:
+        self.dim = dim
+        self.ngram_range = ngram_range
+        self.idf = np.ones(dim, dtype=np.float32)
+
+    def _buckets(self, text: str) -> List[int]:
+        padded = f" {' '.join(text.split())} "
+        low, high = self.ngram_range
+        buckets = []
+        for size in range(low, high + 1):
+            for start in range(len(padded) - size + 1):
+                gram = padded[start:start + size].encode("utf-8")
+                buckets.append(zlib.crc32(gram) % self.dim)
+        return buckets
+
+    def fit(self, corpus: Iterable[str]) -> "HashedNgramEmbedder":
+        """Calcular el IDF suavizado de cada cubeta sobre el corpus."""
+        document_frequency = np.zeros(self.dim, dtype=np.float64)
+        n_documents = 0
+        for text in corpus:
+            n_documents += 1
+            document_frequency[np.unique(self._buckets(text))] += 1
+        idf = np.log((1 + n_documents) / (1 + document_frequency)) + 1
+        self.idf = idf.astype(np.float32)
+        return self
+
+    def embed(self, text: str) -> np.ndarray:
+        """Vector unitario float32 del texto (ceros si no tiene n-gramas)."""
+        counts = np.bincount(self._buckets(text), minlength=self.dim).astype(np.float32)
+        nonzero = counts > 0
+        counts[nonzero] = 1 + np.log(counts[nonzero])
+        vector = counts * self.idf
+        norm = math.sqrt(float(vector @ vector))
+        if norm:
+            vector /= norm
+        return vector
+
+
+__all__ = ["HashedNgramEmbedder"]
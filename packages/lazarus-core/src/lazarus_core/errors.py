@@ -0,0 +1,39 @@
+"""Clasificacion de errores del proveedor LLM."""
+
+# Tipos de error (litellm/openai) y la categoria que representan, en orden de prioridad
+_ERROR_TYPE_KINDS = (
+    ("RateLimitError", "rate_limit"),
+    ("Timeout", "timeout"),
+    ("APITimeoutError", "timeout"),
+    ("TimeoutError", "timeout"),
+    ("AuthenticationError", "auth"),
+    ("APIConnectionError", "network"),
+    ("ConnectionError", "network"),
+)
+
+
+def categorize_llm_error(message: str) -> str:
+    """Categoria de un error LLM a partir de su mensaje."""
+    lowered = message.lower()
+
+    if "rate limit" in lowered or "429" in lowered:
+        return "rate_limit"
+    if "unauthorized" in lowered or "invalid api key" in lowered or "401" in lowered:
+        return "auth"
+    if "timeout" in lowered or "timed out" in lowered:
+        return "timeout"
+    if "connection" in lowered or "network" in lowered:
+        return "network"
+    return "generic"
+
+
+def classify_llm_exception(error: BaseException) -> str:
+    """Categoria de una excepcion LLM usando su tipo y, si no basta, su mensaje."""
+    type_names = {cls.__name__ for cls in type(error).__mro__}
+    for type_name, kind in _ERROR_TYPE_KINDS:
+        if type_name in type_names:
+            return kind
+    return categorize_llm_error(str(error))
+
+
+__all__ = ["categorize_llm_error", "classify_llm_exception"]
@@ -0,0 +1,346 @@
+"""Cola de transferencias a agentes humanos.
+
+``_trigger_transfer`` solo encola un ``TransferRecord``; un hilo de fondo lo
+entrega en lotes a un ``HandoffSink`` (por defecto SQLite). La cola es
+acotada: si se llena, quien encola espera como mucho ``put_timeout`` y
+despues el registro se descarta y se cuenta, para no frenar las respuestas.
+En el hilo de un loop de asyncio (``aanswer``) no se espera: el registro se
+descarta de inmediato.
+"""
+
+import abc
+import asyncio
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+import weakref
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .constants import DEFAULT_FAQ_FILE
+from .structures import TransferRecord
+
+HANDOFF_DB_NAME = "handoffs.sqlite3"
+
+logger = logging.getLogger(__name__)
+
+
+def handoff_db_path(data_file: Optional[str] = None) -> str:
+    """Ruta de la base de transferencias: ``LAZARUS_HANDOFF_DB`` o junto al CSV de FAQ."""
+    configured = os.getenv("LAZARUS_HANDOFF_DB")
+    if configured:
+        return configured
+    return os.path.join(os.path.dirname(data_file or DEFAULT_FAQ_FILE), HANDOFF_DB_NAME)
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+class HandoffSink(abc.ABC):
+    """Destino de las transferencias; ``write_batch`` se llama desde un solo hilo."""
+
+    @abc.abstractmethod
+    def write_batch(self, records: Sequence[TransferRecord]) -> None:
+        """Guardar un lote; una excepcion hace que la cola lo reintente."""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteHandoffSink(HandoffSink):
+    """Guarda las transferencias en una tabla SQLite (una transaccion por lote).
+
+    El archivo se crea con la primera transferencia, no al construir el destino.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path or handoff_db_path()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Se abre en el hilo despachador: sqlite3 no comparte conexiones entre hilos
+        if self._conn is None:
+            conn = sqlite3.connect(self.path, timeout=30.0)
+            # WAL permite que varios procesos (workers) escriban sin bloquear lecturas
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS transfers ("
+                " transfer_id TEXT PRIMARY KEY,"
+                " created_at REAL NOT NULL,"
+                " question TEXT NOT NULL,"
+                " reason_kind TEXT NOT NULL,"
+                " reason TEXT NOT NULL,"
+                " agent_context TEXT NOT NULL,"
+                " status TEXT NOT NULL DEFAULT 'pending')"
+            )
+            self._conn = conn
+        return self._conn
+
+    def write_batch(self, records: Sequence[TransferRecord]) -> None:
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO transfers"
+                " (transfer_id, created_at, question, reason_kind, reason, agent_context)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        record.transfer_id,
+                        record.created_at,
+                        record.question,
+                        record.reason_kind,
+                        record.reason,
+                        json.dumps(record.agent_context, ensure_ascii=False),
+                    )
+                    for record in records
+                ],
+            )
+
+    def close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+class JSONLinesHandoffSink(HandoffSink):
+    """Agrega cada transferencia como una linea JSON a un archivo."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+
+    def write_batch(self, records: Sequence[TransferRecord]) -> None:
+        lines = "".join(
+            json.dumps(record.to_dict(), ensure_ascii=False) + "\n" for record in records
+        )
+        with open(self.path, "a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+
+# Colas con registros por escribir al salir del proceso (sin retenerlas vivas)
+_live_queues: "weakref.WeakSet[HandoffQueue]" = weakref.WeakSet()
+
+
+@atexit.register
+def _close_live_queues() -> None:
+    for handoff_queue in list(_live_queues):
+        handoff_queue.close()
+
+
+class HandoffQueue:
+    """Cola acotada con un despachador en segundo plano que escribe por lotes.
+
+    El despachador arranca con el primer registro. Junta hasta ``batch_size``
+    registros o los que lleguen en ``flush_interval`` segundos y los escribe de
+    una vez; un lote que falla se reintenta ``max_write_attempts`` veces. Tras
+    ``idle_timeout`` segundos sin registros el hilo termina (y cierra el
+    destino), de modo que una cola abandonada sin ``close`` puede liberarse.
+    """
+
+    def __init__(
+        self,
+        sink: Optional[HandoffSink] = None,
+        max_size: int = 1000,
+        batch_size: int = 50,
+        flush_interval: float = 0.5,
+        put_timeout: float = 0.05,
+        max_write_attempts: int = 3,
+        idle_timeout: float = 30.0,
+    ) -> None:
+        self.sink = sink or SQLiteHandoffSink()
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.put_timeout = put_timeout
+        self.max_write_attempts = max_write_attempts
+        self.idle_timeout = idle_timeout
+
+        self._queue: "queue.Queue[Optional[Tuple[float, TransferRecord]]]" = queue.Queue(max_size)
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+        self.counters: Dict[str, int] = {
+            "submitted": 0,
+            "written": 0,
+            "dropped": 0,
+            "failed": 0,
+            "batches": 0,
+            "write_errors": 0,
+        }
+        self._max_depth = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def submit(self, record: TransferRecord, block: Optional[bool] = None) -> bool:
+        """Encolar una transferencia; devuelve False si la cola siguio llena o esta cerrada.
+
+        Con ``block=None`` se espera hasta ``put_timeout`` salvo en el hilo de
+        un loop de asyncio, donde esperar frenaria todas sus solicitudes.
+        """
+        if self._closed:
+            with self._lock:
+                self.counters["dropped"] += 1
+            return False
+        if block is None:
+            block = not _in_event_loop()
+        try:
+            if block:
+                self._queue.put((time.monotonic(), record), timeout=self.put_timeout)
+            else:
+                self._queue.put_nowait((time.monotonic(), record))
+        except queue.Full:
+            with self._lock:
+                self.counters["dropped"] += 1
+            logger.warning(
+                "Cola de transferencias llena; se descarta %s", record.transfer_id,
+                extra={"event": "handoff_dropped", "transfer_id": record.transfer_id},
+            )
+            return False
+        with self._lock:
+            self.counters["submitted"] += 1
+            self._max_depth = max(self._max_depth, self._queue.qsize())
+        # Despues de encolar: un despachador inactivo solo termina con la cola vacia
+        self._ensure_started()
+        return True
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Esperar a que se escriba todo lo encolado; False si se agoto ``timeout``."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._queue.all_tasks_done.wait(remaining)
+        return True
+
+    def close(self, timeout: Optional[float] = 10.0) -> None:
+        """Escribir lo pendiente, detener el despachador y cerrar el destino."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+        _live_queues.discard(self)
+        if thread is None:
+            self.sink.close()
+            return
+        # El despachador cierra el destino al terminar (sqlite3 lo exige en su hilo)
+        self._queue.put(None)
+        thread.join(timeout)
+
+    def stats(self) -> Dict[str, Any]:
+        """Profundidad de la cola, contadores y tiempo de espera hasta la escritura."""
+        with self._lock:
+            written = self.counters["written"]
+            return {
+                "depth": self._queue.qsize(),
+                "max_depth": self._max_depth,
+                "capacity": self._queue.maxsize,
+                **self.counters,
+                "wait_mean": self._wait_total / written if written else 0.0,
+                "wait_max": self._wait_max,
+            }
+
+    def _ensure_started(self) -> None:
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._thread = threading.Thread(
+                target=self._dispatch, name="lazarus-handoff", daemon=True)
+            self._thread.start()
+        # Las transferencias pendientes se escriben tambien al salir del proceso
+        _live_queues.add(self)
+
+    def _dispatch(self) -> None:
+        stopping = False
+        while not stopping:
+            try:
+                item = self._queue.get(timeout=self.idle_timeout)
+            except queue.Empty:
+                with self._lock:
+                    if self._queue.empty():
+                        self._thread = None
+                        # Dentro del candado: un despachador nuevo no abre el
+                        # destino hasta que este termine de cerrarlo
+                        self.sink.close()
+                        return
+                continue
+            batch: List[Tuple[float, TransferRecord]] = []
+            taken = 1
+            if item is None:
+                stopping = True
+            else:
+                batch.append(item)
+            flush_at = time.monotonic() + self.flush_interval
+            while not stopping and len(batch) < self.batch_size:
+                remaining = flush_at - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                taken += 1
+                if item is None:
+                    stopping = True
+                else:
+                    batch.append(item)
+            if stopping:
+                # Vaciar lo que quede en la cola antes de terminar
+                while True:
+                    try:
+                        item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    taken += 1
+                    if item is not None:
+                        batch.append(item)
+            if batch:
+                self._write(batch)
+            for _ in range(taken):
+                self._queue.task_done()
+        self.sink.close()
+
+    def _write(self, batch: List[Tuple[float, TransferRecord]]) -> None:
+        records = [record for _, record in batch]
+        for attempt in range(1, self.max_write_attempts + 1):
+            try:
+                self.sink.write_batch(records)
+                break
+            except Exception as exc:
+                with self._lock:
+                    self.counters["write_errors"] += 1
+                if attempt == self.max_write_attempts:
+                    logger.error(
+                        "No se pudieron guardar %d transferencias: %s", len(records), exc,
+                        extra={"event": "handoff_write_error", "records": len(records)},
+                    )
+                    with self._lock:
+                        self.counters["failed"] += len(records)
+                    return
+                time.sleep(min(0.1 * 2 ** attempt, 2.0))
+
+        now = time.monotonic()
+        with self._lock:
+            self.counters["written"] += len(records)
+            self.counters["batches"] += 1
+            for enqueued_at, _ in batch:
+                wait = now - enqueued_at
+                self._wait_total += wait
+                self._wait_max = max(self._wait_max, wait)
+
+
+__all__ = [
+    "HANDOFF_DB_NAME",
+    "HandoffQueue",
+    "HandoffSink",
+    "JSONLinesHandoffSink",
+    "SQLiteHandoffSink",
+    "handoff_db_path",
+]
@@ -0,0 +1,252 @@
+"""Limitador compartido para las llamadas LLM.
+
+Combina un limite de concurrencia adaptativo (AIMD), un token bucket,
+reintentos con backoff exponencial y jitter para errores de limite de
+velocidad y timeout, y un presupuesto de tiempo por llamada.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, TypeVar
+
+from .errors import classify_llm_exception
+
+T = TypeVar("T")
+
+
+class LLMDeadlineExceeded(TimeoutError):
+    """Se agoto el presupuesto de tiempo de una llamada LLM (esperas y reintentos incluidos)."""
+
+
+class LLMLimiter:
+    """Limitador seguro entre hilos y corutinas para ``answer_chain``/``transfer_chain``.
+
+    - Concurrencia: como maximo ``limit`` llamadas en vuelo. El limite crece
+      ``1/limit`` por cada exito y se multiplica por ``decrease_factor`` cuando
+      el proveedor responde con rate limit o timeout (AIMD).
+    - Token bucket: ``rate`` intentos por segundo con rafagas de ``burst``
+      (``rate=None`` lo desactiva).
+    - Reintentos: solo para las categorias de ``RETRYABLE_KINDS``, con
+      backoff exponencial y jitter completo, sin exceder ``deadline``.
+    """
+
+    RETRYABLE_KINDS = frozenset({"rate_limit", "timeout"})
+    PUSHBACK_KINDS = frozenset({"rate_limit", "timeout"})
+
+    def __init__(
+        self,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        rate: Optional[float] = 10.0,
+        burst: int = 20,
+        max_retries: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline: float = 30.0,
+        decrease_factor: float = 0.5,
+        decrease_cooldown: float = 1.0,
+        classify: Callable[[BaseException], str] = classify_llm_exception,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.decrease_factor = decrease_factor
+        self.decrease_cooldown = decrease_cooldown
+        self.classify = classify
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._tokens = float(burst)
+        self._refilled_at = clock()
+        self._last_decrease = float("-inf")
+        self.counters: Dict[str, int] = {
+            "calls": 0,
+            "retries": 0,
+            "pushbacks": 0,
+            "deadline_exceeded": 0,
+        }
+
+    # -- estado -------------------------------------------------------------
+
+    @property
+    def effective_limit(self) -> int:
+        return max(self.min_concurrency, int(self.limit))
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "limit": self.limit,
+                "in_flight": self.in_flight,
+                "tokens": self._tokens,
+                **self.counters,
+            }
+
+    def _refill(self, now: float) -> None:
+        if self.rate is None:
+            return
+        elapsed = now - self._refilled_at
+        self._tokens = min(float(self.burst), self._tokens + elapsed * self.rate)
+        self._refilled_at = now
+
+    def _try_acquire(self, now: float) -> Optional[float]:
+        """Tomar un cupo; devuelve 0.0 si lo consiguio, los segundos hasta el
+        siguiente token, o None si hay que esperar a que se libere un cupo."""
+        if self.in_flight >= self.effective_limit:
+            return None
+        self._refill(now)
+        if self.rate is not None:
+            if self._tokens < 1:
+                return (1 - self._tokens) / self.rate
+            self._tokens -= 1
+        self.in_flight += 1
+        return 0.0
+
+    def _release(self, kind: Optional[str]) -> None:
+        """Liberar el cupo y ajustar el limite (``kind=None`` indica exito)."""
+        with self._cond:
+            self.in_flight -= 1
+            if kind is None:
+                self.limit = min(float(self.max_concurrency), self.limit + 1.0 / self.limit)
+            elif kind in self.PUSHBACK_KINDS:
+                self.counters["pushbacks"] += 1
+                now = self._clock()
+                # Una sola reduccion por rafaga de errores simultaneos
+                if now - self._last_decrease >= self.decrease_cooldown:
+                    self.limit = max(float(self.min_concurrency), self.limit * self.decrease_factor)
+                    self._last_decrease = now
+            self._cond.notify_all()
+
+    def _deadline_exceeded(self) -> LLMDeadlineExceeded:
+        with self._cond:
+            self.counters["deadline_exceeded"] += 1
+        return LLMDeadlineExceeded(
+            f"LLM call timed out: presupuesto de {self.deadline:.1f}s agotado")
+
+    def _retry_delay(self, attempt: int, kind: str, deadline_at: float) -> Optional[float]:
+        """Espera antes del siguiente intento, o None si no se debe reintentar."""
+        if kind not in self.RETRYABLE_KINDS or attempt >= self.max_retries:
+            return None
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if self._clock() + delay >= deadline_at:
+            return None
+        with self._cond:
+            self.counters["retries"] += 1
+        return delay
+
+    # -- API sincrona -------------------------------------------------------
+
+    def _acquire(self, deadline_at: float) -> None:
+        with self._cond:
+            while True:
+                now = self._clock()
+                wait = self._try_acquire(now)
+                if wait == 0.0:
+                    self.counters["calls"] += 1
+                    return
+                remaining = deadline_at - now
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining if wait is None else min(wait, remaining))
+        raise self._deadline_exceeded()
+
+    def call(self, fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+        """Ejecutar ``fn`` respetando el limite, con reintentos y presupuesto de tiempo.
+
+        Una llamada sincrona en curso no se puede interrumpir: el presupuesto
+        acota la espera por cupo y los reintentos.
+        """
+        deadline_at = self._clock() + self.deadline
+        attempt = 0
+        while True:
+            self._acquire(deadline_at)
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as exc:
+                kind = self.classify(exc)
+                self._release(kind)
+                delay = self._retry_delay(attempt, kind, deadline_at)
+                if delay is None:
+                    raise
+                attempt += 1
+                time.sleep(delay)
+                continue
+            self._release(None)
+            return result
+
+    # -- API asincrona ------------------------------------------------------
+
+    async def _aacquire(self, deadline_at: float) -> None:
+        while True:
+            with self._cond:
+                now = self._clock()
+                wait = self._try_acquire(now)
+                if wait == 0.0:
+                    self.counters["calls"] += 1
+                    return
+            remaining = deadline_at - now
+            if remaining <= 0:
+                raise self._deadline_exceeded()
+            # Sin notificaciones entre hilos y el loop: se sondea con un intervalo corto
+            await asyncio.sleep(min(0.05 if wait is None else wait, remaining))
+
+    async def acall(self, fn: Callable[..., Awaitable[T]], *args: Any, **kwargs: Any) -> T:
+        """Version asincrona de ``call``; cada intento se cancela al agotarse el presupuesto."""
+        deadline_at = self._clock() + self.deadline
+        attempt = 0
+        while True:
+            await self._aacquire(deadline_at)
+            try:
+                async with asyncio.timeout(max(deadline_at - self._clock(), 0)) as scope:
+                    result = await fn(*args, **kwargs)
+            except TimeoutError as exc:
+                if scope.expired():
+                    self._release("timeout")
+                    raise self._deadline_exceeded() from exc
+                kind = self.classify(exc)
+                self._release(kind)
+                delay = self._retry_delay(attempt, kind, deadline_at)
+                if delay is None:
+                    raise
+            except Exception as exc:
+                kind = self.classify(exc)
+                self._release(kind)
+                delay = self._retry_delay(attempt, kind, deadline_at)
+                if delay is None:
+                    raise
+            except BaseException:
+                # Cancelacion externa (p. ej. short_circuit): solo liberar el cupo
+                self._release("cancelled")
+                raise
+            else:
+                self._release(None)
+                return result
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    @asynccontextmanager
+    async def areserve(self) -> AsyncIterator[None]:
+        """Ocupar un cupo durante una llamada que no se puede reintentar (streaming)."""
+        await self._aacquire(self._clock() + self.deadline)
+        kind: Optional[str] = "cancelled"
+        try:
+            yield
+            kind = None
+        except Exception as exc:
+            kind = self.classify(exc)
+            raise
+        finally:
+            self._release(kind)
+
+
+__all__ = ["LLMDeadlineExceeded", "LLMLimiter"]
@@ -0,0 +1,199 @@
+"""Registro estructurado y no bloqueante para Lazarus.
+
+Los modulos de ``lazarus_core`` y ``lazarus_kb`` solo usan
+``logging.getLogger(__name__)`` con un campo ``event`` en ``extra``; las
+aplicaciones llaman una vez a ``configure_logging``. Los hilos de las
+solicitudes solo encolan el registro y un ``QueueListener`` en segundo plano
+lo formatea y lo escribe, de modo que nunca esperan a la consola. Con la cola
+llena el registro se descarta y se cuenta.
+"""
+
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterable, Mapping, Optional, TextIO, Union
+
+LOGGERS = ("lazarus_core", "lazarus_kb", "lazarus_apps")
+TEXT_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+# Atributos propios de LogRecord; el resto proviene de ``extra``
+_RECORD_ATTRIBUTES = frozenset(
+    vars(logging.LogRecord("", 0, "", 0, "", (), None))
+) | {"message", "asctime", "taskName"}
+_TRACEBACKS = logging.Formatter()
+
+
+class JSONFormatter(logging.Formatter):
+    """Una linea JSON por registro con los campos de ``extra``."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload: Dict[str, Any] = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                payload[key] = value
+        if record.exc_info:
+            payload["exc"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exc"] = record.exc_text
+        return json.dumps(payload, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Deja pasar una fraccion de los registros de cada ``event`` configurado.
+
+    Con tasa 0.1 se conserva uno de cada diez registros del evento (de forma
+    determinista); los eventos sin tasa pasan siempre. Los registros
+    conservados llevan ``sample_rate`` para reescalar los conteos.
+    """
+
+    def __init__(self, rates: Mapping[str, float]) -> None:
+        super().__init__()
+        self.rates = {event: min(max(rate, 0.0), 1.0) for event, rate in rates.items()}
+        self._seen: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        event = getattr(record, "event", None)
+        rate = self.rates.get(event) if event is not None else None
+        if rate is None or rate >= 1.0:
+            return True
+        if rate <= 0.0:
+            return False
+        with self._lock:
+            seen = self._seen.get(event, 0)
+            self._seen[event] = seen + 1
+        if seen % max(1, round(1 / rate)):
+            return False
+        record.sample_rate = rate
+        return True
+
+
+class DroppingQueueHandler(logging.handlers.QueueHandler):
+    """``QueueHandler`` que descarta (y cuenta) en lugar de bloquear si la cola esta llena."""
+
+    def __init__(self, log_queue: "queue.Queue[Any]") -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Como la base, pero la traza queda en ``exc_text`` y no dentro del mensaje
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        if record.exc_info:
+            record.exc_text = _TRACEBACKS.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            # Varios hilos pueden descartar a la vez
+            with self._dropped_lock:
+                self.dropped += 1
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Convertir ``"transfer=0.1,llm_failure=0.5"`` en un mapa evento -> tasa."""
+    rates: Dict[str, float] = {}
+    for item in spec.split(","):
+        event, separator, rate = item.partition("=")
+        if not separator or not event.strip():
+            continue
+        try:
+            rates[event.strip()] = float(rate)
+        except ValueError:
+            continue
+    return rates
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_handler: Optional[DroppingQueueHandler] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging(
+    level: Union[int, str, None] = None,
+    fmt: Optional[str] = None,
+    sample_rates: Optional[Mapping[str, float]] = None,
+    stream: Optional[TextIO] = None,
+    queue_size: int = 10000,
+    loggers: Iterable[str] = LOGGERS,
+) -> DroppingQueueHandler:
+    """Enviar los registros de Lazarus a ``stream`` a traves de una cola.
+
+    Sin argumentos usa ``LAZARUS_LOG_LEVEL`` (INFO), ``LAZARUS_LOG_FORMAT``
+    (``json`` o ``text``; json por defecto) y ``LAZARUS_LOG_SAMPLE``
+    (p. ej. ``transfer=0.1``). Llamarla de nuevo reemplaza la configuracion
+    anterior. Devuelve el handler de la cola (``dropped`` cuenta descartes).
+    """
+    global _listener, _handler
+
+    level = level if level is not None else os.getenv("LAZARUS_LOG_LEVEL", "INFO")
+    if isinstance(level, str):
+        level = level.upper()
+    fmt = (fmt or os.getenv("LAZARUS_LOG_FORMAT", "json")).lower()
+    if sample_rates is None:
+        sample_rates = parse_sample_rates(os.getenv("LAZARUS_LOG_SAMPLE", ""))
+
+    output = logging.StreamHandler(stream or sys.stderr)
+    output.setFormatter(JSONFormatter() if fmt == "json" else logging.Formatter(TEXT_FORMAT))
+
+    log_queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+    handler = DroppingQueueHandler(log_queue)
+    if sample_rates:
+        handler.addFilter(SamplingFilter(sample_rates))
+    listener = logging.handlers.QueueListener(log_queue, output, respect_handler_level=True)
+
+    with _configure_lock:
+        previous_listener, previous_handler = _listener, _handler
+        for name in loggers:
+            logger = logging.getLogger(name)
+            if previous_handler is not None:
+                logger.removeHandler(previous_handler)
+            logger.addHandler(handler)
+            logger.setLevel(level)
+            logger.propagate = False
+        listener.start()
+        _listener, _handler = listener, handler
+
+    if previous_listener is not None:
+        previous_listener.stop()
+    return handler
+
+
+def shutdown_logging() -> None:
+    """Escribir los registros pendientes y detener el hilo de salida."""
+    global _listener
+    with _configure_lock:
+        listener, _listener = _listener, None
+    if listener is not None:
+        listener.stop()
+
+
+atexit.register(shutdown_logging)
+
+
+__all__ = [
+    "DroppingQueueHandler",
+    "JSONFormatter",
+    "SamplingFilter",
+    "configure_logging",
+    "parse_sample_rates",
+    "shutdown_logging",
+]
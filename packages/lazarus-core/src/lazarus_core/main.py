@@ -1,12 +1,16 @@
+import os
+
 from dotenv import load_dotenv
 
 from .bot import LazarusChatbot
+from .logs import configure_logging
 
 
 def main() -> None:
     """Punto de entrada de linea de comandos para el chatbot."""
 
     load_dotenv()
+    configure_logging(fmt=os.getenv("LAZARUS_LOG_FORMAT", "text"))
     LazarusChatbot().chat()
 
 
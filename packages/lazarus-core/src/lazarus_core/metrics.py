@@ -0,0 +1,256 @@
+"""Instrumentacion del flujo de respuesta: tramos por etapa y contadores.
+
+Por defecto el chatbot usa ``NOOP`` y la medicion no cuesta nada. Con un
+``MetricsRegistry`` se acumulan histogramas de duracion por etapa y
+contadores (tokens, caches, transferencias, errores LLM y de cada etapa) que se exportan en
+el formato de texto de Prometheus. Otros backends (p. ej. OpenTelemetry)
+pueden heredar de ``Instrumentation`` y recibir cada tramo.
+"""
+
+import bisect
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple, Union
+
+Labels = Tuple[Tuple[str, str], ...]
+GaugeValue = Union[float, Mapping[Labels, float]]
+
+
+class Instrumentation:
+    """Ganchos de instrumentacion; la implementacion base no hace nada."""
+
+    enabled = False
+
+    def stage_finished(
+        self,
+        stage: str,
+        started_at: float,
+        seconds: float,
+        error: Optional[str] = None,
+    ) -> None:
+        """Fin de un tramo: ``started_at`` es la hora de inicio (``time.time()``)
+        y ``error`` el tipo de excepcion si el tramo fallo."""
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        """Sumar ``value`` al contador ``name`` con las etiquetas dadas."""
+
+
+NOOP = Instrumentation()
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopStage":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> bool:
+        return False
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+class _Stage:
+    """Tramo medido; acumula su duracion en ``timings`` si se pide el desglose."""
+
+    __slots__ = ("instrumentation", "stage", "timings", "started", "started_at")
+
+    def __init__(self, instrumentation: Instrumentation, stage: str,
+                 timings: Optional[Dict[str, float]]) -> None:
+        self.instrumentation = instrumentation
+        self.stage = stage
+        self.timings = timings
+
+    def __enter__(self) -> "_Stage":
+        self.started_at = time.time()
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type: Any, exc: Any, tb: Any) -> bool:
+        seconds = time.perf_counter() - self.started
+        if self.timings is not None:
+            self.timings[self.stage] = self.timings.get(self.stage, 0.0) + seconds
+        self.instrumentation.stage_finished(
+            self.stage, self.started_at, seconds,
+            None if exc_type is None else exc_type.__name__,
+        )
+        return False
+
+
+def timed_stage(instrumentation: Instrumentation, stage: str,
+                timings: Optional[Dict[str, float]] = None) -> Any:
+    """Context manager que mide ``stage``; sin instrumentacion ni desglose no mide nada."""
+    if timings is None and not instrumentation.enabled:
+        return _NOOP_STAGE
+    return _Stage(instrumentation, stage, timings)
+
+
+def _labels(labels: Mapping[str, str]) -> Labels:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Labels, extra: Labels = ()) -> str:
+    pairs = labels + extra
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class MetricsRegistry(Instrumentation):
+    """Histogramas y contadores en memoria, seguros entre hilos."""
+
+    enabled = True
+
+    # Limites superiores (segundos) de los buckets de duracion
+    BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+               1.0, 2.5, 5.0, 10.0, 30.0)
+
+    HELP = {
+        "stage_duration_seconds": "Duracion de cada etapa del flujo de respuesta",
+        "stage_errors": "Etapas que terminaron con una excepcion, por etapa y tipo",
+        "llm_tokens": "Tokens consumidos por etapa LLM",
+        "cache_lookups": "Consultas a las caches de respuestas por resultado",
+        "transfers": "Transferencias a agente humano por motivo",
+        "llm_errors": "Errores LLM por etapa y categoria",
+        "answers": "Respuestas por fuente",
+    }
+
+    def __init__(self, namespace: str = "lazarus",
+                 buckets: Optional[Tuple[float, ...]] = None) -> None:
+        self.namespace = namespace
+        self.buckets = tuple(buckets or self.BUCKETS)
+        self._lock = threading.Lock()
+        # etapa -> (conteos por bucket, suma, total)
+        self._histograms: Dict[str, List[Any]] = {}
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Tuple[str, Callable[[], GaugeValue]]] = {}
+
+    def stage_finished(
+        self,
+        stage: str,
+        started_at: float,
+        seconds: float,
+        error: Optional[str] = None,
+    ) -> None:
+        position = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][position] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+            if error is not None:
+                series = self._counters.setdefault("stage_errors", {})
+                key = (("error", error), ("stage", stage))
+                series[key] = series.get(key, 0.0) + 1
+
+    def increment(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = _labels(labels)
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def register_gauge(self, name: str, help_text: str,
+                       callback: Callable[[], GaugeValue]) -> None:
+        """Gauge leido al exportar: ``callback`` devuelve un valor o un mapa etiquetas -> valor."""
+        with self._lock:
+            self._gauges[name] = (help_text, callback)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Copia de los histogramas (con cuantiles aproximados) y contadores."""
+        with self._lock:
+            stages = {
+                stage: {
+                    "count": count,
+                    "sum": total,
+                    "mean": total / count if count else 0.0,
+                    "p50": self._quantile(buckets, count, 0.50),
+                    "p95": self._quantile(buckets, count, 0.95),
+                    "p99": self._quantile(buckets, count, 0.99),
+                }
+                for stage, (buckets, total, count) in self._histograms.items()
+            }
+            counters = {
+                name: {
+                    ",".join(f"{key}={value}" for key, value in labels): total
+                    for labels, total in series.items()
+                }
+                for name, series in self._counters.items()
+            }
+        return {"stages": stages, "counters": counters}
+
+    def _quantile(self, buckets: List[int], count: int, fraction: float) -> Optional[float]:
+        """Limite superior del bucket que contiene el cuantil (None si excede el ultimo)."""
+        if not count:
+            return None
+        rank = fraction * count
+        seen = 0
+        for bound, bucket_count in zip(self.buckets, buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return bound
+        return None
+
+    def render_prometheus(self) -> str:
+        """Metricas en el formato de texto de Prometheus (version 0.0.4)."""
+        prefix = self.namespace + "_"
+        lines: List[str] = []
+        with self._lock:
+            histograms = {stage: (list(b), s, c) for stage, (b, s, c) in self._histograms.items()}
+            counters = {name: dict(series) for name, series in self._counters.items()}
+            gauges = dict(self._gauges)
+
+        if histograms:
+            name = prefix + "stage_duration_seconds"
+            lines.append(f"# HELP {name} {self.HELP['stage_duration_seconds']}")
+            lines.append(f"# TYPE {name} histogram")
+            for stage, (buckets, total, count) in sorted(histograms.items()):
+                labels = (("stage", stage),)
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float("inf"),), buckets):
+                    cumulative += bucket_count
+                    le = (("le", _format_value(bound)),)
+                    lines.append(f"{name}_bucket{_format_labels(labels, le)} {cumulative}")
+                lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{name}_count{_format_labels(labels)} {count}")
+
+        for counter, series in sorted(counters.items()):
+            name = f"{prefix}{counter}_total"
+            lines.append(f"# HELP {name} {self.HELP.get(counter, counter)}")
+            lines.append(f"# TYPE {name} counter")
+            for labels, total in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(total)}")
+
+        for gauge, (help_text, callback) in sorted(gauges.items()):
+            try:
+                value = callback()
+            except Exception:
+                continue
+            name = prefix + gauge
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            series = value if isinstance(value, Mapping) else {(): value}
+            for labels, current in sorted(series.items()):
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(current)}")
+
+        return "\n".join(lines) + "\n"
+
+
+__all__ = [
+    "NOOP",
+    "Instrumentation",
+    "MetricsRegistry",
+    "timed_stage",
+]
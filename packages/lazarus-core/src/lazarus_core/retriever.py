@@ -1,31 +1,59 @@
-"""Modulos de recuperacion compatibles con DSPy."""
+"""Recuperacion de pasajes de FAQ para las cadenas DSPy.
 
-from typing import Dict, List, Optional
+No importa DSPy, para que el modo solo FAQ arranque sin cargarlo.
+"""
 
-import dspy
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence
 
-from lazarus_kb import FAQKnowledgeBase
+from lazarus_kb import FAQKnowledgeBase, SearchResult
 
+from .structures import Retrieval
 
-class FAQRetriever(dspy.Module):
-    """Recupera pasajes de la base de conocimiento de FAQ para DSPy."""
+if TYPE_CHECKING:
+    from .dspy_modules import FAQRetrieverModule
+
+
+class FAQRetriever:
+    """Recupera pasajes de la base de conocimiento de FAQ."""
 
     def __init__(self, knowledge_base: FAQKnowledgeBase, *, k: int = 1) -> None:
-        super().__init__()
         self.kb = knowledge_base
         self.k = k
 
-    def forward(self, query: str) -> dspy.Prediction:
-        match = self.kb.search(query)
-        passages: List[str] = []
-        metadata: Optional[Dict[str, str]] = None
+    def __call__(self, query: str) -> Retrieval:
+        return self.forward(query)
+
+    def as_dspy_module(self) -> "FAQRetrieverModule":
+        """``dspy.Module`` que devuelve ``dspy.Prediction`` (importa DSPy)."""
+        from .dspy_modules import FAQRetrieverModule
+
+        return FAQRetrieverModule(self)
+
+    def forward(self, query: str) -> Retrieval:
+        results = self.kb.search_top_k(query, k=self.k)
+        return self._to_retrieval(results)
+
+    def forward_many(self, queries: Sequence[str]) -> List[Retrieval]:
+        """Recuperar los pasajes de un lote de consultas en una sola pasada."""
+        results = self.kb.search_top_k_many(queries, k=self.k)
+        return [self._to_retrieval(query_results) for query_results in results]
+
+    @staticmethod
+    def _format_passage(faq: Dict[str, str]) -> str:
+        return (
+            f"Pregunta relacionada: {faq.get('pregunta', '')}\n"
+            f"Respuesta: {faq.get('respuesta', '')}"
+        )
+
+    def _to_retrieval(self, results: List[SearchResult]) -> Retrieval:
+        passages = [self._format_passage(result.faq) for result in results]
+        metadata: Optional[Dict[str, Any]] = None
 
-        if match:
-            formatted = (
-                f"Pregunta relacionada: {match.get('pregunta', '')}\n"
-                f"Respuesta: {match.get('respuesta', '')}"
-            )
-            passages.append(formatted)
-            metadata = match
+        if results:
+            # La mejor coincidencia conserva sus campos; se agregan las puntuaciones
+            metadata = dict(results[0].faq)
+            metadata["score"] = results[0].score
+            metadata["faq_id"] = results[0].faq_id
+            metadata["scores"] = [result.score for result in results]
 
-        return dspy.Prediction(passages=passages, metadata=metadata)
+        return Retrieval(passages=passages, metadata=metadata)
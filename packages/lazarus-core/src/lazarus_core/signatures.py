@@ -39,3 +39,25 @@ class TransferDecisionSignature(dspy.Signature):
         desc="Indica si se recomienda transferir (si/no)."
     )
     reason = dspy.OutputField(desc="Justificacion breve de la recomendacion.")
+
+
+class EarlyTransferDecisionSignature(dspy.Signature):
+    """Determina, antes de generar la respuesta, si la consulta requiere un agente humano."""
+
+    question = dspy.InputField(desc="Pregunta del usuario")
+    retrieved_passages = dspy.InputField(
+        desc="Resumen del resultado de busqueda o motivo de ausencia de contexto."
+    )
+    should_transfer = dspy.OutputField(
+        desc="Indica si se recomienda transferir (si/no)."
+    )
+    reason = dspy.OutputField(desc="Justificacion breve de la recomendacion.")
+
+
+class AnswerWithTransferSignature(CustomerServiceSignature):
+    """Genera la respuesta estructurada y decide en la misma llamada si se debe transferir."""
+
+    should_transfer = dspy.OutputField(
+        desc="Indica si la respuesta no basta y se recomienda transferir (si/no)."
+    )
+    reason = dspy.OutputField(desc="Justificacion breve de la recomendacion.")
@@ -0,0 +1,115 @@
+"""Deteccion de small talk (saludos, agradecimientos, cierres).
+
+``SmallTalkMatcher`` se compila una sola vez: las frases completas quedan en
+un conjunto y los prefijos en un trie, ambos en minusculas y sin acentos.
+Consultar cuesta lo mismo con veinte entradas que con miles: una busqueda en
+el conjunto y un recorrido del trie de a lo sumo ``max_prefix_length``
+caracteres.
+"""
+
+from typing import Any, Dict, Iterable, Set
+
+from lazarus_kb.normalization import fold_accents
+
+from .constants import SMALL_TALK_PHRASES, SMALL_TALK_PREFIXES
+
+# Los prefijos solo cuentan en textos cortos ("hola, como estas")
+PREFIX_MAX_LENGTH = 20
+
+# Clave de fin de prefijo en el trie (los caracteres son claves de longitud 1)
+_END = ""
+
+
+def normalize_small_talk(text: str) -> str:
+    lowered = text.lower().strip()
+    # El texto ASCII no tiene acentos: se evita la normalizacion Unicode
+    return lowered if lowered.isascii() else fold_accents(lowered)
+
+
+class SmallTalkMatcher:
+    """Reconoce small talk por frase completa o, en textos cortos, por prefijo.
+
+    Las entradas se agregan con ``add`` o ``load`` antes de compartir el
+    matcher entre hilos; ``matches`` solo lee.
+    """
+
+    def __init__(
+        self,
+        phrases: Iterable[str] = (),
+        prefixes: Iterable[str] = (),
+        max_prefix_length: int = PREFIX_MAX_LENGTH,
+    ) -> None:
+        self.max_prefix_length = max_prefix_length
+        self._phrases: Set[str] = set()
+        self._trie: Dict[str, Any] = {}
+        self._prefix_count = 0
+        self.add(phrases, prefixes)
+
+    @classmethod
+    def from_file(cls, path: str, include_defaults: bool = True,
+                  max_prefix_length: int = PREFIX_MAX_LENGTH) -> "SmallTalkMatcher":
+        """Matcher con el lexico de ``path`` (ver ``load``) sumado al predeterminado."""
+        if include_defaults:
+            matcher = cls(SMALL_TALK_PHRASES, SMALL_TALK_PREFIXES, max_prefix_length)
+        else:
+            matcher = cls(max_prefix_length=max_prefix_length)
+        matcher.load(path)
+        return matcher
+
+    def add(self, phrases: Iterable[str] = (), prefixes: Iterable[str] = ()) -> None:
+        for phrase in phrases:
+            normalized = normalize_small_talk(phrase)
+            if normalized:
+                self._phrases.add(normalized)
+        for prefix in prefixes:
+            normalized = normalize_small_talk(prefix)
+            if not normalized:
+                continue
+            node = self._trie
+            for char in normalized:
+                node = node.setdefault(char, {})
+            if _END not in node:
+                node[_END] = True
+                self._prefix_count += 1
+
+    def load(self, path: str) -> None:
+        """Agregar un lexico UTF-8: una entrada por linea, ``*`` al final marca
+        un prefijo y ``#`` inicia un comentario."""
+        phrases, prefixes = [], []
+        with open(path, encoding="utf-8") as handle:
+            for line in handle:
+                entry = line.split("#", 1)[0].strip()
+                if entry.endswith("*"):
+                    prefixes.append(entry[:-1])
+                elif entry:
+                    phrases.append(entry)
+        self.add(phrases, prefixes)
+
+    def matches(self, text: str) -> bool:
+        normalized = normalize_small_talk(text)
+        if normalized in self._phrases:
+            return True
+        if len(normalized) > self.max_prefix_length:
+            return False
+        node = self._trie
+        for char in normalized:
+            node = node.get(char)
+            if node is None:
+                return False
+            if _END in node:
+                return True
+        return False
+
+    def __len__(self) -> int:
+        return len(self._phrases) + self._prefix_count
+
+
+# Lexico predeterminado, compilado al importar
+DEFAULT_SMALL_TALK = SmallTalkMatcher(SMALL_TALK_PHRASES, SMALL_TALK_PREFIXES)
+
+
+__all__ = [
+    "DEFAULT_SMALL_TALK",
+    "SmallTalkMatcher",
+    "normalize_small_talk",
+]
@@ -1,6 +1,86 @@
 """Estructuras de datos utilizadas por el chatbot."""
-from dataclasses import dataclass
-from typing import Any, Dict
+import time
+import uuid
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Retrieval:
+    """Pasajes recuperados para una pregunta y metadatos de la mejor FAQ."""
+
+    passages: List[str] = field(default_factory=list)
+    metadata: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class LLMCall:
+    """Llamada pendiente a una cadena DSPy dentro de un flujo de respuesta."""
+
+    stage: str
+    chain: Any
+    kwargs: Dict[str, Any] = field(default_factory=dict)
+    # Si devuelve True para la prediccion, se cancelan las llamadas paralelas restantes
+    short_circuit: Optional[Callable[[Any], bool]] = None
+
+
+@dataclass
+class PipelineOutcome:
+    """Respuesta generada y decision de transferencia de un flujo LLM."""
+
+    answer: str
+    answer_error: Optional[Exception] = None
+    transfer_prediction: Any = None
+    should_transfer: bool = False
+    transfer_error: Optional[Exception] = None
+
+
+@dataclass
+class StreamEvent:
+    """Evento del streaming de respuestas: fragmento de texto o resultado final."""
+
+    text: str = ""
+    field: str = ""
+    result: Optional[Dict[str, Any]] = None
+
+    @property
+    def is_final(self) -> bool:
+        return self.result is not None
+
+
+@dataclass
+class TransferRecord:
+    """Solicitud de atencion humana encolada por ``_trigger_transfer``."""
+
+    question: str
+    reason: str
+    reason_kind: str
+    agent_context: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    transfer_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+@dataclass
+class BatchItem:
+    """Resultado de una pregunta dentro de ``answer_batch``."""
+
+    question: str
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[Exception] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "question": self.question,
+            "result": self.result,
+            "error": None if self.error is None else str(self.error),
+        }
 
 
 @dataclass
@@ -12,12 +92,17 @@ class ChatResult:
     source: str = "knowledge_base"
     transfer_to_agent: bool = False
     transfer_reason: str = ""
+    # Segundos por etapa; solo con ``collect_timings=True``
+    timings: Optional[Dict[str, float]] = None
 
     def to_dict(self) -> Dict[str, Any]:
-        return {
+        data = {
             "question": self.question,
             "answer": self.answer,
             "source": self.source,
             "transfer_to_agent": self.transfer_to_agent,
             "transfer_reason": self.transfer_reason,
         }
+        if self.timings is not None:
+            data["timings"] = dict(self.timings)
+        return data
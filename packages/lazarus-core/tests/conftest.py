@@ -0,0 +1,64 @@
+import os
+
+import dspy
+import pytest
+
+from benchmarks.fake_lm import FakeLM
+from lazarus_core import LazarusChatbot
+from lazarus_core.limiter import LLMLimiter
+from lazarus_kb import FAQKnowledgeBase
+
+FAQ_CSV = os.path.join(os.path.dirname(__file__), "..", "..", "..", "data_limpia", "faq_limpio.csv")
+
+
+@pytest.fixture
+def faq_csv(tmp_path):
+    """Copia del CSV de ejemplo, para no escribir snapshots junto al original."""
+    path = tmp_path / "faq.csv"
+    with open(FAQ_CSV, encoding="utf-8") as source:
+        path.write_text(source.read(), encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def kb(faq_csv):
+    return FAQKnowledgeBase(faq_csv)
+
+
+@pytest.fixture
+def make_chatbot(faq_csv, monkeypatch, tmp_path):
+    """Fabrica de chatbots en modo solo FAQ (sin credenciales de LLM)."""
+    for name in ("DSPY_API_KEY", "DSPY_MODEL", "DSPY_API_BASE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("LAZARUS_HANDOFF_DB", str(tmp_path / "handoffs.sqlite3"))
+    bots = []
+
+    def make(**kwargs):
+        bot = LazarusChatbot(excel_file=faq_csv, **kwargs)
+        bots.append(bot)
+        return bot
+
+    yield make
+    for bot in bots:
+        bot.close()
+
+
+@pytest.fixture
+def chatbot(make_chatbot):
+    return make_chatbot()
+
+
+@pytest.fixture
+def make_llm_chatbot(make_chatbot):
+    """Fabrica de chatbots con LLM respondidos por un FakeLM, sin caches ni esperas."""
+
+    def make(lm=None, **kwargs):
+        kwargs.setdefault("answer_cache_size", 0)
+        kwargs.setdefault("llm_limiter", LLMLimiter(rate=None, base_delay=0.001, max_delay=0.001))
+        bot = make_chatbot(api_key="test", model="openai/test", **kwargs)
+        lm = lm or FakeLM(latency=0.0)
+        # Despues de crear el bot: _configure_dspy configura su propio dspy.LM
+        dspy.settings.configure(lm=lm)
+        return bot, lm
+
+    return make
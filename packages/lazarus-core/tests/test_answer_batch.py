@@ -0,0 +1,102 @@
+"""``answer_batch``: orden de resultados, errores por pregunta y pool de hilos."""
+
+import asyncio
+import threading
+
+import pytest
+
+from benchmarks.fake_lm import FakeLM
+
+QUESTIONS = [
+    "¿Cuál es la capital de Francia?",  # LLM: termina despues que las demas
+    "¿Qué es ADMIX IM-1?",             # FAQ encontrada
+    "hola",                             # small talk
+    "¿Quién ganó el mundial de 1950?",  # LLM
+    "gracias",
+]
+
+
+def fail_on(bot, monkeypatch, bad_question):
+    is_small_talk = bot._is_small_talk
+
+    def check(question):
+        if question == bad_question:
+            raise RuntimeError("fallo inesperado")
+        return is_small_talk(question)
+
+    monkeypatch.setattr(bot, "_is_small_talk", check)
+
+
+@pytest.mark.parametrize("mode", ["sequential", "parallel"])
+def test_results_keep_the_order_of_the_questions(make_llm_chatbot, mode):
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.02), pipeline_mode=mode)
+    expected = [bot.answer(q) for q in QUESTIONS]
+
+    items = bot.answer_batch(QUESTIONS)
+
+    assert [item.question for item in items] == QUESTIONS
+    assert all(item.ok for item in items)
+    assert [item.result for item in items] == expected
+
+
+def test_a_failing_question_does_not_abort_the_batch(make_llm_chatbot, monkeypatch):
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.0))
+    fail_on(bot, monkeypatch, "boom")
+    questions = QUESTIONS[:2] + ["boom"] + QUESTIONS[2:]
+
+    items = bot.answer_batch(questions)
+
+    assert [item.ok for item in items] == [True, True, False, True, True, True]
+    assert isinstance(items[2].error, RuntimeError)
+    assert items[2].to_dict() == {"question": "boom", "result": None, "error": "fallo inesperado"}
+    assert items[1].result["source"] != "transfer"
+
+
+def test_running_loop_falls_back_to_a_thread_pool(make_llm_chatbot, monkeypatch):
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.0))
+    expected = [bot.answer(q) for q in QUESTIONS]
+    fail_on(bot, monkeypatch, "boom")
+    threads = set()
+    run_batch_item = bot._run_batch_item
+
+    def record(question, flow):
+        threads.add(threading.current_thread().name)
+        return run_batch_item(question, flow)
+
+    monkeypatch.setattr(bot, "_run_batch_item", record)
+
+    async def from_a_coroutine():
+        # ``asyncio.run`` no se puede anidar: se usa el pool de hilos
+        return bot.answer_batch(QUESTIONS + ["boom"], max_workers=2)
+
+    items = asyncio.run(from_a_coroutine())
+
+    assert [item.result for item in items[:-1]] == expected
+    assert not items[-1].ok
+    assert threads and all(name.startswith("lazarus-batch") for name in threads)
+
+
+def test_async_batch_limits_questions_in_flight(make_llm_chatbot):
+    lm = FakeLM(latency=0.02)
+    bot, _ = make_llm_chatbot(lm)
+    peak = 0
+    aforward = lm.aforward
+
+    async def tracked(*args, **kwargs):
+        nonlocal peak
+        tracked.active += 1
+        peak = max(peak, tracked.active)
+        try:
+            return await aforward(*args, **kwargs)
+        finally:
+            tracked.active -= 1
+
+    tracked.active = 0
+    lm.aforward = tracked
+    questions = [f"pregunta sin respuesta numero {i}" for i in range(6)]
+
+    items = asyncio.run(bot.aanswer_batch(questions, max_workers=2))
+
+    assert all(item.ok for item in items)
+    assert all(item.result["source"] == "LLM" for item in items)
+    assert peak == 2
@@ -0,0 +1,94 @@
+"""``aanswer`` recorre el mismo flujo que ``answer`` y comparte limitador y breaker."""
+
+import asyncio
+
+import pytest
+
+from benchmarks.fake_lm import FakeLM
+from lazarus_core.breaker import CLOSED, OPEN, CircuitBreaker
+from lazarus_core.limiter import LLMLimiter
+
+QUESTIONS = [
+    "¿Qué es ADMIX IM-1?",             # FAQ encontrada
+    "¿Cuál es la capital de Francia?",  # sin FAQ: respuesta del LLM
+    "hola",                             # small talk
+]
+
+SCENARIOS = {
+    "ok": {},
+    "transfer": {"transfer_rate": 1.0},
+    "rate_limit": {"error_rate": 1.0, "error_kind": "rate_limit"},
+    "auth": {"error_rate": 1.0, "error_kind": "auth"},
+}
+
+
+@pytest.mark.parametrize("mode", ["sequential", "parallel", "merged"])
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_async_and_sync_paths_give_the_same_result(make_llm_chatbot, mode, scenario):
+    results = {}
+    for path in ("sync", "async"):
+        # Un bot por camino: el breaker y el limitador empiezan en el mismo estado
+        bot, _ = make_llm_chatbot(FakeLM(latency=0.0, **SCENARIOS[scenario]),
+                                  pipeline_mode=mode)
+        if path == "sync":
+            results[path] = [bot.answer(q) for q in QUESTIONS]
+        else:
+            results[path] = [asyncio.run(bot.aanswer(q)) for q in QUESTIONS]
+
+    assert results["async"] == results["sync"]
+
+
+def test_async_retries_go_through_the_limiter(make_llm_chatbot):
+    limiter = LLMLimiter(rate=None, max_retries=2, base_delay=0.001, max_delay=0.001)
+    bot, lm = make_llm_chatbot(FakeLM(latency=0.0, error_rate=1.0), llm_limiter=limiter)
+
+    result = asyncio.run(bot.aanswer(QUESTIONS[1]))
+
+    assert result["transfer_to_agent"]
+    assert limiter.stats()["retries"] == 2
+    assert limiter.stats()["in_flight"] == 0
+    assert lm.counters["errors"] == 3
+
+
+def test_async_failures_open_the_breaker_and_skip_the_llm(make_llm_chatbot):
+    breaker = CircuitBreaker(min_calls=2, window=4, reset_timeout=60.0)
+    bot, lm = make_llm_chatbot(FakeLM(latency=0.0, error_rate=1.0, error_kind="auth"),
+                               circuit_breaker=breaker)
+
+    async def ask_all():
+        return [await bot.aanswer(QUESTIONS[0]) for _ in range(3)]
+
+    first, second, third = asyncio.run(ask_all())
+
+    assert breaker.state == OPEN
+    assert first["source"] == second["source"] == "transfer"
+    calls = lm.counters["calls"]
+    # Circuito abierto: respuesta de la FAQ sin llamar al LLM
+    assert third["source"].startswith("FAQ")
+    assert not third["transfer_to_agent"]
+    assert lm.counters["calls"] == calls
+
+
+def test_async_success_closes_a_half_open_breaker(make_llm_chatbot):
+    now = [0.0]
+    breaker = CircuitBreaker(min_calls=1, window=1, reset_timeout=10.0, clock=lambda: now[0])
+    bot, _ = make_llm_chatbot(circuit_breaker=breaker)
+    breaker.record_failure("rate_limit")
+    now[0] += 10.0
+
+    result = asyncio.run(bot.aanswer(QUESTIONS[1]))
+
+    assert result["source"] == "LLM"
+    assert breaker.state == CLOSED
+
+
+def test_async_deadline_cancels_a_slow_call(make_llm_chatbot):
+    limiter = LLMLimiter(rate=None, deadline=0.05, base_delay=0.001, max_delay=0.001)
+    bot, _ = make_llm_chatbot(FakeLM(latency=1.0), llm_limiter=limiter)
+
+    result = asyncio.run(bot.aanswer(QUESTIONS[1]))
+
+    assert result["transfer_to_agent"]
+    assert "IA tardo" in result["answer"]
+    assert limiter.stats()["deadline_exceeded"] == 1
+    assert limiter.stats()["in_flight"] == 0
@@ -0,0 +1,110 @@
+"""Circuit breaker del LLM: pruebas en semiabierto y errores que no son del proveedor."""
+
+import dspy
+
+from benchmarks.fake_lm import FakeLM, RateLimitError
+from lazarus_core.breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+QUESTION = "¿Cuál es la capital de Francia?"
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_half_open_probe_survives_semantic_cache_hit(make_chatbot):
+    clock = Clock()
+    breaker = CircuitBreaker(min_calls=1, window=1, reset_timeout=10.0, clock=clock)
+    bot = make_chatbot(
+        api_key="test", model="openai/test", answer_cache_size=0,
+        semantic_cache_size=8, circuit_breaker=breaker,
+    )
+    lm = FakeLM(latency=0.0)
+    dspy.settings.configure(lm=lm)
+    assert bot.kb.search(QUESTION) is None
+
+    first = bot.answer(QUESTION)
+    assert first["source"] == "LLM"
+    calls = lm.counters["calls"]
+
+    breaker.record_failure("rate_limit")
+    clock.now += breaker.reset_timeout
+    assert breaker.state == HALF_OPEN
+
+    second = bot.answer(QUESTION)
+
+    assert second["answer"] == first["answer"]
+    assert lm.counters["calls"] == calls
+    # La respuesta salio de la cache: la prueba sigue disponible para una llamada LLM
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow_request()
+
+
+class ErrorLM(FakeLM):
+    """Falla siempre con la excepcion indicada"""
+
+    def __init__(self, error: Exception) -> None:
+        super().__init__(latency=0.0, error_rate=1.0)
+        self.error = error
+
+    def _respond(self, plan, request):
+        raise self.error
+
+
+def test_ignored_errors_do_not_count_as_successes():
+    breaker = CircuitBreaker(min_calls=3, window=10)
+    breaker.record_failure("rate_limit")
+    breaker.record_failure("rate_limit")
+    for _ in range(5):
+        breaker.record_failure("generic")
+
+    assert breaker.snapshot()["window_calls"] == 2
+    breaker.record_failure("timeout")
+    assert breaker.state == OPEN
+
+
+def test_ignored_error_on_a_half_open_probe_keeps_the_circuit_half_open():
+    clock = Clock()
+    breaker = CircuitBreaker(min_calls=1, window=1, reset_timeout=10.0, clock=clock)
+    breaker.record_failure("rate_limit")
+    clock.now += breaker.reset_timeout
+
+    assert breaker.allow_request()
+    assert not breaker.allow_request()
+    breaker.record_failure("generic")
+
+    assert breaker.state == HALF_OPEN
+    # La prueba se devolvio: la siguiente solicitud decide el estado
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+
+
+def test_bot_classifies_errors_by_type_like_the_limiter(make_llm_chatbot):
+    breaker = CircuitBreaker(min_calls=10)
+    # El mensaje no dice nada; solo el tipo identifica un 429
+    bot, _ = make_llm_chatbot(ErrorLM(RateLimitError("slow down")), circuit_breaker=breaker)
+
+    result = bot.answer(QUESTION)
+
+    assert result["transfer_to_agent"]
+    assert result["transfer_reason"] == bot._technical_reason_for_kind("rate_limit")
+    assert breaker.snapshot()["failures_by_kind"] == {"rate_limit": 1}
+
+
+def test_unclassified_llm_error_does_not_close_a_half_open_circuit(make_llm_chatbot):
+    clock = Clock()
+    breaker = CircuitBreaker(min_calls=1, window=1, reset_timeout=10.0, clock=clock)
+    bot, _ = make_llm_chatbot(ErrorLM(ValueError("salida invalida")), circuit_breaker=breaker)
+    breaker.record_failure("rate_limit")
+    clock.now += breaker.reset_timeout
+
+    result = bot.answer(QUESTION)
+
+    assert result["transfer_to_agent"]
+    assert breaker.state == HALF_OPEN
+    assert breaker.snapshot()["window_calls"] == 1
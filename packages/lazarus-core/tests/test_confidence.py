@@ -0,0 +1,27 @@
+"""Respuesta directa (sin LLM) para coincidencias de alta confianza."""
+
+from lazarus_core.confidence import BAND_DIRECT, BAND_LLM, ConfidencePolicy
+
+
+def test_direct_answer_is_opt_in():
+    assert ConfidencePolicy().band(3.0) == BAND_LLM
+
+
+def test_one_word_query_does_not_take_direct_path_by_default(chatbot):
+    # Con el bono por consulta completa, una palabra clave puntua por encima de 1.0
+    match = chatbot.kb.search_top_k("lazarus", k=1)[0]
+    assert match.score >= 1.0
+
+    chatbot.answer("lazarus")
+
+    bands = chatbot.confidence_stats.snapshot()["bands"]
+    assert bands[BAND_DIRECT] == 0
+    assert bands[BAND_LLM] == 1
+
+
+def test_direct_path_with_explicit_threshold(make_chatbot):
+    bot = make_chatbot(direct_answer_threshold=1.0)
+
+    bot.answer("lazarus")
+
+    assert bot.confidence_stats.snapshot()["bands"][BAND_DIRECT] == 1
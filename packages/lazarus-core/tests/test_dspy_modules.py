@@ -0,0 +1,47 @@
+"""Adaptadores ``dspy.Module`` del chatbot y del recuperador."""
+
+import dspy
+
+from benchmarks.fake_lm import FakeLM
+
+
+def test_chatbot_module_exposes_chains_as_predictors(make_chatbot):
+    bot = make_chatbot(api_key="test", model="openai/test")
+    module = bot.as_dspy_module()
+
+    names = {name for name, _ in module.named_predictors()}
+
+    assert isinstance(module, dspy.Module)
+    assert names == {"answer_chain.predict", "transfer_chain.predict"}
+
+
+def test_chatbot_module_forward_returns_prediction(make_chatbot):
+    bot = make_chatbot(api_key="test", model="openai/test")
+    dspy.settings.configure(lm=FakeLM(latency=0.0))
+
+    prediction = bot.as_dspy_module()(question="¿Cuál es la capital de Francia?")
+
+    assert isinstance(prediction, dspy.Prediction)
+    assert prediction.source == "LLM"
+    assert prediction.answer
+
+
+def test_compiled_copy_has_its_own_chains_and_shares_the_chatbot(make_chatbot):
+    bot = make_chatbot(api_key="test", model="openai/test")
+    module = bot.as_dspy_module()
+
+    student = module.reset_copy()
+    student.answer_chain.predict.demos = [dspy.Example(question="q", answer="a")]
+
+    assert student.chatbot is bot
+    assert student.answer_chain is not bot.answer_chain
+    assert bot.answer_chain.predict.demos == []
+    assert student._bound_chatbot().answer_chain is student.answer_chain
+
+
+def test_retriever_module_returns_prediction(chatbot):
+    prediction = chatbot.retriever.as_dspy_module()("¿Qué es ADMIX IM-1?")
+
+    assert isinstance(prediction, dspy.Prediction)
+    assert prediction.passages
+    assert prediction.metadata["categoria"] == "Productos"
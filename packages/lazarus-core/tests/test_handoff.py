@@ -0,0 +1,150 @@
+"""Cola de transferencias: destinos, ubicacion de la base y ciclo de vida del hilo."""
+
+import asyncio
+import gc
+import sqlite3
+import threading
+import time
+import weakref
+
+import pytest
+
+from lazarus_core.handoff import HandoffQueue, HandoffSink, SQLiteHandoffSink, handoff_db_path
+from lazarus_core.structures import TransferRecord
+
+
+class ListSink(HandoffSink):
+    def __init__(self) -> None:
+        self.records = []
+        self.closed = 0
+
+    def write_batch(self, records):
+        self.records.extend(records)
+
+    def close(self) -> None:
+        self.closed += 1
+
+
+def test_sink_requires_write_batch():
+    with pytest.raises(TypeError):
+        HandoffSink()
+
+
+def test_default_db_lives_next_to_faq_csv(monkeypatch, tmp_path):
+    monkeypatch.delenv("LAZARUS_HANDOFF_DB", raising=False)
+    csv_path = str(tmp_path / "faq.csv")
+    assert handoff_db_path(csv_path) == str(tmp_path / "handoffs.sqlite3")
+
+    monkeypatch.setenv("LAZARUS_HANDOFF_DB", "/var/lib/lazarus/transfers.db")
+    assert handoff_db_path(csv_path) == "/var/lib/lazarus/transfers.db"
+
+
+def test_idle_queue_stops_its_thread_and_can_be_collected():
+    sink = ListSink()
+    handoff = HandoffQueue(sink, flush_interval=0.01, idle_timeout=0.05)
+    assert handoff.submit(TransferRecord("pregunta", "razon", "no_answer"))
+    assert handoff.flush(timeout=2.0)
+
+    deadline = time.monotonic() + 2.0
+    while handoff._thread is not None and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert handoff._thread is None
+    assert sink.closed == 1
+
+    # Una cola sin close() no queda retenida por el hilo ni por atexit
+    ref = weakref.ref(handoff)
+    del handoff
+    gc.collect()
+    assert ref() is None
+    assert len(sink.records) == 1
+
+
+def test_submit_after_idle_restarts_dispatcher():
+    sink = ListSink()
+    handoff = HandoffQueue(sink, flush_interval=0.01, idle_timeout=0.05)
+    handoff.submit(TransferRecord("uno", "razon", "no_answer"))
+    handoff.flush(timeout=2.0)
+    time.sleep(0.2)
+
+    handoff.submit(TransferRecord("dos", "razon", "no_answer"))
+    handoff.close()
+
+    assert [record.question for record in sink.records] == ["uno", "dos"]
+
+
+class SlowCloseSink(ListSink):
+    """Destino que tarda en cerrarse y anota el orden de escrituras y cierres"""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.events = []
+        self.closing = threading.Event()
+
+    def write_batch(self, records):
+        super().write_batch(records)
+        self.events.append("write")
+
+    def close(self) -> None:
+        self.closing.set()
+        time.sleep(0.1)
+        super().close()
+        self.events.append("close")
+
+
+def test_idle_close_finishes_before_a_new_dispatcher_writes():
+    sink = SlowCloseSink()
+    handoff = HandoffQueue(sink, flush_interval=0.01, idle_timeout=0.05)
+    handoff.submit(TransferRecord("uno", "razon", "no_answer"))
+    assert sink.closing.wait(2.0)
+
+    # Llega un registro mientras el despachador inactivo cierra el destino
+    handoff.submit(TransferRecord("dos", "razon", "no_answer"))
+    assert handoff.flush(timeout=2.0)
+
+    assert sink.events[:3] == ["write", "close", "write"]
+    handoff.close()
+
+
+def test_sqlite_sink_survives_idle_restarts(tmp_path):
+    sink = SQLiteHandoffSink(str(tmp_path / "handoffs.sqlite3"))
+    handoff = HandoffQueue(sink, flush_interval=0.0, idle_timeout=0.01)
+    for i in range(20):
+        handoff.submit(TransferRecord(f"pregunta {i}", "razon", "no_answer"))
+        time.sleep(0.01 * (i % 3))
+    handoff.close()
+
+    stats = handoff.stats()
+    assert stats["written"] == 20
+    assert stats["write_errors"] == 0
+    with sqlite3.connect(sink.path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM transfers").fetchone() == (20,)
+
+
+def test_full_queue_drops_without_waiting_inside_an_event_loop():
+    release = threading.Event()
+
+    class BlockedSink(ListSink):
+        def write_batch(self, records):
+            release.wait(5.0)
+            super().write_batch(records)
+
+    handoff = HandoffQueue(BlockedSink(), max_size=1, flush_interval=0.0, put_timeout=5.0)
+    # El despachador queda escribiendo el primero; el segundo llena la cola
+    assert handoff.submit(TransferRecord("uno", "razon", "no_answer"))
+    deadline = time.monotonic() + 2.0
+    while handoff.stats()["depth"] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert handoff.submit(TransferRecord("dos", "razon", "no_answer"))
+
+    async def submit_from_the_loop():
+        started = time.monotonic()
+        accepted = handoff.submit(TransferRecord("tres", "razon", "no_answer"))
+        return accepted, time.monotonic() - started
+
+    accepted, waited = asyncio.run(submit_from_the_loop())
+
+    assert not accepted
+    assert waited < 1.0
+    assert handoff.stats()["dropped"] == 1
+    release.set()
+    handoff.close()
@@ -0,0 +1,34 @@
+"""Importar ``lazarus_core`` no carga DSPy ni las bibliotecas numericas."""
+
+import os
+import subprocess
+import sys
+
+HEAVY_MODULES = ("dspy", "litellm", "numpy", "pandas")
+
+
+def loaded_after(code):
+    # Proceso nuevo: en este ya estan importados por otras pruebas
+    probe = f"import sys\n{code}\nprint(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(sys.path))
+    output = subprocess.run([sys.executable, "-c", probe], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return [name for name in output.strip().split(",") if name]
+
+
+def test_import_leaves_heavy_modules_unloaded():
+    assert loaded_after("import lazarus_core") == []
+
+
+def test_faq_only_chatbot_leaves_heavy_modules_unloaded(faq_csv, tmp_path):
+    code = (
+        "import os\n"
+        f"os.environ['LAZARUS_HANDOFF_DB'] = {str(tmp_path / 'handoffs.sqlite3')!r}\n"
+        "for name in ('DSPY_API_KEY', 'DSPY_MODEL', 'DSPY_API_BASE'):\n"
+        "    os.environ.pop(name, None)\n"
+        "from lazarus_core import LazarusChatbot\n"
+        f"bot = LazarusChatbot(excel_file={faq_csv!r})\n"
+        "bot.answer('¿Qué es ADMIX IM-1?')\n"
+        "bot.close()"
+    )
+    assert loaded_after(code) == []
@@ -0,0 +1,163 @@
+"""Limitador LLM: AIMD, token bucket, presupuesto de tiempo y clasificacion de reintentos."""
+
+import threading
+
+import dspy
+import pytest
+
+from benchmarks.fake_lm import AuthenticationError, RateLimitError, Timeout
+from lazarus_core.limiter import LLMDeadlineExceeded, LLMLimiter
+
+
+class Clock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def failing(error):
+    def fn():
+        raise error
+    return fn
+
+
+def make_limiter(clock=None, **kwargs):
+    kwargs.setdefault("rate", None)
+    kwargs.setdefault("base_delay", 0.0)
+    return LLMLimiter(clock=clock or Clock(), **kwargs)
+
+
+def test_pushback_halves_the_limit_once_per_cooldown():
+    clock = Clock()
+    limiter = make_limiter(clock, max_concurrency=8, max_retries=0, decrease_cooldown=1.0)
+
+    for _ in range(2):
+        with pytest.raises(RateLimitError):
+            limiter.call(failing(RateLimitError("429")))
+    # Dos errores de la misma rafaga: una sola reduccion
+    assert limiter.limit == 4.0
+    assert limiter.stats()["pushbacks"] == 2
+
+    clock.now += 1.0
+    with pytest.raises(Timeout):
+        limiter.call(failing(Timeout("timed out")))
+    assert limiter.limit == 2.0
+
+
+def test_limit_never_drops_below_the_minimum():
+    clock = Clock()
+    limiter = make_limiter(clock, max_concurrency=4, min_concurrency=2, max_retries=0)
+
+    for _ in range(5):
+        clock.now += 10.0
+        with pytest.raises(RateLimitError):
+            limiter.call(failing(RateLimitError("429")))
+
+    assert limiter.limit == 2.0
+    assert limiter.effective_limit == 2
+
+
+def test_successes_grow_the_limit_additively_up_to_the_maximum():
+    limiter = make_limiter(max_concurrency=4, max_retries=0)
+    limiter.limit = 2.0
+
+    limiter.call(lambda: None)
+    assert limiter.limit == 2.5
+    limiter.call(lambda: None)
+    assert limiter.limit == pytest.approx(2.9)
+
+    for _ in range(20):
+        limiter.call(lambda: None)
+    assert limiter.limit == 4.0
+
+
+def test_token_bucket_refills_at_the_configured_rate():
+    clock = Clock()
+    limiter = make_limiter(clock, rate=2.0, burst=2)
+
+    limiter.call(lambda: None)
+    limiter.call(lambda: None)
+    assert limiter.stats()["tokens"] == 0.0
+    # Sin tokens: hay que esperar medio segundo al siguiente
+    assert limiter._try_acquire(clock.now) == pytest.approx(0.5)
+
+    clock.now += 0.5
+    limiter.call(lambda: None)
+    assert limiter.stats()["tokens"] == 0.0
+
+    clock.now += 10.0
+    limiter.call(lambda: None)
+    # La rafaga esta acotada por ``burst``
+    assert limiter.stats()["tokens"] == 1.0
+
+
+def test_waiting_for_a_slot_respects_the_deadline():
+    limiter = LLMLimiter(max_concurrency=1, rate=None, deadline=0.05)
+    entered, release = threading.Event(), threading.Event()
+
+    def hold():
+        entered.set()
+        release.wait()
+
+    holder = threading.Thread(target=limiter.call, args=(hold,))
+    holder.start()
+    entered.wait()
+    try:
+        with pytest.raises(LLMDeadlineExceeded):
+            limiter.call(lambda: None)
+    finally:
+        release.set()
+        holder.join()
+
+    assert limiter.stats()["deadline_exceeded"] == 1
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_retries_stop_at_the_deadline():
+    clock = Clock()
+    limiter = make_limiter(clock, max_retries=5, deadline=1.0)
+    attempts = []
+
+    def slow_failure():
+        attempts.append(clock.now)
+        clock.now += 0.6
+        raise RateLimitError("429")
+
+    with pytest.raises(RateLimitError):
+        limiter.call(slow_failure)
+
+    # El segundo intento termina pasado el presupuesto: no hay un tercero
+    assert len(attempts) == 2
+
+
+@pytest.mark.parametrize("error, retried", [
+    (RateLimitError("slow down"), True),
+    (Timeout("request timed out"), True),
+    (TimeoutError(), True),
+    (Exception("Error code: 429 - too many requests"), True),
+    (AuthenticationError("401"), False),
+    (ConnectionError("reset by peer"), False),
+    (ValueError("bad output"), False),
+])
+def test_only_rate_limits_and_timeouts_are_retried(error, retried):
+    limiter = make_limiter(max_retries=2)
+    attempts = []
+
+    def fn():
+        attempts.append(1)
+        raise error
+
+    with pytest.raises(type(error)):
+        limiter.call(fn)
+
+    assert len(attempts) == (3 if retried else 1)
+    assert limiter.stats()["retries"] == (2 if retried else 0)
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_provider_retries_are_left_to_the_limiter(make_chatbot):
+    make_chatbot(api_key="test", model="openai/test")
+
+    assert dspy.settings.lm.num_retries == 0
@@ -0,0 +1,145 @@
+"""Registro estructurado: descarte con la cola llena, formato JSON y muestreo."""
+
+import io
+import json
+import logging
+import queue
+import re
+import sys
+import threading
+from pathlib import PurePosixPath
+
+import pytest
+
+from lazarus_core.logs import (
+    DroppingQueueHandler,
+    JSONFormatter,
+    SamplingFilter,
+    configure_logging,
+    parse_sample_rates,
+    shutdown_logging,
+)
+
+
+def make_record(msg="mensaje %s", args=("uno",), exc_info=None, **extra):
+    record = logging.LogRecord("lazarus_core.test", logging.WARNING, __file__, 1, msg, args, exc_info)
+    for key, value in extra.items():
+        setattr(record, key, value)
+    return record
+
+
+def raised():
+    try:
+        raise ValueError("fallo")
+    except ValueError:
+        return sys.exc_info()
+
+
+def test_full_queue_drops_and_counts():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+
+    for i in range(5):
+        handler.handle(make_record(args=(i,)))
+
+    assert handler.dropped == 3
+    assert [handler.queue.get_nowait().getMessage() for _ in range(2)] == ["mensaje 0", "mensaje 1"]
+
+
+def test_drops_are_counted_across_threads():
+    handler = DroppingQueueHandler(queue.Queue(maxsize=10))
+    record = make_record()
+
+    def spam():
+        for _ in range(500):
+            handler.handle(record)
+
+    threads = [threading.Thread(target=spam) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert handler.dropped == 8 * 500 - 10
+
+
+def test_queued_record_keeps_the_traceback_out_of_the_message():
+    handler = DroppingQueueHandler(queue.Queue())
+
+    handler.handle(make_record(exc_info=raised(), event="llm_failure"))
+    queued = handler.queue.get_nowait()
+
+    assert queued.getMessage() == "mensaje uno"
+    assert queued.exc_info is None
+    assert "ValueError: fallo" in queued.exc_text
+    assert queued.event == "llm_failure"
+
+
+def test_json_lines_carry_the_extra_fields():
+    line = JSONFormatter().format(make_record(
+        event="transfer", transfer_id="abc", records=3, path=PurePosixPath("/datos/faq.csv")))
+    payload = json.loads(line)
+
+    assert re.fullmatch(r"\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d\.\d{3}Z", payload["ts"])
+    assert payload["level"] == "WARNING"
+    assert payload["logger"] == "lazarus_core.test"
+    assert payload["message"] == "mensaje uno"
+    assert payload["event"] == "transfer"
+    assert payload["transfer_id"] == "abc"
+    assert payload["records"] == 3
+    # Lo que no es serializable se escribe con str()
+    assert payload["path"] == "/datos/faq.csv"
+    assert not {"msg", "args", "levelno", "exc"} & set(payload)
+
+
+def test_json_lines_include_tracebacks_before_and_after_the_queue():
+    direct = json.loads(JSONFormatter().format(make_record(exc_info=raised())))
+    handler = DroppingQueueHandler(queue.Queue())
+    handler.handle(make_record(exc_info=raised()))
+    queued = json.loads(JSONFormatter().format(handler.queue.get_nowait()))
+
+    assert "ValueError: fallo" in direct["exc"]
+    assert "ValueError: fallo" in queued["exc"]
+    assert queued["message"] == "mensaje uno"
+
+
+@pytest.mark.parametrize("rate, kept", [(0.1, 10), (0.25, 25), (0.3, 34), (0.0, 0), (1.0, 100), (5.0, 100)])
+def test_sampling_keeps_a_deterministic_fraction(rate, kept):
+    sampling = SamplingFilter({"transfer": rate})
+
+    passed = [record for record in (make_record(event="transfer") for _ in range(100))
+              if sampling.filter(record)]
+
+    assert len(passed) == kept
+    if 0 < rate < 1:
+        assert {record.sample_rate for record in passed} == {rate}
+    else:
+        assert not any(hasattr(record, "sample_rate") for record in passed)
+
+
+def test_sampling_ignores_other_events():
+    sampling = SamplingFilter({"transfer": 0.0})
+
+    assert sampling.filter(make_record(event="llm_failure"))
+    assert sampling.filter(make_record())
+
+
+def test_sample_rate_spec_skips_malformed_items():
+    assert parse_sample_rates("transfer=0.1, llm_failure = 0.5,roto,=0.3,otro=x,") == {
+        "transfer": 0.1, "llm_failure": 0.5}
+
+
+def test_configure_logging_writes_json_from_a_background_thread():
+    stream = io.StringIO()
+    handler = configure_logging(level="INFO", fmt="json", stream=stream,
+                                sample_rates={"ruido": 0.0}, loggers=("lazarus_test_logs",))
+    logger = logging.getLogger("lazarus_test_logs.modulo")
+    try:
+        logger.debug("no se escribe")
+        logger.info("ruido", extra={"event": "ruido"})
+        logger.info("Hola %s", "mundo", extra={"event": "saludo"})
+    finally:
+        shutdown_logging()
+
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [(line["message"], line["event"]) for line in lines] == [("Hola mundo", "saludo")]
+    assert handler.dropped == 0
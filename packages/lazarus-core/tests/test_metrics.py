@@ -0,0 +1,108 @@
+"""Instrumentacion: exportacion Prometheus, errores por etapa y desglose por solicitud."""
+
+import pytest
+
+from benchmarks.fake_lm import FakeLM
+from lazarus_core.metrics import NOOP, MetricsRegistry, timed_stage
+from lazarus_core.structures import ChatResult
+
+QUESTION = "¿Cuál es la capital de Francia?"  # sin FAQ: la responde el LLM
+
+
+def test_prometheus_text_format():
+    registry = MetricsRegistry(buckets=(0.1, 1.0))
+    registry.stage_finished("retrieval", 0.0, 0.05)
+    registry.stage_finished("retrieval", 0.0, 0.5)
+    registry.stage_finished("answer", 0.0, 2.0, error="RateLimitError")
+    registry.increment("transfers", reason_kind="rate_limit")
+    registry.increment("llm_tokens", 12.5, stage="answer", kind="prompt")
+    registry.register_gauge("breaker_open", "Circuito abierto", lambda: 0)
+
+    assert registry.render_prometheus() == "\n".join([
+        "# HELP lazarus_stage_duration_seconds Duracion de cada etapa del flujo de respuesta",
+        "# TYPE lazarus_stage_duration_seconds histogram",
+        'lazarus_stage_duration_seconds_bucket{stage="answer",le="0.1"} 0',
+        'lazarus_stage_duration_seconds_bucket{stage="answer",le="1"} 0',
+        'lazarus_stage_duration_seconds_bucket{stage="answer",le="+Inf"} 1',
+        'lazarus_stage_duration_seconds_sum{stage="answer"} 2',
+        'lazarus_stage_duration_seconds_count{stage="answer"} 1',
+        'lazarus_stage_duration_seconds_bucket{stage="retrieval",le="0.1"} 1',
+        'lazarus_stage_duration_seconds_bucket{stage="retrieval",le="1"} 2',
+        'lazarus_stage_duration_seconds_bucket{stage="retrieval",le="+Inf"} 2',
+        'lazarus_stage_duration_seconds_sum{stage="retrieval"} 0.55',
+        'lazarus_stage_duration_seconds_count{stage="retrieval"} 2',
+        "# HELP lazarus_llm_tokens_total Tokens consumidos por etapa LLM",
+        "# TYPE lazarus_llm_tokens_total counter",
+        'lazarus_llm_tokens_total{kind="prompt",stage="answer"} 12.5',
+        "# HELP lazarus_stage_errors_total Etapas que terminaron con una excepcion, por etapa y tipo",
+        "# TYPE lazarus_stage_errors_total counter",
+        'lazarus_stage_errors_total{error="RateLimitError",stage="answer"} 1',
+        "# HELP lazarus_transfers_total Transferencias a agente humano por motivo",
+        "# TYPE lazarus_transfers_total counter",
+        'lazarus_transfers_total{reason_kind="rate_limit"} 1',
+        "# HELP lazarus_breaker_open Circuito abierto",
+        "# TYPE lazarus_breaker_open gauge",
+        "lazarus_breaker_open 0",
+    ]) + "\n"
+
+
+def test_label_values_are_escaped_and_failing_gauges_skipped():
+    registry = MetricsRegistry()
+    registry.increment("answers", source='di "hola"\nC:\\')
+    registry.register_gauge("broken", "Falla al leerse", lambda: 1 / 0)
+
+    text = registry.render_prometheus()
+
+    assert 'lazarus_answers_total{source="di \\"hola\\"\\nC:\\\\"} 1' in text
+    assert "broken" not in text
+
+
+def test_timed_stage_records_the_exception_type():
+    registry = MetricsRegistry()
+    timings = {}
+
+    with pytest.raises(KeyError):
+        with timed_stage(registry, "cache", timings):
+            raise KeyError("x")
+    with timed_stage(registry, "cache", timings):
+        pass
+
+    assert registry.snapshot()["stages"]["cache"]["count"] == 2
+    assert registry.snapshot()["counters"]["stage_errors"] == {"error=KeyError,stage=cache": 1}
+    assert set(timings) == {"cache"}
+
+
+def test_noop_instrumentation_measures_nothing():
+    assert timed_stage(NOOP, "answer") is timed_stage(NOOP, "total")
+
+
+def test_failed_llm_stage_is_counted(make_llm_chatbot):
+    registry = MetricsRegistry()
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.0, error_rate=1.0), metrics=registry)
+
+    assert bot.answer(QUESTION)["transfer_to_agent"]
+
+    text = bot.metrics.render_prometheus()
+    assert 'lazarus_stage_errors_total{error="RateLimitError",stage="answer"} 1' in text
+    assert 'lazarus_llm_errors_total{kind="rate_limit",stage="answer"} 1' in text
+
+
+@pytest.mark.parametrize("question, stages", [
+    (QUESTION, {"retrieval", "small_talk", "cache", "answer", "transfer", "total"}),
+    ("hola", {"retrieval", "small_talk", "total"}),
+])
+def test_collect_timings_adds_a_per_request_breakdown(make_llm_chatbot, question, stages):
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.01), collect_timings=True)
+
+    timings = bot.answer(question)["timings"]
+
+    assert set(timings) == stages
+    assert all(seconds >= 0 for seconds in timings.values())
+    assert timings["total"] >= sum(s for stage, s in timings.items() if stage != "total") * 0.99
+
+
+def test_timings_are_omitted_unless_requested(make_llm_chatbot):
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.0))
+
+    assert "timings" not in bot.answer(QUESTION)
+    assert ChatResult("p", timings={"total": 1.0}).to_dict()["timings"] == {"total": 1.0}
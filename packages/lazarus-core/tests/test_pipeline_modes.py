@@ -0,0 +1,84 @@
+"""Modos ``parallel`` y ``merged``: mismos resultados que ``sequential`` y cancelacion real."""
+
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fake_lm import FakeLM
+from lazarus_core.limiter import LLMLimiter
+
+QUESTIONS = ["¿Qué es ADMIX IM-1?", "¿Cuál es la capital de Francia?"]
+
+SCENARIOS = {
+    "ok": {},
+    "transfer": {"transfer_rate": 1.0},
+    "timeout": {"error_rate": 1.0, "error_kind": "timeout"},
+}
+
+
+class SlowAnswerLM(FakeLM):
+    """FakeLM cuya respuesta tarda ``answer_latency``; las decisiones son inmediatas."""
+
+    def __init__(self, answer_latency: float, **kwargs) -> None:
+        super().__init__(latency=0.0, **kwargs)
+        self.answer_latency = answer_latency
+        self.answers_finished = 0
+
+    def _plan(self, request):
+        plan = super()._plan(request)
+        plan["answer"] = "saludo_y_reconocimiento" in request
+        if plan["answer"]:
+            plan["delay"] = self.answer_latency
+        return plan
+
+    def _respond(self, plan, request):
+        if plan["answer"]:
+            self.answers_finished += 1
+        return super()._respond(plan, request)
+
+
+@pytest.mark.parametrize("scenario", sorted(SCENARIOS))
+def test_modes_match_sequential(make_llm_chatbot, scenario):
+    results = {}
+    for mode in ("sequential", "parallel", "merged"):
+        bot, _ = make_llm_chatbot(FakeLM(latency=0.0, **SCENARIOS[scenario]), pipeline_mode=mode)
+        results[mode] = [bot.answer(q) for q in QUESTIONS]
+
+    assert results["parallel"] == results["sequential"]
+    assert results["merged"] == results["sequential"]
+
+
+@pytest.mark.parametrize("path", ["sync", "async"])
+def test_early_transfer_cancels_the_running_answer(make_llm_chatbot, path):
+    sequential, _ = make_llm_chatbot(FakeLM(latency=0.0, transfer_rate=1.0))
+    expected = sequential.answer(QUESTIONS[1])
+    limiter = LLMLimiter(rate=None)
+    lm = SlowAnswerLM(answer_latency=5.0, transfer_rate=1.0)
+    bot, _ = make_llm_chatbot(lm, pipeline_mode="parallel", llm_limiter=limiter)
+
+    started = time.perf_counter()
+    if path == "sync":
+        result = bot.answer(QUESTIONS[1])
+    else:
+        result = asyncio.run(bot.aanswer(QUESTIONS[1]))
+    elapsed = time.perf_counter() - started
+
+    assert result == expected
+    assert result["transfer_to_agent"]
+    # La respuesta en curso se interrumpio: no se esperaron sus 5 s ni ocupa cupo
+    assert elapsed < 2.0
+    assert lm.answers_finished == 0
+    assert lm.counters["calls"] == 2
+    assert limiter.stats()["in_flight"] == 0
+
+
+def test_parallel_without_transfer_waits_for_the_answer(make_llm_chatbot):
+    lm = SlowAnswerLM(answer_latency=0.05)
+    bot, _ = make_llm_chatbot(lm, pipeline_mode="parallel")
+
+    result = bot.answer(QUESTIONS[1])
+
+    assert result["source"] == "LLM"
+    assert not result["transfer_to_agent"]
+    assert lm.answers_finished == 1
@@ -0,0 +1,48 @@
+"""Cache semantica: desactivada por defecto y sin confundir preguntas casi iguales."""
+
+from lazarus_core.cache import SemanticCache
+from lazarus_core.structures import ChatResult
+
+
+def make_result(question: str, answer: str) -> ChatResult:
+    return ChatResult(question, answer=answer, source="LLM")
+
+
+def test_disabled_by_default(chatbot):
+    assert not SemanticCache().enabled
+    assert not chatbot.semantic_cache.enabled
+
+
+def test_reuses_same_question_with_other_spelling(kb):
+    cache = SemanticCache(max_size=8)
+    cache.sync_version(kb.version, lambda: [])
+    cache.put(kb.normalize_question("¿Puedo pagar con tarjeta de crédito?"),
+              make_result("¿Puedo pagar con tarjeta de crédito?", "Si, con Visa y Mastercard."))
+
+    cached = cache.get(kb.normalize_question("puedo pagar con tarjeta de credito"),
+                       "puedo pagar con tarjeta de credito")
+
+    assert cached is not None
+    assert cached.answer == "Si, con Visa y Mastercard."
+    assert cached.question == "puedo pagar con tarjeta de credito"
+
+
+def test_near_duplicates_needing_other_answers_miss(kb):
+    cache = SemanticCache(max_size=8)
+    cache.sync_version(kb.version, lambda: [kb.normalize_question(f["pregunta"]) for f in kb.faqs])
+    pairs = [
+        ("¿Puedo pagar con tarjeta de crédito?", "¿No puedo pagar con tarjeta de crédito?"),
+        ("¿Atienden el sábado 14 de junio?", "¿Atienden el sábado 21 de junio?"),
+        ("¿Abren el 1 de enero?", "¿Abren el 2 de enero?"),
+    ]
+    for cached_question, other_question in pairs:
+        cache.put(kb.normalize_question(cached_question),
+                  make_result(cached_question, f"Respuesta para {cached_question}"))
+
+    for cached_question, other_question in pairs:
+        assert cache.get(kb.normalize_question(other_question), other_question) is None
+
+    # La negacion supera el umbral de similitud: la descarta la guarda, no el coseno
+    embedder = cache.embedder
+    first, second = (embedder.embed(kb.normalize_question(q)) for q in pairs[0])
+    assert float(first @ second) >= cache.threshold
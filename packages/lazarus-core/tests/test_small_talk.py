@@ -0,0 +1,117 @@
+"""Small talk: el trie reproduce la busqueda por prefijos original y pliega acentos."""
+
+import random
+
+import pytest
+
+from lazarus_core.constants import SMALL_TALK_PHRASES, SMALL_TALK_PREFIXES
+from lazarus_core.small_talk import (
+    DEFAULT_SMALL_TALK,
+    PREFIX_MAX_LENGTH,
+    SmallTalkMatcher,
+    normalize_small_talk,
+)
+
+
+def baseline_is_small_talk(question, phrases=SMALL_TALK_PHRASES, prefixes=SMALL_TALK_PREFIXES):
+    """``LazarusChatbot._is_small_talk`` antes del trie"""
+    normalized = question.lower().strip()
+    if normalized in phrases:
+        return True
+    return len(normalized) <= 20 and any(normalized.startswith(prefix) for prefix in prefixes)
+
+
+def random_questions(seed, count=2000):
+    rng = random.Random(seed)
+    seeds = sorted(SMALL_TALK_PHRASES) + list(SMALL_TALK_PREFIXES)
+    pieces = ["", " ", "!", ".", ",", "?", " amigo", " como estas", " equipo lazarus",
+              " necesito ayuda con una cotizacion", "s", "o"]
+    questions = []
+    for _ in range(count):
+        base = rng.choice(seeds + ["precio", "horario", "ho", "bue", "gra", "que", "okey"])
+        text = base[:rng.randint(1, len(base))] if rng.random() < 0.2 else base
+        text += rng.choice(pieces) + rng.choice(pieces)
+        if rng.random() < 0.3:
+            text = text.upper() if rng.random() < 0.5 else text.title()
+        if rng.random() < 0.2:
+            text = f"  {text}\t"
+        questions.append(text)
+    return questions
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_default_matcher_matches_the_original_checks(seed):
+    questions = [q for q in random_questions(seed) if q.isascii()]
+
+    assert [DEFAULT_SMALL_TALK.matches(q) for q in questions] == [
+        baseline_is_small_talk(q) for q in questions]
+
+
+def test_prefixes_only_count_in_short_texts():
+    short = "hola" + "x" * (PREFIX_MAX_LENGTH - 4)
+
+    assert DEFAULT_SMALL_TALK.matches(short)
+    assert not DEFAULT_SMALL_TALK.matches(short + "x")
+    # Las frases completas no tienen limite de longitud
+    matcher = SmallTalkMatcher(phrases=["hola equipo de atencion al cliente"], prefixes=["hola"])
+    assert matcher.matches("Hola equipo de atencion al cliente")
+
+
+@pytest.mark.parametrize("question", ["Buenos días", "Qué tal?", "QUÉ TAL", "Grácias!", "holá"])
+def test_accents_and_case_are_folded(question):
+    assert DEFAULT_SMALL_TALK.matches(question)
+    assert DEFAULT_SMALL_TALK.matches(normalize_small_talk(question))
+
+
+@pytest.mark.parametrize("question", ["¿Dónde están ubicados?", "precio del cemento", "", "   ", "h"])
+def test_other_questions_are_not_small_talk(question):
+    assert not DEFAULT_SMALL_TALK.matches(question)
+
+
+def test_accented_entries_match_unaccented_questions():
+    matcher = SmallTalkMatcher(phrases=["¿Cómo estás?"], prefixes=["Saludos"])
+
+    assert matcher.matches("¿como estas?")
+    assert matcher.matches("saludos cordiales")
+    assert len(matcher) == 2
+
+
+def test_lexicon_file_format(tmp_path):
+    path = tmp_path / "small_talk.txt"
+    path.write_text(
+        "# Despedidas\n"
+        "chao\n"
+        "hasta luego   # con comentario\n"
+        "\n"
+        "saludos*\n"
+        "   \n",
+        encoding="utf-8",
+    )
+
+    only_file = SmallTalkMatcher.from_file(str(path), include_defaults=False)
+    with_defaults = SmallTalkMatcher.from_file(str(path))
+
+    assert len(only_file) == 3
+    assert all(only_file.matches(q) for q in ("Chao", "hasta luego", "Saludos cordiales"))
+    assert not only_file.matches("hola")
+    assert len(with_defaults) == len(DEFAULT_SMALL_TALK) + 3
+    assert with_defaults.matches("hola") and with_defaults.matches("chao")
+
+
+def test_chatbot_loads_the_lexicon_from_the_environment(make_chatbot, monkeypatch, tmp_path):
+    path = tmp_path / "small_talk.txt"
+    path.write_text("chao\nsaludos*\n", encoding="utf-8")
+    monkeypatch.setenv("LAZARUS_SMALL_TALK_FILE", str(path))
+
+    bot = make_chatbot()
+
+    assert bot.answer("Chao")["source"] == "small_talk"
+    assert bot.answer("saludos a todos")["source"] == "small_talk"
+    assert bot.answer("hola")["source"] == "small_talk"
+    assert DEFAULT_SMALL_TALK.matches("chao") is False
+
+
+def test_default_lexicon_is_used_without_the_variable(make_chatbot, monkeypatch):
+    monkeypatch.delenv("LAZARUS_SMALL_TALK_FILE", raising=False)
+
+    assert make_chatbot().small_talk_matcher is DEFAULT_SMALL_TALK
@@ -0,0 +1,86 @@
+"""Streaming de respuestas: secuencia de eventos y cancelacion desde el lado sincrono."""
+
+import asyncio
+import time
+
+import pytest
+
+from benchmarks.fake_lm import FakeLM
+
+QUESTION = "¿Cuál es la capital de Francia?"  # sin FAQ: la responde el LLM
+
+
+def split(events):
+    *chunks, final = events
+    assert final.is_final
+    assert chunks and not any(chunk.is_final for chunk in chunks)
+    return chunks, final.result
+
+
+@pytest.mark.parametrize("mode", ["sequential", "merged"])
+def test_tokens_then_final_result(make_llm_chatbot, mode):
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.0), pipeline_mode=mode)
+    expected = bot.answer(QUESTION)
+
+    chunks, result = split(list(bot.stream_answer(QUESTION)))
+
+    assert len(chunks) > 1
+    assert [c.field for c in chunks if c.field][0] == "saludo_y_reconocimiento"
+    assert "".join(c.text for c in chunks) == result["answer"]
+    assert result == expected
+    assert result["source"] == "LLM"
+
+
+def test_tokens_then_transfer_replaces_the_streamed_text(make_llm_chatbot):
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.0, transfer_rate=1.0), pipeline_mode="sequential")
+
+    chunks, result = split(list(bot.stream_answer(QUESTION)))
+
+    assert len(chunks) > 1
+    assert result["transfer_to_agent"]
+    assert result["source"] == "transfer"
+    # El cliente debe reemplazar lo emitido por ``result["answer"]``
+    assert "".join(c.text for c in chunks) != result["answer"]
+
+
+def test_answers_without_llm_arrive_as_a_single_chunk(make_llm_chatbot):
+    bot, lm = make_llm_chatbot(FakeLM(latency=0.0))
+
+    chunks, result = split(list(bot.stream_answer("hola")))
+
+    assert [c.text for c in chunks] == [result["answer"]]
+    assert lm.counters["calls"] == 0
+
+
+def test_async_stream_gives_the_same_events(make_llm_chatbot):
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.0), pipeline_mode="sequential")
+    sync_events = list(bot.stream_answer(QUESTION))
+
+    async def collect():
+        return [event async for event in bot.astream_answer(QUESTION)]
+
+    assert asyncio.run(collect()) == sync_events
+
+
+def test_closing_the_stream_cancels_the_llm_call(make_llm_chatbot):
+    # Unos 20 fragmentos a 50 ms: terminar el streaming tomaria cerca de un segundo
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.0, chunk_delay=0.05), pipeline_mode="sequential")
+    events = bot.stream_answer(QUESTION)
+
+    assert not next(events).is_final
+    started = time.monotonic()
+    events.close()
+    while bot.limiter.stats()["in_flight"] and time.monotonic() - started < 2.0:
+        time.sleep(0.01)
+
+    assert bot.limiter.stats()["in_flight"] == 0
+    assert time.monotonic() - started < 0.5
+
+
+def test_stream_errors_become_a_transfer(make_llm_chatbot):
+    bot, _ = make_llm_chatbot(FakeLM(latency=0.0, error_rate=1.0, error_kind="auth"))
+
+    chunks, result = split(list(bot.stream_answer(QUESTION)))
+
+    assert result["transfer_to_agent"]
+    assert [c.text for c in chunks] == [result["answer"]]
@@ -1,5 +1,5 @@
 """Paquete de base de conocimiento para Lazarus."""
 
-from .knowledge_base import FAQKnowledgeBase
+from .knowledge_base import FAQKnowledgeBase, SearchResult
 
-__all__ = ["FAQKnowledgeBase"]
+__all__ = ["FAQKnowledgeBase", "SearchResult"]
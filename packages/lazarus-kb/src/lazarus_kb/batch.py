@@ -0,0 +1,215 @@
+"""
+Motor de puntuación por lotes para la base de conocimiento de FAQ
+Codifica el corpus una sola vez en matrices dispersas y puntúa lotes de
+consultas con productos de matrices (requiere el extra ``batch``: numpy y scipy)
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+    from scipy import sparse
+except ImportError as exc:  # pragma: no cover - depende del entorno
+    raise ImportError(
+        "La búsqueda por lotes requiere numpy y scipy. "
+        "Instale el extra: lazarus-kb[batch]") from exc
+
+from .index import FAQIndex
+
+
+class BatchScorer:
+    """
+    Puntuador vectorizado sobre un ``FAQIndex``
+
+    Matrices del corpus (N = número de FAQ):
+      - ``pregunta``: N × |palabras| con el conteo de cada palabra de la pregunta
+      - ``respuesta`` y ``categoria``: N × |tokens| binarias por token crudo
+
+    Los pesos se manejan en décimas enteras (0.4 → 4, 0.2 → 2, 0.3 → 3,
+    0.1 → 1) para que el producto de matrices sea exacto; la puntuación final
+    se normaliza por la longitud de la consulta igual que en ``search``.
+    Las FAQ que quedan a menos de ``EPSILON`` de la mejor puntuación se
+    re-puntúan con el cálculo escalar, de modo que el umbral y los empates se
+    resuelven igual que en ``search`` (incluido el redondeo de punto flotante).
+
+    Solo calcula la mejor FAQ de cada consulta (equivale a ``k=1``); el top-k
+    con ``k > 1`` sigue el camino escalar de ``search_top_k``.
+    """
+
+    PARTIAL_WEIGHT = 4
+    EXACT_WEIGHT = 2
+    CATEGORIA_WEIGHT = 3
+    RESPUESTA_WEIGHT = 1
+    BONUS = 0.5
+    EPSILON = 1e-9
+
+    # Consultas por bloque para acotar la memoria de las matrices intermedias
+    CHUNK_SIZE = 1024
+
+    def __init__(self, index: FAQIndex):
+        self.index = index
+        n_faqs = len(index)
+
+        self.word_columns: Dict[str, int] = {
+            word: col for col, word in enumerate(sorted(index.words.vocabulary))}
+        # La columna '' representa la subcadena vacía, presente en todo texto
+        self.token_columns: Dict[str, int] = {
+            token: col for col, token in enumerate(sorted(index.tokens.vocabulary))}
+        self.token_columns[''] = len(self.token_columns)
+
+        rows, cols = [], []
+        for faq_id, entry in enumerate(index.entries):
+            for word in entry.pregunta_words:
+                rows.append(faq_id)
+                cols.append(self.word_columns[word])
+        self.pregunta = sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+            shape=(n_faqs, len(self.word_columns)))
+
+        self.respuesta = self._field_matrix('respuesta_lower')
+        self.categoria = self._field_matrix('categoria_lower')
+
+    def _field_matrix(self, attribute: str) -> 'sparse.csr_matrix':
+        empty_col = self.token_columns['']
+        rows, cols = [], []
+        for faq_id, entry in enumerate(self.index.entries):
+            for token in set(getattr(entry, attribute).split()):
+                rows.append(faq_id)
+                cols.append(self.token_columns[token])
+            rows.append(faq_id)
+            cols.append(empty_col)
+        return sparse.csr_matrix(
+            (np.ones(len(rows), dtype=np.int64), (rows, cols)),
+            shape=(len(self.index), len(self.token_columns)))
+
+    def _query_matrices(self, unique_words: Sequence[str]):
+        """Relación palabra de consulta → vocabulario de palabras y de tokens"""
+        words = self.index.words
+        tokens = self.index.tokens
+        rel_rows, rel_cols, rel_data = [], [], []
+        tok_rows, tok_cols = [], []
+
+        for row, query_word in enumerate(unique_words):
+            for word in words.containing(query_word) | words.contained_in(query_word):
+                weight = self.PARTIAL_WEIGHT
+                if word == query_word:
+                    weight += self.EXACT_WEIGHT
+                rel_rows.append(row)
+                rel_cols.append(self.word_columns[word])
+                rel_data.append(weight)
+
+            containing = tokens.containing(query_word)
+            if not query_word:
+                containing.add('')
+            for token in containing:
+                tok_rows.append(row)
+                tok_cols.append(self.token_columns[token])
+
+        relation = sparse.csr_matrix(
+            (np.array(rel_data, dtype=np.int64), (rel_rows, rel_cols)),
+            shape=(len(unique_words), len(self.word_columns)))
+        containment = sparse.csr_matrix(
+            (np.ones(len(tok_rows), dtype=np.int64), (tok_rows, tok_cols)),
+            shape=(len(unique_words), len(self.token_columns)))
+        return relation, containment
+
+    @staticmethod
+    def _binarize(matrix: 'sparse.csr_matrix') -> 'sparse.csr_matrix':
+        matrix = matrix.tocsr()
+        matrix.data = np.ones_like(matrix.data)
+        return matrix
+
+    def search_many(
+        self,
+        queries_lower: Sequence[str],
+        queries_words: Sequence[Sequence[str]],
+        threshold: float,
+    ) -> List[Optional[Tuple[int, float]]]:
+        """
+        Mejor FAQ para cada consulta del lote
+
+        Args:
+            queries_lower: Consultas completas en minúsculas
+            queries_words: Palabras normalizadas de cada consulta
+            threshold: Umbral mínimo de similitud
+
+        Returns:
+            (id, puntuación) de la mejor FAQ por consulta, o None si ninguna supera el umbral
+        """
+        results: List[Optional[Tuple[int, float]]] = []
+        for start in range(0, len(queries_lower), self.CHUNK_SIZE):
+            end = start + self.CHUNK_SIZE
+            results.extend(self._search_chunk(
+                queries_lower[start:end], queries_words[start:end], threshold))
+        return results
+
+    def _search_chunk(
+        self,
+        queries_lower: Sequence[str],
+        queries_words: Sequence[Sequence[str]],
+        threshold: float,
+    ) -> List[Optional[Tuple[int, float]]]:
+        results: List[Optional[Tuple[int, float]]] = [None] * len(queries_lower)
+        active = [i for i, words in enumerate(queries_words) if words]
+        if not active or not len(self.index):
+            return results
+
+        unique_words: Dict[str, int] = {}
+        q_rows, q_cols = [], []
+        for row, query_id in enumerate(active):
+            for word in queries_words[query_id]:
+                q_rows.append(row)
+                q_cols.append(unique_words.setdefault(word, len(unique_words)))
+        # Multiplicidad de cada palabra única en cada consulta (B × U)
+        counts = sparse.csr_matrix(
+            (np.ones(len(q_rows), dtype=np.int64), (q_rows, q_cols)),
+            shape=(len(active), len(unique_words)))
+
+        relation, containment = self._query_matrices(list(unique_words))
+
+        # Palabras de la pregunta: cada par (consulta, pregunta) suma sus pesos
+        pregunta_scores = counts @ (relation @ self.pregunta.T)
+        # Categoría y respuesta: indicador por palabra de consulta y FAQ
+        categoria_hits = self._binarize(containment @ self.categoria.T)
+        respuesta_hits = self._binarize(containment @ self.respuesta.T)
+        totals = (pregunta_scores
+                  + self.CATEGORIA_WEIGHT * (counts @ categoria_hits)
+                  + self.RESPUESTA_WEIGHT * (counts @ respuesta_hits)).tocsr()
+
+        for row, query_id in enumerate(active):
+            start, end = totals.indptr[row], totals.indptr[row + 1]
+            length = 10 * len(queries_words[query_id])
+            scores: Dict[int, float] = {
+                int(faq_id): tenths / length
+                for faq_id, tenths in zip(totals.indices[start:end], totals.data[start:end])
+            }
+            for faq_id in self.index.phrase_hits(queries_lower[query_id]):
+                scores[faq_id] = scores.get(faq_id, 0.0) + self.BONUS
+
+            results[query_id] = self._select(
+                scores, queries_lower[query_id], queries_words[query_id], threshold)
+
+        return results
+
+    def _select(
+        self,
+        scores: Dict[int, float],
+        query_lower: str,
+        query_words: Sequence[str],
+        threshold: float,
+    ) -> Optional[Tuple[int, float]]:
+        """Elegir la mejor FAQ re-puntuando de forma exacta a las contendientes"""
+        if not scores:
+            return None
+
+        top = max(scores.values())
+        best_match = None
+        best_score = 0
+        for faq_id in sorted(scores):
+            if scores[faq_id] < top - self.EPSILON:
+                continue
+            score = self.index.entries[faq_id].score(query_lower, query_words)
+            if score > best_score and score > threshold:
+                best_score = score
+                best_match = faq_id
+        return None if best_match is None else (best_match, best_score)
@@ -0,0 +1,360 @@
+"""
+Índice invertido para la base de conocimiento de FAQ
+Precalcula la normalización de cada FAQ, las listas de publicación token → FAQ
+y un índice de n-gramas de caracteres para las coincidencias por subcadena
+"""
+
+from collections import Counter
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .normalization import TextNormalizer
+
+
+class NGramIndex:
+    """
+    Índice de n-gramas de caracteres sobre un vocabulario
+
+    Cada palabra se indexa por todas sus subcadenas de hasta ``N`` caracteres,
+    lo que permite responder sin recorrer el vocabulario:
+      - ``containing(w)``: palabras del vocabulario que contienen ``w``
+      - ``contained_in(w)``: palabras del vocabulario contenidas en ``w``
+    """
+
+    N = 3
+
+    def __init__(self, vocabulary: Iterable[str]):
+        self.vocabulary: FrozenSet[str] = frozenset(vocabulary)
+        self.grams: Dict[str, Set[str]] = {}
+        for word in self.vocabulary:
+            for gram in self._word_grams(word):
+                self.grams.setdefault(gram, set()).add(word)
+
+    @classmethod
+    def _word_grams(cls, word: str) -> Set[str]:
+        """Todas las subcadenas de ``word`` de 1 a ``N`` caracteres"""
+        return {word[i:i + size]
+                for size in range(1, min(len(word), cls.N) + 1)
+                for i in range(len(word) - size + 1)}
+
+    @staticmethod
+    def _grams(word: str, size: int) -> Set[str]:
+        return {word[i:i + size] for i in range(len(word) - size + 1)}
+
+    def updated(self, vocabulary: Iterable[str]) -> 'NGramIndex':
+        """
+        Nuevo índice para otro vocabulario, reindexando solo las diferencias
+
+        Las listas de n-gramas se copian antes de modificarse, así que este
+        índice sigue siendo válido para las búsquedas que aún lo usan.
+        """
+        vocabulary = frozenset(vocabulary)
+        updated = NGramIndex.__new__(NGramIndex)
+        updated.vocabulary = vocabulary
+        updated.grams = dict(self.grams)
+
+        copied: Set[str] = set()
+
+        def writable(gram: str) -> Set[str]:
+            if gram not in copied:
+                updated.grams[gram] = set(updated.grams.get(gram, ()))
+                copied.add(gram)
+            return updated.grams[gram]
+
+        for word in self.vocabulary - vocabulary:
+            for gram in self._word_grams(word):
+                writable(gram).discard(word)
+        for word in vocabulary - self.vocabulary:
+            for gram in self._word_grams(word):
+                writable(gram).add(word)
+
+        for gram in copied:
+            if not updated.grams[gram]:
+                del updated.grams[gram]
+        return updated
+
+    def containing(self, word: str) -> Set[str]:
+        """Palabras del vocabulario que contienen ``word`` como subcadena"""
+        if not word:
+            return set(self.vocabulary)
+
+        size = min(len(word), self.N)
+        postings = []
+        for gram in self._grams(word, size):
+            words = self.grams.get(gram)
+            if not words:
+                return set()
+            postings.append(words)
+
+        # Intersectar empezando por la lista más corta y verificar al final
+        postings.sort(key=len)
+        found = set(postings[0])
+        for words in postings[1:]:
+            found &= words
+            if not found:
+                return found
+        if len(word) > self.N:
+            found = {v for v in found if word in v}
+        return found
+
+    def contained_in(self, word: str) -> Set[str]:
+        """Palabras del vocabulario que son subcadena de ``word``"""
+        substrings = {word[i:j] for i in range(len(word))
+                      for j in range(i + 1, len(word) + 1)}
+        substrings.add('')
+        return substrings & self.vocabulary
+
+
+@dataclass(frozen=True)
+class IndexedFAQ:
+    """Campos de una FAQ normalizados una sola vez al indexar (minúsculas, sin acentos)"""
+
+    pregunta_lower: str
+    respuesta_lower: str
+    categoria_lower: str
+    pregunta_words: Tuple[str, ...]
+
+    def score(self, query_lower: str, query_words: Sequence[str]) -> float:
+        """
+        Puntuación de referencia comparando directamente contra los campos
+
+        Mismo cálculo (y mismo orden de sumas) que ``QueryMatch.score``, sin
+        pasar por el índice; útil para re-puntuar pocas FAQ de forma exacta.
+        """
+        score = 0
+        for query_word in query_words:
+            for pregunta_word in self.pregunta_words:
+                if query_word in pregunta_word or pregunta_word in query_word:
+                    score += 0.4
+                if query_word == pregunta_word:
+                    score += 0.2
+            if query_word in self.categoria_lower:
+                score += 0.3
+            if query_word in self.respuesta_lower:
+                score += 0.1
+
+        score = score / len(query_words)
+        if query_lower in self.pregunta_lower or query_lower in self.respuesta_lower:
+            score += 0.5
+        return score
+
+
+class QueryMatch:
+    """
+    Coincidencias de una consulta resueltas contra el índice
+
+    Se calcula una vez por consulta: palabras relacionadas de cada término,
+    FAQ cuya categoría/respuesta contiene cada término y FAQ con bonus.
+    Al recorrer las listas de publicación acumula además la puntuación de
+    cada candidata en décimas enteras, que sirve de estimación (y cota)
+    para ordenar candidatas sin puntuarlas todas.
+    """
+
+    # Pesos en décimas enteras: parcial, exacta, categoría y respuesta
+    PARTIAL_TENTHS = 4
+    EXACT_TENTHS = 2
+    CATEGORIA_TENTHS = 3
+    RESPUESTA_TENTHS = 1
+    BONUS = 0.5
+
+    def __init__(self, index: 'FAQIndex', query_lower: str, query_words: Sequence[str]):
+        self.index = index
+        self.query_lower = query_lower
+        self.query_words = list(query_words)
+        self.related: Dict[str, Set[str]] = {}
+        self.categoria_hits: Dict[str, Set[int]] = {}
+        self.respuesta_hits: Dict[str, Set[int]] = {}
+        self.tenths: Dict[int, int] = {}
+
+        tenths = self.tenths
+        for query_word, repeats in Counter(self.query_words).items():
+            related = (index.words.containing(query_word)
+                       | index.words.contained_in(query_word))
+            self.related[query_word] = related
+            # Las listas de palabras tienen un id por aparición en la pregunta
+            for word in related:
+                weight = self.PARTIAL_TENTHS
+                if word == query_word:
+                    weight += self.EXACT_TENTHS
+                weight *= repeats
+                for faq_id in index.word_postings[word]:
+                    tenths[faq_id] = tenths.get(faq_id, 0) + weight
+
+            categoria_hits = index.field_hits('categoria', query_word)
+            respuesta_hits = index.field_hits('respuesta', query_word)
+            self.categoria_hits[query_word] = categoria_hits
+            self.respuesta_hits[query_word] = respuesta_hits
+            for faq_id in categoria_hits:
+                tenths[faq_id] = tenths.get(faq_id, 0) + self.CATEGORIA_TENTHS * repeats
+            for faq_id in respuesta_hits:
+                tenths[faq_id] = tenths.get(faq_id, 0) + self.RESPUESTA_TENTHS * repeats
+
+        self.bonus = index.phrase_hits(query_lower) if self.query_words else set()
+        self.candidates: List[int] = sorted(tenths.keys() | self.bonus)
+
+    def estimate(self, faq_id: int) -> float:
+        """Puntuación calculada en aritmética exacta (difiere de ``score`` solo por redondeo)"""
+        estimate = self.tenths.get(faq_id, 0) / (10 * len(self.query_words))
+        if faq_id in self.bonus:
+            estimate += self.BONUS
+        return estimate
+
+    def score(self, faq_id: int) -> float:
+        """
+        Puntuación de una FAQ candidata (mismo cálculo que el escaneo completo)
+
+        Args:
+            faq_id: Id de la FAQ en el índice
+
+        Returns:
+            Puntuación normalizada por la longitud de la consulta, con bonus
+        """
+        entry = self.index.entries[faq_id]
+        score = 0
+
+        # Evaluar coincidencias parciales de palabras
+        for query_word in self.query_words:
+            related = self.related[query_word]
+            # Verificar coincidencia en pregunta FAQ
+            for pregunta_word in entry.pregunta_words:
+                if pregunta_word in related:
+                    score += 0.4
+                if query_word == pregunta_word:
+                    score += 0.2
+
+            # Verificar coincidencia en categoría
+            if faq_id in self.categoria_hits[query_word]:
+                score += 0.3
+
+            # Verificar coincidencia en respuesta (peso menor)
+            if faq_id in self.respuesta_hits[query_word]:
+                score += 0.1
+
+        # Normalizar la puntuación final
+        score = score / len(self.query_words)
+
+        # Bonus si la consulta coincide exactamente con la pregunta o respuesta
+        if faq_id in self.bonus:
+            score += self.BONUS
+
+        return score
+
+
+class FAQIndex:
+    """
+    Índice invertido sobre las FAQ cargadas
+
+    Mantiene dos familias de listas de publicación:
+      - ``word_postings``: palabras de la pregunta (sin stopwords) → ids de FAQ
+        (un id por aparición), usadas por la coincidencia parcial/exacta.
+      - ``field_postings``: tokens crudos de cada campo → ids, usados por las
+        coincidencias de subcadena (categoría, respuesta y bonus).
+
+    Ambos vocabularios tienen un ``NGramIndex`` para resolver la regla de
+    subcadena bidireccional sin recorrerlos. Una palabra de la consulta sin
+    espacios solo puede aparecer dentro de un token crudo, por lo que los
+    candidatos son exactamente las FAQ con puntuación distinta de cero.
+    """
+
+    FIELDS = ('pregunta', 'respuesta', 'categoria')
+
+    def __init__(self, faqs: Iterable[Dict[str, str]], normalizer: TextNormalizer,
+                 previous: Optional['FAQIndex'] = None):
+        """
+        Construir el índice
+
+        Args:
+            faqs: Registros de FAQ (se consumen una sola vez)
+            normalizer: Pipeline de normalización, el mismo que usan las consultas
+            previous: Índice anterior; si se indica, las FAQ sin cambios y el
+                vocabulario común se reutilizan en vez de reindexarse
+        """
+        self.faqs = list(faqs)
+        self.version = 0
+        self.entries: List[IndexedFAQ] = []
+        self.word_postings: Dict[str, List[int]] = {}
+        self.field_postings: Dict[str, Dict[str, List[int]]] = {
+            field: {} for field in self.FIELDS}
+
+        reusable: Dict[Tuple[str, str, str], IndexedFAQ] = {}
+        if previous is not None:
+            reusable = {self._row_key(faq): entry
+                        for faq, entry in zip(previous.faqs, previous.entries)}
+
+        for faq_id, faq in enumerate(self.faqs):
+            entry = reusable.get(self._row_key(faq))
+            if entry is None:
+                entry = self._index_faq(faq, normalizer)
+            self.entries.append(entry)
+
+            for word in entry.pregunta_words:
+                self.word_postings.setdefault(word, []).append(faq_id)
+
+            for field, text in (('pregunta', entry.pregunta_lower),
+                                ('respuesta', entry.respuesta_lower),
+                                ('categoria', entry.categoria_lower)):
+                postings = self.field_postings[field]
+                for token in set(text.split()):
+                    postings.setdefault(token, []).append(faq_id)
+
+        tokens = {token for postings in self.field_postings.values() for token in postings}
+        if previous is not None:
+            self.words = previous.words.updated(self.word_postings)
+            self.tokens = previous.tokens.updated(tokens)
+        else:
+            self.words = NGramIndex(self.word_postings)
+            self.tokens = NGramIndex(tokens)
+
+    @staticmethod
+    def _row_key(faq: Dict[str, str]) -> Tuple[str, str, str]:
+        return faq['pregunta'], faq['respuesta'], faq['categoria']
+
+    @staticmethod
+    def _index_faq(faq: Dict[str, str], normalizer: TextNormalizer) -> IndexedFAQ:
+        pregunta_lower = normalizer.fold(faq['pregunta'])
+        return IndexedFAQ(
+            pregunta_lower=pregunta_lower,
+            respuesta_lower=normalizer.fold(faq['respuesta']),
+            categoria_lower=normalizer.fold(faq['categoria']),
+            pregunta_words=tuple(normalizer.words(pregunta_lower)),
+        )
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def match(self, query_lower: str, query_words: Sequence[str]) -> QueryMatch:
+        """Resolver una consulta normalizada contra el índice"""
+        return QueryMatch(self, query_lower, query_words)
+
+    def field_hits(self, field: str, word: str) -> Set[int]:
+        """Ids de FAQ cuyo campo contiene ``word`` como subcadena"""
+        if not word:
+            # Una palabra vacía es subcadena de cualquier texto
+            return set(range(len(self.entries)))
+
+        postings = self.field_postings[field]
+        hits: Set[int] = set()
+        for token in self.tokens.containing(word):
+            hits.update(postings.get(token, ()))
+        return hits
+
+    def phrase_hits(self, query_lower: str) -> Set[int]:
+        """Ids de FAQ cuya pregunta o respuesta contiene la consulta completa"""
+        tokens = query_lower.split()
+        if not tokens:
+            return set(range(len(self.entries)))
+
+        hits: Set[int] = set()
+        for field in ('pregunta', 'respuesta'):
+            # Cada token de la consulta debe estar dentro de algún token del campo
+            field_ids = None
+            for token in sorted(set(tokens), key=len, reverse=True):
+                ids = self.field_hits(field, token)
+                field_ids = ids if field_ids is None else field_ids & ids
+                if not field_ids:
+                    break
+            for faq_id in field_ids or ():
+                text = getattr(self.entries[faq_id], f'{field}_lower')
+                if query_lower in text:
+                    hits.add(faq_id)
+        return hits
@@ -3,56 +3,263 @@ Módulo de Base de Conocimiento RAG (RAG para Generación Aumentada por Recupera
 Maneja la carga y búsqueda de datos de FAQ desde archivo CSV
 """
 
-import pandas as pd
-from typing import List, Dict, Optional
+from dataclasses import dataclass
+from typing import List, Dict, Optional, Sequence, Tuple
+from functools import lru_cache
+import heapq
+import logging
 import os
+import threading
+
+from .index import FAQIndex
+from .loader import iter_faq_rows
+from .normalization import TextNormalizer
+from .snapshot import config_fingerprint, load_snapshot, source_signature, write_snapshot
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class SearchResult:
+    """FAQ recuperada junto con su puntuación de similitud"""
+
+    faq: Dict[str, str]
+    score: float
+    faq_id: int
 
 
 class FAQKnowledgeBase:
     """Gestiona la base de conocimiento de FAQ desde archivo CSV"""
 
     # Caracteres de puntuación en español a remover de las palabras
-    PUNCTUATION = '?.,;:'
+    PUNCTUATION = '¿?¡!.,;:'
+
+    # Palabras vacías comunes en español a eliminar (se comparan sin acentos)
+    STOPWORDS = frozenset({
+        'de', 'la', 'el', 'en', 'y', 'a', 'los', 'las', 'del', 'al',
+        'es', 'un', 'una', 'con', 'por', 'para', 'su', 'sus', 'que',
+        'están', 'estan', 'como', 'cual', 'cuales'})
+
+    # Mapeos de sinónimos para mejorar la coincidencia
+    WORD_MAPPINGS = {
+        'donde': 'ubicad',
+        'ubicacion': 'ubicad',
+        'oficina': 'ubicad',
+        'direccion': 'ubicad',
+    }
+
+    # Margen para absorber el redondeo entre la estimación y la puntuación final
+    SCORE_EPSILON = 1e-9
+
+    # Entradas de las cachés LRU de consultas normalizadas y de resultados
+    CACHE_SIZE = 4096
+
+    # Fracción mínima de las FAQ vigentes que debe conservar una recarga
+    MIN_RELOAD_RATIO = 0.5
 
-    def __init__(self, excel_file: Optional[str] = None):
+    # Extensión del snapshot (JSON) que se guarda junto al CSV
+    SNAPSHOT_SUFFIX = '.kbsnap'
+
+    def __init__(self, excel_file: Optional[str] = None,
+                 snapshot_path: Optional[str] = None, use_snapshot: bool = True,
+                 auto_reload: bool = False, reload_interval: float = 2.0):
         """
         Inicializar la base de conocimiento
 
         Args:
             excel_file: Ruta al archivo CSV que contiene los datos de FAQ
+            snapshot_path: Ruta del snapshot (por defecto junto al CSV)
+            use_snapshot: Leer/escribir el snapshot para acelerar el arranque
+            auto_reload: Vigilar el CSV y recargar el índice cuando cambie
+            reload_interval: Segundos entre revisiones del CSV al vigilarlo; un
+                cambio se carga cuando el archivo sigue igual en la revisión siguiente
         """
         if excel_file is None:
             excel_file = "./data_limpia/faq_limpio.csv"
-        
+        if use_snapshot and snapshot_path is None:
+            snapshot_path = excel_file + self.SNAPSHOT_SUFFIX
+
         self.excel_file = excel_file
-        self.faqs: List[Dict[str, str]] = []
+        self.snapshot_path = snapshot_path if use_snapshot else None
+        self._normalizer = TextNormalizer(
+            self.PUNCTUATION, self.STOPWORDS, self.WORD_MAPPINGS, cache_size=self.CACHE_SIZE)
+        self._cached_top_k = lru_cache(maxsize=self.CACHE_SIZE)(self._compute_top_k)
+        self._index = FAQIndex([], self._normalizer)
+        self._batch_scorer = None
+        self._source_signature: Optional[Tuple[int, int]] = None
+        self._reload_lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        self._stop_watching = threading.Event()
         self.load_data()
 
+        if auto_reload:
+            self.start_watching(reload_interval)
+
+    @property
+    def faqs(self) -> List[Dict[str, str]]:
+        """FAQ del índice vigente"""
+        return self._index.faqs
+
+    @property
+    def version(self) -> int:
+        """Versión del índice vigente; aumenta con cada carga o recarga"""
+        return self._index.version
+
+    def normalize_question(self, query: str) -> str:
+        """
+        Forma canónica de una pregunta para usarla como clave de caché
+
+        Args:
+            query: Pregunta del usuario
+
+        Returns:
+            Pregunta en minúsculas, sin acentos, sin puntuación y con espacios colapsados
+        """
+        return self._normalizer.canonical(query)
+
     def load_data(self) -> None:
-        """Cargar datos de FAQ desde archivo CSV"""
+        """Cargar datos de FAQ desde el snapshot o, si no es válido, desde el CSV"""
         if not os.path.exists(self.excel_file):
             raise FileNotFoundError(
                 f"Archivo CSV no encontrado: {self.excel_file}")
 
+        with self._reload_lock:
+            self._load(previous=None)
+
+    def _load(self, previous: Optional[FAQIndex], allow_shrink: bool = True) -> bool:
+        signature = source_signature(self.excel_file)
+        fingerprint = config_fingerprint(self._normalizer.fingerprint)
+        index = None
+        if self.snapshot_path:
+            index = load_snapshot(self.snapshot_path, self.excel_file, fingerprint)
+        from_snapshot = index is not None
+
+        if index is None:
+            try:
+                # Leer el CSV en streaming y precalcular tokens y listas de publicación
+                index = FAQIndex(iter_faq_rows(self.excel_file),
+                                 self._normalizer, previous=previous)
+            except Exception as e:
+                raise Exception(f"Error al cargar archivo CSV: {str(e)}")
+
+        if previous is not None and not allow_shrink and self._shrinks(previous, index):
+            # No reintentar la misma versión del archivo hasta que vuelva a cambiar
+            self._source_signature = signature
+            logger.warning(
+                "Recarga de %s descartada: %d FAQs frente a %d vigentes",
+                self.excel_file, len(index.faqs), len(previous.faqs),
+                extra={"event": "kb_reload_rejected", "path": self.excel_file,
+                       "faqs": len(index.faqs), "current_faqs": len(previous.faqs)},
+            )
+            return False
+
+        self._set_index(index, signature)
+        path = self.snapshot_path if from_snapshot else self.excel_file
+        logger.info(
+            "Cargadas %d FAQs desde %s%s", len(self.faqs),
+            "snapshot " if from_snapshot else "", path,
+            extra={"event": "kb_loaded", "faqs": len(self.faqs),
+                   "origin": "snapshot" if from_snapshot else "csv", "path": path,
+                   "kb_version": index.version},
+        )
+
+        if self.snapshot_path and not from_snapshot:
+            self._write_snapshot(index, fingerprint, signature)
+        return True
+
+    def _shrinks(self, previous: FAQIndex, index: FAQIndex) -> bool:
+        """Un índice vacío o mucho menor que el vigente suele ser un CSV truncado"""
+        if not index.faqs:
+            return bool(previous.faqs)
+        return len(index.faqs) < len(previous.faqs) * self.MIN_RELOAD_RATIO
+
+    def _write_snapshot(self, index: FAQIndex, fingerprint: str,
+                        signature: Tuple[int, int]) -> None:
+        """Guardar el snapshot; un fallo de escritura no impide usar la KB"""
         try:
-            df = pd.read_csv(self.excel_file)
+            write_snapshot(self.snapshot_path, self.excel_file, index, fingerprint, signature)
+        except OSError as e:
+            logger.warning(
+                "No se pudo escribir el snapshot %s: %s", self.snapshot_path, e,
+                extra={"event": "kb_snapshot_error", "path": self.snapshot_path},
+            )
+
+    def _set_index(self, index: FAQIndex, signature: Tuple[int, int]) -> None:
+        """Publicar un índice nuevo con una sola asignación (atómica)"""
+        index.version = self._index.version + 1
+        self._source_signature = signature
+        self._index = index
+        # Liberar el índice anterior: resultados memorizados y matrices del lote
+        self._cached_top_k.cache_clear()
+        self._batch_scorer = None
+
+    def reload(self, force: bool = False, allow_shrink: bool = False) -> bool:
+        """
+        Recargar el CSV si cambió y reemplazar el índice de forma atómica
+
+        Las búsquedas en curso conservan el índice que tomaron al empezar; las
+        FAQ sin cambios y el vocabulario común se reutilizan del índice anterior.
+        Un índice vacío o con menos de ``MIN_RELOAD_RATIO`` de las FAQ vigentes
+        se descarta (evento ``kb_reload_rejected``) salvo con ``allow_shrink``.
+
+        Args:
+            force: Recargar aunque el archivo no parezca modificado
+            allow_shrink: Publicar el índice aunque sea vacío o mucho menor
+
+        Returns:
+            True si se publicó un índice nuevo
+        """
+        with self._reload_lock:
+            if not force and source_signature(self.excel_file) == self._source_signature:
+                return False
+            return self._load(previous=self._index, allow_shrink=allow_shrink)
 
-            # Convertir DataFrame a lista de diccionarios de preguntas-respuestas
-            for _, row in df.iterrows():
-                self.faqs.append({
-                    'pregunta': str(row['pregunta']),
-                    'respuesta': str(row['respuesta']),
-                    'categoria': str(row.get('categoria', 'General'))
-                })
+    def start_watching(self, interval: float = 2.0) -> None:
+        """Vigilar el CSV en un hilo de fondo y recargar cuando cambie"""
+        if self._watcher is not None and self._watcher.is_alive():
+            return
+        self._stop_watching.clear()
+        self._watcher = threading.Thread(
+            target=self._watch, args=(interval,), name="faq-kb-watcher", daemon=True)
+        self._watcher.start()
 
-            print(f"✓ Cargadas {len(self.faqs)} FAQs desde {self.excel_file}")
-        except Exception as e:
-            raise Exception(f"Error al cargar archivo CSV: {str(e)}")
+    def stop_watching(self) -> None:
+        """Detener el hilo que vigila el CSV"""
+        self._stop_watching.set()
+        if self._watcher is not None:
+            self._watcher.join()
+            self._watcher = None
+
+    def _watch(self, interval: float) -> None:
+        pending: Optional[Tuple[int, int]] = None
+        while not self._stop_watching.wait(interval):
+            try:
+                signature = source_signature(self.excel_file)
+                if signature == self._source_signature:
+                    pending = None
+                    continue
+                if signature != pending:
+                    # Esperar una revisión con mtime y tamaño estables: el CSV
+                    # puede estar escribiéndose todavía
+                    pending = signature
+                    continue
+                pending = None
+                self.reload()
+            except Exception as e:
+                # Un CSV a medio escribir no debe tumbar el índice vigente
+                logger.warning(
+                    "No se pudo recargar %s: %s", self.excel_file, e,
+                    extra={"event": "kb_reload_error", "path": self.excel_file},
+                )
 
     def search(self, query: str, threshold: float = 0.2) -> Optional[Dict[str, str]]:
         """
         Búsqueda mejorada basada en palabras clave en la base de datos de FAQ
 
+        Usa el índice invertido y de n-gramas construido en ``load_data`` para
+        puntuar solo las FAQ candidatas; el ranking es el mismo que el del
+        escaneo completo.
+
         Args:
             query: Pregunta del usuario
             threshold: Umbral mínimo de similitud
@@ -60,70 +267,148 @@ class FAQKnowledgeBase:
         Returns:
             Mejor FAQ coincidente o None si no se encuentra ninguna
         """
-        query_lower = query.lower()
-        best_match = None
-        best_score = 0
-
-        # Palabras vacías comunes en español a eliminar
-        stopwords = {'de', 'la', 'el', 'en', 'y', 'a', 'los', 'las', 'del', 'al',
-                     'es', 'un', 'una', 'con', 'por', 'para', 'su', 'sus', 'que', '¿', '?',
-                     'están', 'estan', 'como', 'cual', 'cuales'}
-
-        # Mapeos de sinónimos para mejorar la coincidencia
-        word_mappings = {
-            'donde': 'ubicad',
-            'ubicacion': 'ubicad',
-            'oficina': 'ubicad',
-            'direccion': 'ubicad',
-        }
-
-        # Procesar consulta eliminando puntuación y stopwords
-        query_words = [w.strip(self.PUNCTUATION) for w in query_lower.split()
-                       if w.strip(self.PUNCTUATION) not in stopwords]
-        # Aplicar mapeos de sinónimos
-        query_words = [word_mappings.get(w, w) for w in query_words]
-
-        for faq in self.faqs:
-            pregunta_lower = faq['pregunta'].lower()
-            respuesta_lower = faq['respuesta'].lower()
-            categoria_lower = faq['categoria'].lower()
-
-            # Procesar pregunta FAQ removiendo stopwords y puntuación
-            pregunta_words = [w.strip(self.PUNCTUATION) for w in pregunta_lower.split()
-                              if w.strip(self.PUNCTUATION) not in stopwords]
-
-            score = 0
-
-            # Evaluar coincidencias parciales de palabras
-            for query_word in query_words:
-                # Verificar coincidencia en pregunta FAQ
-                for pregunta_word in pregunta_words:
-                    if query_word in pregunta_word or pregunta_word in query_word:
-                        score += 0.4
-                    if query_word == pregunta_word:
-                        score += 0.2
-
-                # Verificar coincidencia en categoría
-                if query_word in categoria_lower:
-                    score += 0.3
-
-                # Verificar coincidencia en respuesta (peso menor)
-                if query_word in respuesta_lower:
-                    score += 0.1
-
-            # Normalizar la puntuación final
-            if len(query_words) > 0:
-                score = score / len(query_words)
-
-                # Bonus si la consulta coincide exactamente con la pregunta o respuesta
-                if query_lower in pregunta_lower or query_lower in respuesta_lower:
-                    score += 0.5
-
-                if score > best_score and score > threshold:
-                    best_score = score
-                    best_match = faq
-
-        return best_match
+        results = self.search_top_k(query, k=1, threshold=threshold)
+        return results[0].faq if results else None
+
+    def search_top_k(self, query: str, k: int = 3,
+                     threshold: float = 0.2) -> List[SearchResult]:
+        """
+        Recuperar las k FAQ con mayor puntuación usando un heap acotado
+
+        Las candidatas se visitan en orden de su estimación (calculada al
+        recorrer las listas de publicación) y solo se puntúan hasta que
+        ninguna restante pueda superar a la k-ésima puntuación actual.
+
+        Args:
+            query: Pregunta del usuario
+            k: Número máximo de resultados
+            threshold: Umbral mínimo de similitud
+
+        Returns:
+            Resultados ordenados por puntuación descendente (empates por orden de carga)
+        """
+        query_lower, query_words = self._normalizer.normalize_query(query)
+        if not query_words or k <= 0:
+            return []
+
+        # El índice forma parte de la clave: una recarga nunca sirve resultados viejos
+        index = self._index
+        results = self._cached_top_k(index, query_lower, query_words, k, threshold)
+        if index is not self._index:
+            # La búsqueda empezó antes de una recarga y memorizó el índice anterior
+            self._cached_top_k.cache_clear()
+        return list(results)
+
+    def _compute_top_k(self, index: FAQIndex, query_lower: str, query_words: Tuple[str, ...],
+                       k: int, threshold: float) -> Tuple[SearchResult, ...]:
+        """Top-k sin memorizar (usar ``_cached_top_k``)"""
+        match = index.match(query_lower, query_words)
+
+        # Candidatas ordenadas por cota superior, sin ordenar todo el corpus
+        frontier = [(-match.estimate(faq_id), faq_id) for faq_id in match.candidates]
+        heapq.heapify(frontier)
+
+        # Heap mínimo de tamaño k con (puntuación, -id): la raíz es la k-ésima
+        top: List[Tuple[float, int]] = []
+        while frontier:
+            neg_estimate, faq_id = heapq.heappop(frontier)
+            bound = -neg_estimate + self.SCORE_EPSILON
+            if bound <= threshold or bound <= 0:
+                break
+            if len(top) == k and bound < top[0][0]:
+                break
+
+            score = match.score(faq_id)
+            if score <= threshold or score <= 0:
+                continue
+            item = (score, -faq_id)
+            if len(top) < k:
+                heapq.heappush(top, item)
+            elif item > top[0]:
+                heapq.heapreplace(top, item)
+
+        return tuple(
+            SearchResult(faq=index.faqs[-neg_id], score=score, faq_id=-neg_id)
+            for score, neg_id in sorted(top, reverse=True)
+        )
+
+    def search_many(
+        self,
+        queries: Sequence[str],
+        threshold: float = 0.2,
+    ) -> List[Optional[Dict[str, str]]]:
+        """
+        Búsqueda por lotes con matrices dispersas
+
+        Codifica el corpus una sola vez (por versión del índice) en matrices
+        de términos para pregunta, respuesta y categoría, y puntúa todo el lote
+        con productos de matrices. Devuelve solo la mejor FAQ (``k=1``) de cada
+        consulta. Requiere el extra ``lazarus-kb[batch]``.
+
+        Args:
+            queries: Preguntas de los usuarios
+            threshold: Umbral mínimo de similitud
+
+        Returns:
+            Mejor FAQ coincidente (o None) para cada consulta, en el mismo orden
+        """
+        return [None if result is None else result.faq
+                for result in self._search_best_many(queries, threshold)]
+
+    def _search_best_many(self, queries: Sequence[str],
+                          threshold: float) -> List[Optional[SearchResult]]:
+        """Mejor resultado por consulta con el puntuador por lotes"""
+        from .batch import BatchScorer
+
+        index = self._index
+        scorer = self._batch_scorer
+        if scorer is None or scorer.index is not index:
+            scorer = BatchScorer(index)
+            self._batch_scorer = scorer
+
+        normalized = [self._normalizer.normalize_query(query) for query in queries]
+        queries_lower = [query_lower for query_lower, _ in normalized]
+        queries_words = [query_words for _, query_words in normalized]
+        best = scorer.search_many(queries_lower, queries_words, threshold)
+        return [
+            None if match is None
+            else SearchResult(faq=index.faqs[match[0]], score=match[1], faq_id=match[0])
+            for match in best
+        ]
+
+    def search_top_k_many(self, queries: Sequence[str], k: int = 3,
+                          threshold: float = 0.2) -> List[List[SearchResult]]:
+        """
+        Top-k para un lote de consultas, resolviendo cada consulta distinta una sola vez
+
+        Solo ``k=1`` se vectoriza, con el puntuador por matrices dispersas de
+        ``search_many`` (extra ``lazarus-kb[batch]``). Con ``k > 1``, o sin el
+        extra instalado, cada consulta distinta pasa por ``search_top_k`` de
+        forma escalar; el resultado es el mismo en ambos casos.
+
+        Args:
+            queries: Preguntas de los usuarios
+            k: Número máximo de resultados por consulta
+            threshold: Umbral mínimo de similitud
+
+        Returns:
+            Resultados de cada consulta, en el mismo orden que ``queries``
+        """
+        unique = list(dict.fromkeys(queries))
+        by_query: Dict[str, List[SearchResult]] = {}
+        if k == 1:
+            try:
+                best = self._search_best_many(unique, threshold)
+            except ImportError:
+                pass
+            else:
+                by_query = {
+                    query: [] if result is None else [result]
+                    for query, result in zip(unique, best)
+                }
+        if not by_query:
+            by_query = {query: self.search_top_k(query, k, threshold) for query in unique}
+        return [list(by_query[query]) for query in queries]
 
     def get_all_faqs(self) -> List[Dict[str, str]]:
         """Devolver todas las FAQ cargadas"""
@@ -0,0 +1,63 @@
+"""
+Lector de FAQ en streaming basado en el módulo ``csv`` de la biblioteca estándar
+Reemplaza a pandas en la carga del CSV limpio, sin materializar un DataFrame
+
+Diferencia con ``pandas.read_csv``: pandas infería el tipo de cada columna y
+una columna enteramente numérica se convertía a número antes de ``str()``
+(``'1.50'`` → ``'1.5'``, ``'7'`` → ``'7.0'`` si la columna tenía nulos). Este
+lector no infiere tipos: conserva el texto de cada celda tal cual, salvo los
+nulos, que siguen siendo ``'nan'``.
+"""
+
+import csv
+from typing import Dict, Iterator, Optional
+
+# Cadenas que ``pandas.read_csv`` interpreta como NaN por defecto; se
+# convierten a 'nan' para conservar la coerción ``str()`` de la carga anterior
+NA_VALUES = frozenset({
+    '', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan',
+    '1.#IND', '1.#QNAN', '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a',
+    'nan', 'null',
+})
+
+DEFAULT_CATEGORY = 'General'
+
+
+def _coerce(value: Optional[str]) -> str:
+    """Texto de una celda con la misma representación de nulos que pandas"""
+    if value is None or value in NA_VALUES:
+        return 'nan'
+    return value
+
+
+def iter_faq_rows(path: str, encoding: str = 'utf-8-sig') -> Iterator[Dict[str, str]]:
+    """
+    Recorrer las filas del CSV de FAQ una a una
+
+    Args:
+        path: Ruta al archivo CSV con columnas ``pregunta``, ``respuesta`` y
+            opcionalmente ``categoria``
+        encoding: Codificación del archivo (``utf-8-sig`` descarta el BOM)
+
+    Yields:
+        Diccionarios con ``pregunta``, ``respuesta`` y ``categoria`` con el
+        texto literal de cada celda; si el CSV no tiene columna ``categoria``
+        se usa ``'General'``
+
+    Raises:
+        KeyError: Si faltan las columnas ``pregunta`` o ``respuesta``
+    """
+    with open(path, newline='', encoding=encoding) as handle:
+        reader = csv.DictReader(handle)
+        fieldnames = reader.fieldnames or []
+        for column in ('pregunta', 'respuesta'):
+            if column not in fieldnames:
+                raise KeyError(column)
+        has_categoria = 'categoria' in fieldnames
+
+        for row in reader:
+            yield {
+                'pregunta': _coerce(row['pregunta']),
+                'respuesta': _coerce(row['respuesta']),
+                'categoria': _coerce(row['categoria']) if has_categoria else DEFAULT_CATEGORY,
+            }
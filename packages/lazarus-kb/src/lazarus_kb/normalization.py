@@ -0,0 +1,78 @@
+"""
+Normalización de texto para la búsqueda en la base de conocimiento
+Se construye una sola vez y se aplica igual a las consultas y a las FAQ
+"""
+
+import json
+import re
+import unicodedata
+from functools import lru_cache
+from typing import Dict, Iterable, List, Tuple
+
+
+def fold_accents(text: str) -> str:
+    """Quitar diacríticos con la descomposición NFKD (``dónde`` → ``donde``)"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    if decomposed.isascii():
+        return decomposed
+    return ''.join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class TextNormalizer:
+    """
+    Pipeline de normalización: minúsculas, plegado de acentos, puntuación,
+    stopwords y sinónimos
+
+    Las stopwords y los sinónimos se pliegan al construir el pipeline, y las
+    consultas normalizadas se memorizan en una caché LRU porque el tráfico
+    repite mucho las mismas frases.
+    """
+
+    def __init__(self, punctuation: str, stopwords: Iterable[str],
+                 word_mappings: Dict[str, str], cache_size: int = 4096):
+        """
+        Args:
+            punctuation: Caracteres a remover al inicio y al final de cada palabra
+            stopwords: Palabras a ignorar (se pliegan los acentos)
+            word_mappings: Sinónimos palabra → forma canónica (solo consultas)
+            cache_size: Máximo de consultas normalizadas en la caché LRU
+        """
+        self.punctuation = punctuation
+        self.stopwords = frozenset(fold_accents(w.lower()) for w in stopwords)
+        self.word_mappings = {fold_accents(k.lower()): v for k, v in word_mappings.items()}
+
+        # Puntuación pegada al inicio o al final de cada palabra, en una sola pasada
+        chars = re.escape(punctuation)
+        self._edge_punctuation = re.compile(rf'(?<!\S)[{chars}]+|[{chars}]+(?!\S)')
+
+        self.normalize_query = lru_cache(maxsize=cache_size)(self._normalize_query)
+
+    @property
+    def fingerprint(self) -> str:
+        """Descripción estable de la configuración (para invalidar snapshots)"""
+        return json.dumps(['nfkd-lower', self.punctuation, sorted(self.stopwords)])
+
+    @staticmethod
+    def fold(text: str) -> str:
+        """Texto en minúsculas y sin acentos"""
+        return fold_accents(text.lower())
+
+    def words(self, folded_text: str) -> List[str]:
+        """Palabras de un texto ya plegado, sin puntuación ni stopwords"""
+        return [w for w in self._edge_punctuation.sub('', folded_text).split()
+                if w not in self.stopwords]
+
+    def canonical(self, text: str) -> str:
+        """Texto plegado sin puntuación y con espacios colapsados (conserva stopwords)"""
+        return ' '.join(self._edge_punctuation.sub('', self.fold(text)).split())
+
+    def _normalize_query(self, query: str) -> Tuple[str, Tuple[str, ...]]:
+        """
+        Normalizar una consulta (usar ``normalize_query``, que está en caché)
+
+        Returns:
+            Consulta completa plegada y sus palabras con sinónimos aplicados
+        """
+        folded = self.fold(query)
+        words = tuple(self.word_mappings.get(w, w) for w in self.words(folded))
+        return folded, words
@@ -0,0 +1,196 @@
+"""
+Snapshot de la base de conocimiento
+Guarda los registros, los tokens normalizados y el índice en un solo archivo
+para evitar reparsear el CSV en cada arranque en frío
+
+El contenido es JSON (datos planos, nunca código): un snapshot manipulado
+puede como mucho fallar la validación, no ejecutar nada al cargarse.
+"""
+
+import hashlib
+import json
+import os
+import struct
+import tempfile
+from typing import Any, Dict, List, Optional, Tuple
+
+from .index import FAQIndex, IndexedFAQ, NGramIndex
+
+# Cabecera: magia + longitud del JSON de metadatos (uint32 little endian)
+MAGIC = b'LZKBSNAP'
+HEADER = struct.Struct('<8sI')
+
+# Incrementar cuando cambie la estructura de FAQIndex o su normalización
+FORMAT_VERSION = 4
+
+
+def file_sha256(path: str) -> str:
+    """Hash SHA-256 del contenido de un archivo"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def config_fingerprint(config: str) -> str:
+    """Huella de la configuración de normalización usada al indexar"""
+    payload = json.dumps([FORMAT_VERSION, config])
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+def source_signature(source_path: str) -> Tuple[int, int]:
+    """Firma barata del CSV de origen: (mtime en ns, tamaño en bytes)"""
+    stat = os.stat(source_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _encode_index(index: FAQIndex) -> Dict[str, Any]:
+    """Estado de un ``FAQIndex`` como tipos JSON (listas de publicación incluidas)"""
+    return {
+        'faqs': index.faqs,
+        'entries': [[entry.pregunta_lower, entry.respuesta_lower,
+                     entry.categoria_lower, list(entry.pregunta_words)]
+                    for entry in index.entries],
+        'word_postings': index.word_postings,
+        'field_postings': index.field_postings,
+        'words': {gram: sorted(words) for gram, words in index.words.grams.items()},
+        'tokens': {gram: sorted(words) for gram, words in index.tokens.grams.items()},
+    }
+
+
+def _decode_ngrams(vocabulary: List[str], grams: Dict[str, List[str]]) -> NGramIndex:
+    ngrams = NGramIndex.__new__(NGramIndex)
+    ngrams.vocabulary = frozenset(vocabulary)
+    ngrams.grams = {str(gram): set(words) for gram, words in grams.items()}
+    for words in ngrams.grams.values():
+        if not words <= ngrams.vocabulary:
+            raise ValueError('n-grama con palabras fuera del vocabulario')
+    return ngrams
+
+
+def _decode_postings(postings: Dict[str, List[int]], count: int) -> Dict[str, List[int]]:
+    decoded = {}
+    for token, ids in postings.items():
+        if not all(type(faq_id) is int and 0 <= faq_id < count for faq_id in ids):
+            raise ValueError('lista de publicación fuera de rango')
+        decoded[str(token)] = list(ids)
+    return decoded
+
+
+def _decode_index(state: Dict[str, Any]) -> FAQIndex:
+    """Reconstruir el ``FAQIndex`` sin volver a normalizar ni indexar"""
+    index = FAQIndex.__new__(FAQIndex)
+    index.faqs = [{'pregunta': str(faq['pregunta']), 'respuesta': str(faq['respuesta']),
+                   'categoria': str(faq['categoria'])} for faq in state['faqs']]
+    index.version = 0
+    index.entries = [IndexedFAQ(str(pregunta), str(respuesta), str(categoria),
+                                tuple(str(word) for word in words))
+                     for pregunta, respuesta, categoria, words in state['entries']]
+    count = len(index.faqs)
+    if len(index.entries) != count:
+        raise ValueError('snapshot inconsistente')
+    index.word_postings = _decode_postings(state['word_postings'], count)
+    index.field_postings = {field: _decode_postings(state['field_postings'][field], count)
+                            for field in FAQIndex.FIELDS}
+
+    tokens = {token for postings in index.field_postings.values() for token in postings}
+    index.words = _decode_ngrams(list(index.word_postings), state['words'])
+    index.tokens = _decode_ngrams(list(tokens), state['tokens'])
+    return index
+
+
+def write_snapshot(snapshot_path: str, source_path: str, index: FAQIndex,
+                   fingerprint: str, signature: Tuple[int, int]) -> bool:
+    """
+    Escribir el snapshot de forma atómica (archivo temporal + rename)
+
+    Args:
+        snapshot_path: Ruta del snapshot a generar
+        source_path: CSV de origen con el que se validará el snapshot
+        index: Índice ya construido
+        fingerprint: Huella de la configuración de normalización
+        signature: Firma del CSV tomada antes de leerlo para construir ``index``
+
+    Returns:
+        False si el CSV cambió desde que se leyó (no se escribe nada)
+    """
+    source_sha256 = file_sha256(source_path)
+    if source_signature(source_path) != signature:
+        return False
+
+    metadata = {
+        'format_version': FORMAT_VERSION,
+        'fingerprint': fingerprint,
+        'source_mtime_ns': signature[0],
+        'source_size': signature[1],
+        'source_sha256': source_sha256,
+        'count': len(index),
+    }
+    header_json = json.dumps(metadata).encode('utf-8')
+    payload = json.dumps(_encode_index(index), ensure_ascii=False,
+                         separators=(',', ':')).encode('utf-8')
+
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.kbsnap-', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as handle:
+            handle.write(HEADER.pack(MAGIC, len(header_json)))
+            handle.write(header_json)
+            handle.write(payload)
+        # mkstemp crea el archivo con permisos 0600
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, snapshot_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return True
+
+
+def _is_fresh(metadata: Dict[str, Any], source_path: str, fingerprint: str) -> bool:
+    if metadata.get('format_version') != FORMAT_VERSION:
+        return False
+    if metadata.get('fingerprint') != fingerprint:
+        return False
+
+    mtime_ns, size = source_signature(source_path)
+    if metadata.get('source_mtime_ns') == mtime_ns and metadata.get('source_size') == size:
+        return True
+    # El archivo fue tocado: solo es válido si el contenido no cambió
+    return (metadata.get('source_size') == size
+            and metadata.get('source_sha256') == file_sha256(source_path))
+
+
+def load_snapshot(snapshot_path: str, source_path: str,
+                  fingerprint: str) -> Optional[FAQIndex]:
+    """
+    Cargar el snapshot si sigue siendo válido
+
+    Solo se decodifica JSON y se comprueban los tipos al reconstruir el
+    índice; cualquier archivo inesperado se descarta y se vuelve al CSV.
+
+    Args:
+        snapshot_path: Ruta del snapshot
+        source_path: CSV de origen para validar mtime/tamaño/hash
+        fingerprint: Huella de la configuración de normalización actual
+
+    Returns:
+        Índice reconstruido, o None si no existe, está corrupto o desactualizado
+    """
+    if not os.path.exists(snapshot_path):
+        return None
+
+    try:
+        with open(snapshot_path, 'rb') as handle:
+            magic, header_len = HEADER.unpack(handle.read(HEADER.size))
+            if magic != MAGIC:
+                return None
+            metadata = json.loads(handle.read(header_len))
+            if not isinstance(metadata, dict) or not _is_fresh(metadata, source_path, fingerprint):
+                return None
+            index = _decode_index(json.loads(handle.read()))
+    except (OSError, ValueError, struct.error, KeyError, TypeError, AttributeError):
+        return None
+
+    return index if len(index) == metadata.get('count') else None
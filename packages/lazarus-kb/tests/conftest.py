@@ -0,0 +1,22 @@
+from typing import Dict, Sequence
+
+import pytest
+
+from kb_reference import write_faq_csv
+from lazarus_kb import FAQKnowledgeBase
+
+
+@pytest.fixture
+def make_kb(tmp_path):
+    """Fábrica de bases de conocimiento sobre un CSV temporal (sin snapshot por defecto)"""
+    knowledge_bases = []
+
+    def make(faqs: Sequence[Dict[str, str]], name: str = 'faq.csv', **kwargs) -> FAQKnowledgeBase:
+        kwargs.setdefault('use_snapshot', False)
+        kb = FAQKnowledgeBase(write_faq_csv(tmp_path / name, faqs), **kwargs)
+        knowledge_bases.append(kb)
+        return kb
+
+    yield make
+    for kb in knowledge_bases:
+        kb.stop_watching()
@@ -0,0 +1,120 @@
+"""
+Corpus sintéticos y puntuador de referencia para las pruebas de la búsqueda
+
+El puntuador de referencia es el escaneo completo original, con el mismo
+pipeline de normalización que usa la base de conocimiento
+"""
+
+import csv
+import random
+from typing import Dict, List, Sequence, Tuple
+
+from lazarus_kb import FAQKnowledgeBase
+from lazarus_kb.normalization import TextNormalizer
+
+# Palabras con subcadenas compartidas, acentos, stopwords, sinónimos y puntuación
+VOCABULARY = [
+    'ubicados', 'ubicadas', 'ubicad', 'oficina', 'oficinas', 'dónde', 'donde',
+    'dirección', 'sede', 'central', 'envío', 'envíos', 'envio', 'precio',
+    'precios', 'pre', 'cio', 'lazarus', 'admix', 'im-1', 'techos', 'techo',
+    'plastificante', 'garantía', 'horario', 'atención', 'humedad', 'paredes',
+    'de', 'la', 'el', 'en', 'que', 'cuál', 'están', 'a', 'x', 'sí', 'si',
+    '¿qué', 'es?', '¡hola!', '7:30', 'am', 'productos', 'aditivos',
+]
+CATEGORIES = ['Productos', 'Ubicaciones', 'Contacto', 'Envíos', 'General', 'precio']
+QUERY_EXTRAS = ['¿', '?', '¡!', '...', 'oficina', 'ubicación', 'DÓNDE', 'Dirección']
+
+REFERENCE = TextNormalizer(FAQKnowledgeBase.PUNCTUATION, FAQKnowledgeBase.STOPWORDS,
+                           FAQKnowledgeBase.WORD_MAPPINGS)
+
+
+def baseline_scores(faqs: Sequence[Dict[str, str]], query: str) -> List[float]:
+    """Puntuación de cada FAQ con el escaneo completo (una lista vacía si no hay palabras)"""
+    query_lower = REFERENCE.fold(query)
+    query_words = [REFERENCE.word_mappings.get(w, w) for w in REFERENCE.words(query_lower)]
+    if not query_words:
+        return []
+
+    scores = []
+    for faq in faqs:
+        pregunta_lower = REFERENCE.fold(faq['pregunta'])
+        respuesta_lower = REFERENCE.fold(faq['respuesta'])
+        categoria_lower = REFERENCE.fold(faq['categoria'])
+        pregunta_words = REFERENCE.words(pregunta_lower)
+
+        score = 0
+        for query_word in query_words:
+            for pregunta_word in pregunta_words:
+                if query_word in pregunta_word or pregunta_word in query_word:
+                    score += 0.4
+                if query_word == pregunta_word:
+                    score += 0.2
+            if query_word in categoria_lower:
+                score += 0.3
+            if query_word in respuesta_lower:
+                score += 0.1
+
+        score = score / len(query_words)
+        if query_lower in pregunta_lower or query_lower in respuesta_lower:
+            score += 0.5
+        scores.append(score)
+    return scores
+
+
+def baseline_top_k(faqs: Sequence[Dict[str, str]], query: str, k: int,
+                   threshold: float) -> List[Tuple[int, float]]:
+    """(id, puntuación) de las k mejores FAQ; los empates los gana la cargada antes"""
+    scores = baseline_scores(faqs, query)
+    ranked = sorted((faq_id for faq_id, score in enumerate(scores)
+                     if score > threshold and score > 0),
+                    key=lambda faq_id: (-scores[faq_id], faq_id))
+    return [(faq_id, scores[faq_id]) for faq_id in ranked[:k]]
+
+
+def random_text(rng: random.Random, low: int, high: int) -> str:
+    return ' '.join(rng.choice(VOCABULARY) for _ in range(rng.randint(low, high)))
+
+
+def random_corpus(seed: int, size: int = 40) -> List[Dict[str, str]]:
+    """FAQ aleatorias, con duplicados exactos para provocar empates"""
+    rng = random.Random(seed)
+    faqs = []
+    for _ in range(size):
+        if faqs and rng.random() < 0.1:
+            faqs.append(dict(rng.choice(faqs)))
+            continue
+        faqs.append({
+            'pregunta': random_text(rng, 1, 6),
+            'respuesta': random_text(rng, 0, 12),
+            'categoria': rng.choice(CATEGORIES),
+        })
+    return faqs
+
+
+def random_queries(seed: int, faqs: Sequence[Dict[str, str]], count: int = 60) -> List[str]:
+    """Consultas aleatorias: palabras sueltas, fragmentos literales de las FAQ y puntuación"""
+    rng = random.Random(seed)
+    queries = ['', '¿?', '¡!', 'de la', 'oficina central', '¿Dónde están las oficinas?']
+    for _ in range(count):
+        kind = rng.random()
+        if kind < 0.4:
+            words = [rng.choice(VOCABULARY + QUERY_EXTRAS) for _ in range(rng.randint(1, 4))]
+            queries.append(' '.join(words))
+        else:
+            # Fragmento literal de una pregunta o respuesta (activa el bonus)
+            text = rng.choice(faqs)[rng.choice(('pregunta', 'respuesta'))]
+            words = text.split()
+            if not words:
+                continue
+            start = rng.randrange(len(words))
+            fragment = ' '.join(words[start:start + rng.randint(1, 3)])
+            queries.append(fragment.upper() if rng.random() < 0.2 else fragment)
+    return queries
+
+
+def write_faq_csv(path, faqs: Sequence[Dict[str, str]]) -> str:
+    with open(path, 'w', newline='', encoding='utf-8') as handle:
+        writer = csv.DictWriter(handle, fieldnames=['pregunta', 'respuesta', 'categoria'])
+        writer.writeheader()
+        writer.writerows(faqs)
+    return str(path)
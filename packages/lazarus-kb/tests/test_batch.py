@@ -0,0 +1,55 @@
+"""El puntuador por lotes elige la misma FAQ, con la misma puntuación, que ``search``."""
+
+import sys
+
+import pytest
+
+from kb_reference import baseline_top_k, random_corpus, random_queries
+
+pytest.importorskip('scipy')
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('threshold', [0.2, 0.3, 0.6])
+def test_batch_scores_match_scalar_search(make_kb, seed, threshold):
+    kb = make_kb(random_corpus(seed, size=60))
+    queries = random_queries(seed, kb.faqs, count=120)
+
+    best = kb._search_best_many(queries, threshold)
+
+    for query, result in zip(queries, best):
+        expected = baseline_top_k(kb.faqs, query, k=1, threshold=threshold)
+        assert ([] if result is None else [(result.faq_id, result.score)]) == expected, query
+    assert kb.search_many(queries, threshold) == [kb.search(q, threshold) for q in queries]
+
+
+def test_close_contenders_are_rescored_exactly(make_kb):
+    # 0.4 + 0.2 suma 0.6000000000000001 en coma flotante; la matriz da 6/10 = 0.6
+    kb = make_kb([
+        {'pregunta': 'Garantía', 'respuesta': 'Un año', 'categoria': 'General'},
+        {'pregunta': 'Horario', 'respuesta': 'Lunes', 'categoria': 'Contacto'},
+    ])
+
+    assert kb.search('horario', threshold=0.6) is kb.faqs[1]
+    assert kb.search_many(['horario'], threshold=0.6) == [kb.faqs[1]]
+
+
+def test_search_top_k_many_keeps_order_and_k(make_kb):
+    kb = make_kb(random_corpus(3))
+    queries = random_queries(3, kb.faqs, count=30)
+    queries = queries + queries[::-1]
+
+    for k in (1, 3):
+        expected = [kb.search_top_k(q, k=k) for q in queries]
+        assert kb.search_top_k_many(queries, k=k) == expected
+
+
+def test_search_top_k_many_falls_back_without_the_batch_extra(make_kb, monkeypatch):
+    kb = make_kb(random_corpus(4))
+    queries = random_queries(4, kb.faqs, count=20)
+    # Un None en sys.modules hace que el import lance ImportError
+    monkeypatch.setitem(sys.modules, 'lazarus_kb.batch', None)
+
+    assert kb.search_top_k_many(queries, k=1) == [kb.search_top_k(q, k=1) for q in queries]
+    with pytest.raises(ImportError):
+        kb.search_many(queries)
@@ -0,0 +1,53 @@
+"""Índice de n-gramas y reconstrucción incremental del índice de FAQ."""
+
+import random
+
+import pytest
+
+from kb_reference import REFERENCE, VOCABULARY, random_corpus
+from lazarus_kb.index import FAQIndex, NGramIndex
+
+WORDS = sorted({REFERENCE.fold(w) for w in VOCABULARY} | {'', 'a', 'ab', 'abc', 'abcd', 'bcd'})
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_ngram_lookups_match_brute_force(seed):
+    rng = random.Random(seed)
+    vocabulary = set(rng.sample(WORDS, 25))
+    index = NGramIndex(vocabulary)
+
+    for word in WORDS + ['ubicadito', 'xyz', 'precioso']:
+        assert index.containing(word) == {v for v in vocabulary if word in v}, word
+        assert index.contained_in(word) == {v for v in vocabulary if v in word}, word
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_updated_ngram_index_equals_a_fresh_build(seed):
+    rng = random.Random(seed)
+    before = set(rng.sample(WORDS, 25))
+    after = set(rng.sample(WORDS, 25))
+    index = NGramIndex(before)
+    grams = {gram: set(words) for gram, words in index.grams.items()}
+
+    updated = index.updated(after)
+
+    assert updated.vocabulary == frozenset(after)
+    assert updated.grams == NGramIndex(after).grams
+    # El índice anterior no se modifica: las búsquedas en curso lo siguen usando
+    assert index.grams == grams
+
+
+def test_incremental_faq_index_equals_a_fresh_build():
+    previous = FAQIndex(random_corpus(1), REFERENCE)
+    faqs = random_corpus(1)[5:] + random_corpus(2)[:10]
+
+    rebuilt = FAQIndex(faqs, REFERENCE, previous=previous)
+    fresh = FAQIndex(faqs, REFERENCE)
+
+    assert rebuilt.entries == fresh.entries
+    assert rebuilt.word_postings == fresh.word_postings
+    assert rebuilt.field_postings == fresh.field_postings
+    assert rebuilt.words.grams == fresh.words.grams
+    assert rebuilt.tokens.grams == fresh.tokens.grams
+    # Las FAQ sin cambios reutilizan su entrada normalizada
+    assert rebuilt.entries[0] is previous.entries[5]
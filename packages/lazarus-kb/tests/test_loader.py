@@ -0,0 +1,82 @@
+"""Lector de CSV en streaming: nulos, columnas opcionales y codificaciones."""
+
+import pytest
+
+from lazarus_kb.loader import iter_faq_rows
+
+
+def write(tmp_path, text, encoding='utf-8'):
+    path = tmp_path / 'faq.csv'
+    path.write_bytes(text.encode(encoding))
+    return str(path)
+
+
+def test_na_values_become_nan(tmp_path):
+    path = write(tmp_path, 'pregunta,respuesta,categoria\n'
+                           'Horario,,NA\n'
+                           'N/A,Lunes,null\n'
+                           '"  ",None,Contacto\n')
+
+    assert list(iter_faq_rows(path)) == [
+        {'pregunta': 'Horario', 'respuesta': 'nan', 'categoria': 'nan'},
+        {'pregunta': 'nan', 'respuesta': 'Lunes', 'categoria': 'nan'},
+        {'pregunta': '  ', 'respuesta': 'nan', 'categoria': 'Contacto'},
+    ]
+
+
+def test_short_rows_are_nan(tmp_path):
+    path = write(tmp_path, 'pregunta,respuesta,categoria\nHorario\n')
+
+    assert list(iter_faq_rows(path)) == [
+        {'pregunta': 'Horario', 'respuesta': 'nan', 'categoria': 'nan'}]
+
+
+def test_missing_categoria_defaults_to_general(tmp_path):
+    path = write(tmp_path, 'respuesta,pregunta,extra\nLunes,Horario,x\n')
+
+    assert list(iter_faq_rows(path)) == [
+        {'pregunta': 'Horario', 'respuesta': 'Lunes', 'categoria': 'General'}]
+
+
+@pytest.mark.parametrize('column', ['pregunta', 'respuesta'])
+def test_missing_required_column_raises(tmp_path, column):
+    header = 'pregunta,respuesta'.replace(column, 'otra')
+    path = write(tmp_path, f'{header}\nA,B\n')
+
+    with pytest.raises(KeyError):
+        list(iter_faq_rows(path))
+
+
+def test_utf8_bom_is_dropped_from_the_header(tmp_path):
+    path = write(tmp_path, '\ufeffpregunta,respuesta\n¿Dónde?,Aquí\n')
+
+    assert list(iter_faq_rows(path)) == [
+        {'pregunta': '¿Dónde?', 'respuesta': 'Aquí', 'categoria': 'General'}]
+
+
+def test_other_encodings_need_the_encoding_argument(tmp_path):
+    path = write(tmp_path, 'pregunta,respuesta\n¿Dónde?,Aquí\n', encoding='latin-1')
+
+    with pytest.raises(UnicodeDecodeError):
+        list(iter_faq_rows(path))
+    assert next(iter_faq_rows(path, encoding='latin-1'))['pregunta'] == '¿Dónde?'
+
+
+def test_numeric_text_is_kept_literally(tmp_path):
+    # pandas convertía esta columna a float ('1.5', '2.0'); el lector conserva el texto
+    path = write(tmp_path, 'pregunta,respuesta\nPrecio,1.50\nPeso,2\n')
+
+    assert [row['respuesta'] for row in iter_faq_rows(path)] == ['1.50', '2']
+
+
+def test_text_columns_match_pandas(tmp_path):
+    pd = pytest.importorskip('pandas')
+    path = write(tmp_path, 'pregunta,respuesta,categoria\n'
+                           '¿Qué es ADMIX?,"Un aditivo, para muros",Productos\n'
+                           'Horario,,NA\n'
+                           '"Línea ""A""","Dos\nlíneas",General\n')
+
+    expected = [{'pregunta': str(row['pregunta']), 'respuesta': str(row['respuesta']),
+                 'categoria': str(row['categoria'])}
+                for _, row in pd.read_csv(path).iterrows()]
+    assert list(iter_faq_rows(path)) == expected
@@ -0,0 +1,32 @@
+"""Pipeline de normalización y cachés de consultas."""
+
+from kb_reference import write_faq_csv
+
+
+def test_accent_and_case_variants_normalize_alike(make_kb):
+    kb = make_kb([{'pregunta': '¿Dónde están?', 'respuesta': 'Aquí', 'categoria': 'General'}])
+    normalize = kb._normalizer.normalize_query
+
+    assert normalize('¿DÓNDE está la dirección?') == ('¿donde esta la direccion?', ('ubicad', 'esta', 'ubicad'))
+    assert normalize('donde esta la direccion') == ('donde esta la direccion', ('ubicad', 'esta', 'ubicad'))
+    assert kb.normalize_question('¡Hola,   MUNDO!') == 'hola mundo'
+
+
+def test_normalized_queries_are_memoized(make_kb):
+    kb = make_kb([{'pregunta': 'Horario', 'respuesta': 'Lunes', 'categoria': 'Contacto'}])
+    normalize = kb._normalizer.normalize_query
+    normalize.cache_clear()
+
+    first = normalize('¿Horario?')
+    assert normalize('¿Horario?') is first
+    assert normalize.cache_info().hits == 1
+
+
+def test_reload_invalidates_memoized_results(make_kb):
+    kb = make_kb([{'pregunta': 'Horario', 'respuesta': 'Lunes', 'categoria': 'Contacto'}])
+    assert kb.search('horario')['respuesta'] == 'Lunes'
+
+    write_faq_csv(kb.excel_file, [{'pregunta': 'Horario', 'respuesta': 'Martes', 'categoria': 'Contacto'}])
+    assert kb.reload(force=True)
+
+    assert kb.search('horario')['respuesta'] == 'Martes'
@@ -0,0 +1,118 @@
+"""Recarga en caliente: guardas contra CSV truncados, vigilancia y cachés."""
+
+import pytest
+
+from kb_reference import random_corpus, write_faq_csv
+
+
+class ScriptedStop:
+    """Sustituto de ``threading.Event`` que ejecuta un paso por revisión del vigilante"""
+
+    def __init__(self, steps):
+        self.steps = list(steps)
+
+    def wait(self, timeout=None):
+        if not self.steps:
+            return True
+        self.steps.pop(0)()
+        return False
+
+    def set(self):
+        self.steps.clear()
+
+
+def test_shrunken_csv_is_rejected(make_kb, caplog):
+    kb = make_kb(random_corpus(0, size=40))
+    faqs = kb.faqs
+    write_faq_csv(kb.excel_file, random_corpus(1, size=10))
+
+    assert not kb.reload()
+
+    assert kb.faqs is faqs
+    assert any(getattr(r, 'event', None) == 'kb_reload_rejected' for r in caplog.records)
+    # La misma versión del archivo no se reintenta hasta que vuelva a cambiar
+    assert not kb.reload()
+
+
+def test_empty_csv_is_rejected(make_kb):
+    kb = make_kb(random_corpus(0, size=4))
+    write_faq_csv(kb.excel_file, [])
+
+    assert not kb.reload()
+    assert len(kb.faqs) == 4
+
+
+def test_allow_shrink_publishes_a_smaller_index(make_kb):
+    kb = make_kb(random_corpus(0, size=40))
+    write_faq_csv(kb.excel_file, random_corpus(1, size=10))
+
+    assert kb.reload(allow_shrink=True)
+    assert len(kb.faqs) == 10
+
+
+def test_moderate_shrink_is_accepted(make_kb):
+    kb = make_kb(random_corpus(0, size=40))
+    write_faq_csv(kb.excel_file, random_corpus(1, size=20))
+
+    assert kb.reload()
+    assert len(kb.faqs) == 20
+
+
+def test_watcher_waits_for_two_identical_polls(make_kb, monkeypatch):
+    kb = make_kb(random_corpus(0, size=10))
+    reloads = []
+    reload = kb.reload
+    monkeypatch.setattr(kb, 'reload', lambda: reloads.append(len(reloads)) or reload())
+
+    def write(size):
+        return lambda: write_faq_csv(kb.excel_file, random_corpus(1, size=size))
+
+    def expect_reloads(count):
+        def check():
+            assert len(reloads) == count
+        return check
+
+    kb._stop_watching = ScriptedStop([
+        write(8),            # cambio visto por primera vez: se espera
+        write(9),            # sigue escribiéndose: se vuelve a esperar
+        expect_reloads(0),   # tamaño y mtime estables: se recarga
+        expect_reloads(1),
+        lambda: None,        # sin cambios: no se recarga de nuevo
+    ])
+    kb._watch(0)
+
+    assert reloads == [0]
+    assert len(kb.faqs) == 9
+
+
+def test_watcher_survives_a_failed_reload(make_kb, caplog):
+    kb = make_kb(random_corpus(0, size=10))
+    faqs = kb.faqs
+
+    def corrupt():
+        with open(kb.excel_file, 'w', encoding='utf-8') as handle:
+            handle.write('otra,columna\n1,2\n')
+
+    kb._stop_watching = ScriptedStop([corrupt, lambda: None])
+    kb._watch(0)
+
+    assert kb.faqs is faqs
+    assert any(getattr(r, 'event', None) == 'kb_reload_error' for r in caplog.records)
+
+
+def test_reload_clears_memoized_results_and_batch_scorer(make_kb):
+    pytest.importorskip('scipy')
+    kb = make_kb([{'pregunta': 'Horario', 'respuesta': 'Lunes', 'categoria': 'Contacto'}])
+    old_index = kb._index
+    kb.search('horario')
+    kb.search_many(['horario'])
+    assert kb._cached_top_k.cache_info().currsize == 1
+    assert kb._batch_scorer.index is old_index
+
+    write_faq_csv(kb.excel_file, [{'pregunta': 'Horario', 'respuesta': 'Martes', 'categoria': 'Contacto'}])
+    assert kb.reload()
+
+    assert kb._cached_top_k.cache_info().currsize == 0
+    assert kb._batch_scorer is None
+    assert kb.search_many(['horario'])[0]['respuesta'] == 'Martes'
+    assert kb.version == old_index.version + 1
@@ -0,0 +1,100 @@
+"""La búsqueda por índice devuelve lo mismo que el escaneo completo original."""
+
+import pytest
+
+from kb_reference import baseline_top_k, random_corpus, random_queries
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_search_matches_full_scan(make_kb, seed):
+    kb = make_kb(random_corpus(seed))
+
+    for query in random_queries(seed, kb.faqs):
+        expected = baseline_top_k(kb.faqs, query, k=1, threshold=0.2)
+        found = kb.search(query)
+        assert found is (kb.faqs[expected[0][0]] if expected else None), query
+
+
+def test_whole_query_bonus_reaches_faqs_without_word_matches(make_kb):
+    # 'oficina' se reescribe como 'ubicad': la FAQ solo puntúa por el bonus
+    kb = make_kb([
+        {'pregunta': 'Horario', 'respuesta': 'Abrimos a las 8', 'categoria': 'Contacto'},
+        {'pregunta': 'Contacto', 'respuesta': 'Visite nuestra oficina', 'categoria': 'General'},
+    ])
+
+    assert baseline_top_k(kb.faqs, 'oficina', k=1, threshold=0.2) == [(1, 0.5)]
+    assert kb.search('oficina') is kb.faqs[1]
+
+
+@pytest.mark.parametrize('seed', range(8))
+@pytest.mark.parametrize('threshold', [0.2, 0.3])
+def test_search_top_k_matches_full_scan(make_kb, seed, threshold):
+    kb = make_kb(random_corpus(seed))
+
+    for k in (1, 3, 5):
+        for query in random_queries(seed, kb.faqs):
+            expected = baseline_top_k(kb.faqs, query, k=k, threshold=threshold)
+            found = [(r.faq_id, r.score) for r in kb.search_top_k(query, k=k, threshold=threshold)]
+            assert found == expected, (query, k)
+
+
+def test_ties_go_to_the_faq_loaded_first(make_kb):
+    faq = {'pregunta': 'Precio del envío', 'respuesta': 'Depende', 'categoria': 'General'}
+    other = {'pregunta': 'Horario', 'respuesta': 'Lunes', 'categoria': 'Contacto'}
+    kb = make_kb([other, faq, dict(faq), dict(faq)])
+
+    results = kb.search_top_k('precio envío', k=3)
+
+    assert [r.faq_id for r in results] == [1, 2, 3]
+    assert len({r.score for r in results}) == 1
+    assert kb.search('precio envío') is kb.faqs[1]
+
+
+def test_threshold_is_exclusive(make_kb):
+    # Una sola coincidencia de categoría puntúa exactamente 0.3
+    kb = make_kb([{'pregunta': 'Horario', 'respuesta': 'Lunes', 'categoria': 'Envíos'}])
+
+    assert kb.search_top_k('envios', k=1, threshold=0.3) == []
+    assert [r.score for r in kb.search_top_k('envios', k=1, threshold=0.2)] == [0.3]
+
+
+@pytest.mark.parametrize('query', ['', '   ', '¿?', '¡!', '... ?', 'de la el'])
+def test_queries_without_words_find_nothing(make_kb, query):
+    kb = make_kb(random_corpus(0))
+
+    assert kb.search(query) is None
+    assert kb.search_top_k(query, k=3) == []
+
+
+@pytest.mark.parametrize('query', ['¿Dónde están?', 'ubicación', 'OFICINA', 'dirección'])
+def test_synonym_queries_match_full_scan(make_kb, query):
+    kb = make_kb([
+        {'pregunta': '¿Dónde están ubicados?', 'respuesta': 'En San Pedro Sula', 'categoria': 'Ubicaciones'},
+        {'pregunta': 'Dirección de envío', 'respuesta': 'La oficina recibe paquetes', 'categoria': 'Envíos'},
+        {'pregunta': 'Horario', 'respuesta': 'Lunes a viernes', 'categoria': 'Contacto'},
+    ])
+
+    expected = baseline_top_k(kb.faqs, query, k=3, threshold=0.2)
+    assert [(r.faq_id, r.score) for r in kb.search_top_k(query, k=3)] == expected
+    # Los sinónimos llevan a 'ubicados' aunque la consulta no lo mencione
+    assert 0 in [faq_id for faq_id, _ in expected]
+
+
+def test_search_top_k_stops_before_scoring_weak_candidates(make_kb, monkeypatch):
+    from lazarus_kb.index import QueryMatch
+
+    # Una FAQ fuerte y muchas que solo mencionan la palabra en la respuesta
+    faqs = [{'pregunta': f'Consulta {i}', 'respuesta': 'techo', 'categoria': 'General'}
+            for i in range(50)]
+    faqs.append({'pregunta': 'Techo', 'respuesta': 'Impermeabilizante', 'categoria': 'Productos'})
+    kb = make_kb(faqs)
+
+    scored = []
+    original = QueryMatch.score
+    monkeypatch.setattr(QueryMatch, 'score',
+                        lambda self, faq_id: scored.append(faq_id) or original(self, faq_id))
+
+    results = kb.search_top_k('techo', k=1, threshold=0.05)
+
+    assert [r.faq_id for r in results] == [50]
+    assert len(scored) <= 2
@@ -0,0 +1,109 @@
+"""Snapshot JSON del índice: validación, descarte y rankings tras cargarlo."""
+
+import json
+import os
+import pickle
+
+import pytest
+
+from kb_reference import random_corpus, random_queries, write_faq_csv
+from lazarus_kb import FAQKnowledgeBase, knowledge_base
+from lazarus_kb.snapshot import HEADER, MAGIC, config_fingerprint, load_snapshot
+
+
+@pytest.fixture
+def snapshotted(make_kb):
+    """Base de conocimiento que ya escribió su snapshot junto al CSV"""
+    kb = make_kb(random_corpus(5), use_snapshot=True)
+    assert os.path.exists(kb.snapshot_path)
+    return kb
+
+
+def load(kb, fingerprint=None):
+    return load_snapshot(kb.snapshot_path, kb.excel_file,
+                         fingerprint or config_fingerprint(kb._normalizer.fingerprint))
+
+
+def read_snapshot(kb):
+    with open(kb.snapshot_path, 'rb') as handle:
+        _, header_len = HEADER.unpack(handle.read(HEADER.size))
+        return json.loads(handle.read(header_len)), handle.read()
+
+
+def write_snapshot_file(kb, metadata, payload):
+    header = json.dumps(metadata).encode('utf-8')
+    with open(kb.snapshot_path, 'wb') as handle:
+        handle.write(HEADER.pack(MAGIC, len(header)) + header + payload)
+
+
+def test_rankings_match_after_loading_the_snapshot(snapshotted, monkeypatch):
+    # Si el snapshot no sirviera, la carga tendría que volver a leer el CSV
+    monkeypatch.setattr(knowledge_base, 'iter_faq_rows', pytest.fail)
+    cold = FAQKnowledgeBase(snapshotted.excel_file)
+
+    assert cold.faqs == snapshotted.faqs
+    for query in random_queries(5, snapshotted.faqs):
+        for k in (1, 3):
+            expected = [(r.faq_id, r.score) for r in snapshotted.search_top_k(query, k=k)]
+            assert [(r.faq_id, r.score) for r in cold.search_top_k(query, k=k)] == expected
+
+
+def test_modified_csv_makes_the_snapshot_stale(snapshotted):
+    write_faq_csv(snapshotted.excel_file, random_corpus(6))
+
+    assert load(snapshotted) is None
+    assert FAQKnowledgeBase(snapshotted.excel_file).faqs != snapshotted.faqs
+
+
+def test_touched_csv_with_the_same_content_keeps_the_snapshot(snapshotted):
+    stat = os.stat(snapshotted.excel_file)
+    os.utime(snapshotted.excel_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert load(snapshotted) is not None
+
+
+def test_version_or_fingerprint_mismatch_is_ignored(snapshotted):
+    metadata, payload = read_snapshot(snapshotted)
+
+    assert load(snapshotted, fingerprint='otra-normalizacion') is None
+    write_snapshot_file(snapshotted, dict(metadata, format_version=metadata['format_version'] - 1), payload)
+    assert load(snapshotted) is None
+
+
+@pytest.mark.parametrize('corrupt', [
+    lambda data: b'',
+    lambda data: b'NOTASNAP' + data[8:],
+    lambda data: data[:len(data) // 2],
+    lambda data: data[:-1] + b'x',
+])
+def test_corrupt_snapshot_falls_back_to_the_csv(snapshotted, corrupt):
+    with open(snapshotted.snapshot_path, 'rb') as handle:
+        data = handle.read()
+    with open(snapshotted.snapshot_path, 'wb') as handle:
+        handle.write(corrupt(data))
+
+    assert load(snapshotted) is None
+    assert FAQKnowledgeBase(snapshotted.excel_file).faqs == snapshotted.faqs
+
+
+def test_inconsistent_postings_are_rejected(snapshotted):
+    metadata, payload = read_snapshot(snapshotted)
+    state = json.loads(payload)
+    word = next(iter(state['word_postings']))
+    state['word_postings'][word] = [len(state['faqs'])]
+
+    write_snapshot_file(snapshotted, metadata, json.dumps(state).encode('utf-8'))
+
+    assert load(snapshotted) is None
+
+
+def test_pickle_payload_is_never_executed(snapshotted):
+    class Payload:
+        def __reduce__(self):
+            return (os.mkdir, (snapshotted.excel_file + '.pwned',))
+
+    metadata, _ = read_snapshot(snapshotted)
+    write_snapshot_file(snapshotted, metadata, pickle.dumps(Payload()))
+
+    assert load(snapshotted) is None
+    assert not os.path.exists(snapshotted.excel_file + '.pwned')
@@ -1,13 +1,58 @@
 """Punto de entrada para el CLI del chatbot Lazarus."""
 
+import os
+import shutil
+import sys
+from typing import Any, Dict
+
 from dotenv import load_dotenv
 from lazarus_core import LazarusChatbot
+from lazarus_core.logs import configure_logging
+
+
+ANSWER_PREFIX = "Respuesta: "
+
+
+def erase_streamed_answer(text: str) -> bool:
+    """Borrar del terminal la respuesta emitida; ``False`` si la salida no es un terminal."""
+    if not sys.stdout.isatty():
+        return False
+    columns = max(shutil.get_terminal_size().columns, 1)
+    lines = sum(max(1, -(-len(line) // columns)) for line in (ANSWER_PREFIX + text).split("\n"))
+    # Volver al inicio de la primera linea emitida y limpiar hasta el final
+    print(f"\033[{lines}F\033[J", end="", flush=True)
+    return True
+
+
+def print_streamed_answer(chatbot: LazarusChatbot, question: str) -> Dict[str, Any]:
+    """Imprimir la respuesta a medida que se genera y devolver el resultado final."""
+
+    print("\n" + ANSWER_PREFIX, end="", flush=True)
+    streamed = []
+    response: Dict[str, Any] = {}
+    for event in chatbot.stream_answer(question):
+        if event.is_final:
+            response = event.result
+        else:
+            streamed.append(event.text)
+            print(event.text, end="", flush=True)
+    print()
+
+    # Una transferencia decidida despues de generar reemplaza lo ya mostrado
+    streamed_text = "".join(streamed)
+    if response.get("answer") != streamed_text:
+        if streamed_text:
+            erase_streamed_answer(streamed_text)
+        print(ANSWER_PREFIX + response["answer"])
+    return response
 
 
 def main() -> None:
     """Punto de entrada de linea de comandos interactivo para el chatbot."""
 
     load_dotenv()
+    # Los registros van a stderr y no se mezclan con la conversacion en stdout
+    configure_logging(fmt=os.getenv("LAZARUS_LOG_FORMAT", "text"))
 
     print("\n" + "=" * 60)
     print("  CHATBOT GRUPO LAZARUS - Interfaz Interactiva")
@@ -28,9 +73,8 @@ def main() -> None:
             if not user_input:
                 continue
 
-            response = chatbot.answer(user_input)
+            response = print_streamed_answer(chatbot, user_input)
 
-            print(f"\nRespuesta: {response['answer']}")
             print(f"Fuente: {response['source']}")
 
             if response.get('transfer_to_agent'):
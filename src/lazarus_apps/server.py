@@ -0,0 +1,217 @@
+"""Servidor HTTP/WebSocket para el chatbot Lazarus.
+
+Cada proceso (worker de uvicorn) carga una sola base de conocimientos y un
+solo ``LazarusChatbot`` al arrancar y los comparte entre todas las
+solicitudes. Para escalar horizontalmente se levantan varios workers o
+varias instancias detras de un balanceador.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict
+
+import uvicorn
+from dotenv import load_dotenv
+from fastapi import FastAPI, HTTPException, Request, WebSocket, WebSocketDisconnect
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from lazarus_core import LazarusChatbot
+from lazarus_core.logs import configure_logging, shutdown_logging
+from lazarus_core.metrics import MetricsRegistry
+from lazarus_core.structures import StreamEvent
+from pydantic import BaseModel, Field
+
+MAX_QUESTION_LENGTH = 2000
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Evento que recibe el cliente cuando la respuesta falla a mitad del streaming
+STREAM_ERROR_EVENT = {"type": "error", "detail": "No se pudo completar la respuesta"}
+
+logger = logging.getLogger(__name__)
+
+
+class AnswerRequest(BaseModel):
+    """Cuerpo de las solicitudes de respuesta."""
+
+    question: str = Field(min_length=1, max_length=MAX_QUESTION_LENGTH)
+
+
+def create_chatbot() -> LazarusChatbot:
+    """Chatbot del proceso, configurado con las variables de entorno."""
+    return LazarusChatbot(
+        excel_file=os.getenv("LAZARUS_FAQ_FILE"),
+        auto_reload=os.getenv("LAZARUS_AUTO_RELOAD", "").lower() in {"1", "true", "si"},
+        pipeline_mode=os.getenv("LAZARUS_PIPELINE_MODE", "sequential"),
+        metrics=MetricsRegistry(),
+    )
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Cargar el chatbot al arrancar el worker y liberarlo al apagarlo."""
+    load_dotenv()
+    # JSON por defecto (LAZARUS_LOG_FORMAT); cada worker tiene su propio hilo de salida
+    configure_logging()
+    app.state.ready = False
+    # La carga del CSV/snapshot es bloqueante: no debe frenar el loop
+    app.state.chatbot = await asyncio.to_thread(create_chatbot)
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        # uvicorn deja de aceptar conexiones y espera las solicitudes en curso
+        # antes de llegar aqui
+        app.state.ready = False
+        await asyncio.to_thread(app.state.chatbot.close)
+        shutdown_logging()
+
+
+app = FastAPI(title="Lazarus Chatbot", lifespan=lifespan)
+
+
+def get_chatbot(request: Request) -> LazarusChatbot:
+    if not getattr(request.app.state, "ready", False):
+        raise HTTPException(status_code=503, detail="Servicio no disponible")
+    return request.app.state.chatbot
+
+
+def event_to_dict(event: StreamEvent) -> Dict[str, Any]:
+    """Representacion JSON de un evento de streaming."""
+    if event.is_final:
+        return {"type": "result", "result": event.result}
+    return {"type": "chunk", "text": event.text, "field": event.field}
+
+
+def parse_question(raw: str) -> str:
+    """Pregunta de un mensaje ``{"question": ...}``; ``ValueError`` con el detalle si no es valido."""
+    try:
+        message = json.loads(raw)
+    except ValueError:
+        raise ValueError("JSON invalido") from None
+    question = message.get("question") if isinstance(message, dict) else None
+    question = question.strip() if isinstance(question, str) else ""
+    if not question or len(question) > MAX_QUESTION_LENGTH:
+        raise ValueError("Pregunta invalida")
+    return question
+
+
+@app.get("/health")
+async def health(request: Request) -> JSONResponse:
+    """Estado del worker: 503 mientras arranca o se apaga."""
+    if not getattr(request.app.state, "ready", False):
+        return JSONResponse({"status": "unavailable"}, status_code=503)
+    chatbot: LazarusChatbot = request.app.state.chatbot
+    return JSONResponse({
+        "status": "ok",
+        "pid": os.getpid(),
+        "faqs": len(chatbot.kb.faqs),
+        "kb_version": chatbot.kb.version,
+        "llm_enabled": chatbot.answer_chain is not None,
+        "breaker": chatbot.breaker.state,
+        "limiter": chatbot.limiter.stats(),
+        "handoff": chatbot.handoff.stats(),
+    })
+
+
+@app.get("/metrics")
+async def metrics(request: Request) -> PlainTextResponse:
+    """Metricas del worker en el formato de texto de Prometheus."""
+    chatbot = get_chatbot(request)
+    return PlainTextResponse(
+        chatbot.metrics.render_prometheus(), media_type=PROMETHEUS_CONTENT_TYPE)
+
+
+@app.post("/answer")
+async def answer(payload: AnswerRequest, request: Request) -> Dict[str, Any]:
+    """Respuesta completa; mismo formato que ``ChatResult.to_dict()``."""
+    chatbot = get_chatbot(request)
+    return await chatbot.aanswer(payload.question)
+
+
+@app.post("/answer/stream")
+async def answer_stream(payload: AnswerRequest, request: Request) -> StreamingResponse:
+    """Respuesta en streaming como NDJSON: eventos ``chunk`` y un ``result`` final."""
+    chatbot = get_chatbot(request)
+
+    async def lines() -> AsyncIterator[str]:
+        try:
+            async for event in chatbot.astream_answer(payload.question):
+                yield json.dumps(event_to_dict(event), ensure_ascii=False) + "\n"
+        except Exception:
+            # El estado 200 ya se envio: el error va como ultimo evento
+            logger.exception("Error en el streaming de la respuesta",
+                             extra={"event": "stream_error"})
+            yield json.dumps(STREAM_ERROR_EVENT, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
+@app.websocket("/ws")
+async def answer_websocket(websocket: WebSocket) -> None:
+    """Conversacion por WebSocket: cada mensaje ``{"question": ...}`` recibe sus eventos."""
+    await websocket.accept()
+    if not getattr(websocket.app.state, "ready", False):
+        await websocket.close(code=1013)
+        return
+    chatbot: LazarusChatbot = websocket.app.state.chatbot
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+            raw = message.get("text")
+            if raw is None:
+                raw = (message.get("bytes") or b"").decode("utf-8", errors="replace")
+            # Un mensaje invalido no cierra la conversacion
+            try:
+                question = parse_question(raw)
+            except ValueError as exc:
+                await websocket.send_json({"type": "error", "detail": str(exc)})
+                continue
+            try:
+                async for event in chatbot.astream_answer(question):
+                    await websocket.send_json(event_to_dict(event))
+            except WebSocketDisconnect:
+                raise
+            except Exception:
+                logger.exception("Error en el streaming de la respuesta",
+                                 extra={"event": "stream_error"})
+                await websocket.send_json(STREAM_ERROR_EVENT)
+    except WebSocketDisconnect:
+        pass
+
+
+def main() -> None:
+    """Levantar el servidor con uno o varios workers."""
+    parser = argparse.ArgumentParser(description="Servidor HTTP del chatbot Lazarus")
+    parser.add_argument("--host", default=os.getenv("LAZARUS_HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("LAZARUS_PORT", "8000")))
+    parser.add_argument(
+        "--workers", type=int, default=int(os.getenv("LAZARUS_WORKERS", "1")),
+        help="Procesos worker; cada uno carga su propio chatbot",
+    )
+    parser.add_argument(
+        "--graceful-timeout", type=int, default=30,
+        help="Segundos para terminar las solicitudes en curso al apagar",
+    )
+    parser.add_argument(
+        "--worker-healthcheck-timeout", type=int, default=60,
+        help="Segundos que un worker puede tardar en responder al supervisor (importar DSPy es lento)",
+    )
+    args = parser.parse_args()
+
+    uvicorn.run(
+        "lazarus_apps.server:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        timeout_graceful_shutdown=args.graceful_timeout,
+        timeout_worker_healthcheck=args.worker_healthcheck_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,11 @@
 """UI de Streamlit para el chatbot Lazarus."""
 
+import os
+
 import streamlit as st
 from dotenv import load_dotenv
 from lazarus_core import LazarusChatbot
-from lazarus_kb import FAQKnowledgeBase
+from lazarus_core.logs import configure_logging
 
 load_dotenv()
 
@@ -39,36 +41,54 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
+FAQ_PAGE_SIZE = 20
+
+@st.cache_resource(show_spinner="Cargando base de conocimientos...")
+def get_chatbot():
+    """Chatbot compartido por todas las sesiones del proceso.
+
+    Carga el CSV y configura DSPy una sola vez; ``answer`` y ``stream_answer``
+    son seguros para sesiones concurrentes.
+    """
+    configure_logging(fmt=os.getenv("LAZARUS_LOG_FORMAT", "text"))
+    return LazarusChatbot()
+
+@st.cache_data(max_entries=4)
+def category_counts(_kb, kb_version):
+    """Conteo de FAQs por categoria; se recalcula solo al cambiar la version de la KB."""
+    categories = {}
+    for faq in _kb.faqs:
+        cat = faq.get('categoria', 'General')
+        categories[cat] = categories.get(cat, 0) + 1
+    return sorted(categories.items())
+
 def initialize_session_state():
     """Inicializar estado de sesion de Streamlit."""
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = []
-    if "chatbot" not in st.session_state:
-        st.session_state.chatbot = LazarusChatbot()
-    if "kb" not in st.session_state:
-        st.session_state.kb = FAQKnowledgeBase()
 
 initialize_session_state()
+chatbot = get_chatbot()
 
 with st.sidebar:
     st.title("Informacion de la KB")
     
-    kb = st.session_state.kb
-    all_faqs = kb.get_all_faqs()
+    kb = chatbot.kb
+    kb_version = kb.version
+    all_faqs = kb.faqs
     
     st.metric("Total de FAQs", len(all_faqs))
     
-    categories = {}
-    for faq in all_faqs:
-        cat = faq.get('categoria', 'General')
-        categories[cat] = categories.get(cat, 0) + 1
-    
     st.subheader("FAQs por Categoria")
-    for cat, count in sorted(categories.items()):
+    for cat, count in category_counts(kb, kb_version):
         st.write(f"- {cat}: {count}")
     
     with st.expander("Ver todas las FAQs"):
-        for i, faq in enumerate(all_faqs, 1):
+        pages = max(1, -(-len(all_faqs) // FAQ_PAGE_SIZE))
+        page = st.number_input("Pagina", min_value=1, max_value=pages, value=1, step=1)
+        start = (page - 1) * FAQ_PAGE_SIZE
+        st.caption(f"Pagina {page} de {pages}")
+        for i, faq in enumerate(all_faqs[start:start + FAQ_PAGE_SIZE], start + 1):
             st.write(f"**{i}. {faq['pregunta']}**")
             st.write(f"Respuesta: {faq['respuesta']}")
             st.write(f"Categoria: {faq['categoria']}")
@@ -77,23 +97,31 @@ with st.sidebar:
 st.title("Chatbot Grupo Lazarus")
 st.write("Bienvenido al asistente virtual de Grupo Lazarus. Puedo ayudarte con preguntas sobre nuestros servicios.")
 
+def render_user_message(content):
+    st.markdown(f"<div class='user-message'><strong>Tu:</strong> {content}</div>", unsafe_allow_html=True)
+
+def render_assistant_message(content, target=st):
+    target.markdown(f"<div class='assistant-message'><strong>Asistente:</strong> {content}</div>", unsafe_allow_html=True)
+
+def render_metadata(meta):
+    cols = st.columns(3)
+    with cols[0]:
+        st.caption(f"Fuente: {meta.get('source', 'N/A')}")
+    with cols[1]:
+        if meta.get('transfer_to_agent'):
+            st.caption("Marca de transferencia: Si")
+    with cols[2]:
+        if meta.get('transfer_reason'):
+            st.caption(f"Razon: {meta['transfer_reason']}")
+
 for message in st.session_state.chat_history:
     if message["role"] == "user":
-        st.markdown(f"<div class='user-message'><strong>Tu:</strong> {message['content']}</div>", unsafe_allow_html=True)
+        render_user_message(message['content'])
     else:
-        st.markdown(f"<div class='assistant-message'><strong>Asistente:</strong> {message['content']}</div>", unsafe_allow_html=True)
+        render_assistant_message(message['content'])
         
         if "metadata" in message:
-            meta = message["metadata"]
-            cols = st.columns(3)
-            with cols[0]:
-                st.caption(f"Fuente: {meta.get('source', 'N/A')}")
-            with cols[1]:
-                if meta.get('transfer_to_agent'):
-                    st.caption("Marca de transferencia: Si")
-            with cols[2]:
-                if meta.get('transfer_reason'):
-                    st.caption(f"Razon: {meta['transfer_reason']}")
+            render_metadata(message["metadata"])
 
 user_input = st.chat_input("Escribe tu pregunta aqui...")
 
@@ -102,17 +130,34 @@ if user_input:
         "role": "user",
         "content": user_input
     })
+    render_user_message(user_input)
     
-    response = st.session_state.chatbot.answer(user_input)
+    # La respuesta se muestra a medida que llega; el resultado final queda en `response`
+    response = {}
+    
+    def answer_chunks():
+        for event in chatbot.stream_answer(user_input):
+            if event.is_final:
+                response.update(event.result)
+            else:
+                yield event.text
+    
+    answer_slot = st.empty()
+    with answer_slot.container():
+        streamed = st.write_stream(answer_chunks())
+    if response['answer'] != streamed:
+        # Una transferencia decidida despues de generar reemplaza lo ya mostrado
+        render_assistant_message(response['answer'], answer_slot)
+    
+    metadata = {
+        "source": response['source'],
+        "transfer_to_agent": response['transfer_to_agent'],
+        "transfer_reason": response['transfer_reason']
+    }
+    render_metadata(metadata)
     
     st.session_state.chat_history.append({
         "role": "assistant",
         "content": response['answer'],
-        "metadata": {
-            "source": response['source'],
-            "transfer_to_agent": response['transfer_to_agent'],
-            "transfer_reason": response['transfer_reason']
-        }
+        "metadata": metadata
     })
-    
-    st.rerun()
@@ -0,0 +1,32 @@
+import os
+import shutil
+
+import dspy
+import pytest
+
+from benchmarks.fake_lm import FakeLM
+from lazarus_core import LazarusChatbot
+from lazarus_core.limiter import LLMLimiter
+from lazarus_core.metrics import MetricsRegistry
+
+FAQ_CSV = os.path.join(os.path.dirname(__file__), "..", "data_limpia", "faq_limpio.csv")
+
+
+@pytest.fixture
+def faq_csv(tmp_path):
+    """Copia del CSV de ejemplo, para no escribir snapshots junto al original."""
+    return shutil.copy(FAQ_CSV, tmp_path / "faq.csv")
+
+
+@pytest.fixture
+def chatbot(faq_csv, monkeypatch, tmp_path):
+    """Chatbot con LLM sobre ``FakeLM`` (sin red)."""
+    monkeypatch.setenv("LAZARUS_HANDOFF_DB", str(tmp_path / "handoffs.sqlite3"))
+    bot = LazarusChatbot(
+        api_key="test", model="openai/test", excel_file=str(faq_csv), answer_cache_size=0,
+        llm_limiter=LLMLimiter(rate=None, base_delay=0.001, max_delay=0.001),
+        metrics=MetricsRegistry(),
+    )
+    dspy.settings.configure(lm=FakeLM(latency=0.0))
+    yield bot
+    bot.close()
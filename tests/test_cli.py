@@ -0,0 +1,52 @@
+"""CLI: la respuesta emitida se reemplaza cuando el resultado final es otro."""
+
+import io
+
+from lazarus_apps import main
+from lazarus_core.structures import StreamEvent
+
+
+class StreamingBot:
+    def __init__(self, chunks, result):
+        self.events = [StreamEvent(text=chunk) for chunk in chunks] + [StreamEvent(result=result)]
+
+    def stream_answer(self, question):
+        return iter(self.events)
+
+
+class Terminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+def test_streamed_answer_is_printed_once(capsys):
+    bot = StreamingBot(["Hola, ", "bienvenido."], {"answer": "Hola, bienvenido."})
+
+    main.print_streamed_answer(bot, "hola")
+
+    assert capsys.readouterr().out.count("Hola, bienvenido.") == 1
+
+
+def test_transfer_erases_the_streamed_text_on_a_terminal(monkeypatch):
+    terminal = Terminal()
+    monkeypatch.setattr(main.sys, "stdout", terminal)
+    bot = StreamingBot(["Segun nuestra ", "base..."], {"answer": "Le transferimos con un agente."})
+
+    response = main.print_streamed_answer(bot, "pregunta")
+
+    output = terminal.getvalue()
+    assert response["answer"] == "Le transferimos con un agente."
+    # Sube a la linea de la respuesta emitida y la borra antes de escribir la final
+    erased = output.index("\033[1F\033[J")
+    assert output.index("Segun nuestra base...") < erased
+    assert output.endswith(main.ANSWER_PREFIX + "Le transferimos con un agente.\n")
+
+
+def test_transfer_is_printed_below_when_output_is_not_a_terminal(capsys):
+    bot = StreamingBot(["Segun nuestra ", "base..."], {"answer": "Le transferimos con un agente."})
+
+    main.print_streamed_answer(bot, "pregunta")
+
+    output = capsys.readouterr().out
+    assert "\033[" not in output
+    assert output.endswith(main.ANSWER_PREFIX + "Le transferimos con un agente.\n")
@@ -0,0 +1,153 @@
+"""Servidor HTTP/WebSocket: endpoints, streaming NDJSON y mensajes invalidos."""
+
+import json
+
+import pytest
+from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
+
+from lazarus_apps import server
+
+QUESTION = "¿Cuál es la capital de Francia?"  # sin FAQ: la responde el LLM
+
+
+@pytest.fixture
+def client(chatbot):
+    """Cliente con el chatbot de prueba ya cargado (sin ejecutar el lifespan)."""
+    server.app.state.chatbot = chatbot
+    server.app.state.ready = True
+    yield TestClient(server.app)
+    server.app.state.ready = False
+    del server.app.state.chatbot
+
+
+@pytest.fixture
+def not_ready():
+    server.app.state.ready = False
+    return TestClient(server.app)
+
+
+def ndjson(response):
+    return [json.loads(line) for line in response.text.splitlines()]
+
+
+def test_health_reports_the_loaded_chatbot(client, chatbot):
+    response = client.get("/health")
+
+    assert response.status_code == 200
+    body = response.json()
+    assert body["status"] == "ok"
+    assert body["faqs"] == len(chatbot.kb.faqs)
+    assert body["llm_enabled"]
+    assert body["breaker"] == "closed"
+
+
+def test_answer_returns_the_chat_result(client, chatbot):
+    response = client.post("/answer", json={"question": QUESTION})
+
+    assert response.status_code == 200
+    assert response.json() == chatbot.answer(QUESTION)
+
+
+@pytest.mark.parametrize("body", [{}, {"question": ""}, {"question": "x" * (server.MAX_QUESTION_LENGTH + 1)}])
+def test_answer_validates_the_question(client, body):
+    assert client.post("/answer", json=body).status_code == 422
+
+
+def test_answer_stream_is_ndjson(client, chatbot):
+    response = client.post("/answer/stream", json={"question": QUESTION})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    *chunks, final = ndjson(response)
+    assert chunks and all(event["type"] == "chunk" for event in chunks)
+    assert final == {"type": "result", "result": chatbot.answer(QUESTION)}
+    assert "".join(event["text"] for event in chunks) == final["result"]["answer"]
+
+
+async def failing_stream(question):
+    yield server.StreamEvent(text="Hola")
+    raise RuntimeError("fallo a mitad del streaming")
+
+
+def test_answer_stream_ends_with_an_error_event(client, chatbot, monkeypatch):
+    monkeypatch.setattr(chatbot, "astream_answer", failing_stream)
+
+    response = client.post("/answer/stream", json={"question": QUESTION})
+
+    assert ndjson(response) == [
+        {"type": "chunk", "text": "Hola", "field": ""},
+        server.STREAM_ERROR_EVENT,
+    ]
+
+
+def test_websocket_streams_each_question(client, chatbot):
+    with client.websocket_connect("/ws") as ws:
+        for question in (QUESTION, "hola"):
+            ws.send_json({"question": question})
+            events = []
+            while not events or events[-1]["type"] != "result":
+                events.append(ws.receive_json())
+            assert events[-1]["result"] == chatbot.answer(question)
+
+
+@pytest.mark.parametrize("frame, detail", [
+    ("no es json", "JSON invalido"),
+    ('["question"]', "Pregunta invalida"),
+    ('{"question": 42}', "Pregunta invalida"),
+    ('{"question": "   "}', "Pregunta invalida"),
+])
+def test_websocket_survives_invalid_messages(client, frame, detail):
+    with client.websocket_connect("/ws") as ws:
+        ws.send_text(frame)
+        assert ws.receive_json() == {"type": "error", "detail": detail}
+        ws.send_bytes(b"\xff")
+        assert ws.receive_json() == {"type": "error", "detail": "JSON invalido"}
+
+        ws.send_json({"question": "hola"})
+        assert ws.receive_json()["type"] == "chunk"
+        assert ws.receive_json()["type"] == "result"
+
+
+def test_websocket_reports_stream_errors_and_keeps_the_connection(client, chatbot, monkeypatch):
+    monkeypatch.setattr(chatbot, "astream_answer", failing_stream)
+
+    with client.websocket_connect("/ws") as ws:
+        for _ in range(2):
+            ws.send_json({"question": QUESTION})
+            assert ws.receive_json()["type"] == "chunk"
+            assert ws.receive_json() == server.STREAM_ERROR_EVENT
+
+
+@pytest.mark.parametrize("method, path", [("get", "/health"), ("get", "/metrics"), ("post", "/answer"),
+                                          ("post", "/answer/stream")])
+def test_endpoints_are_unavailable_until_ready(not_ready, method, path):
+    response = not_ready.request(method, path, json={"question": QUESTION})
+
+    assert response.status_code == 503
+
+
+def test_websocket_closes_with_try_again_later_until_ready(not_ready):
+    with not_ready.websocket_connect("/ws") as ws:
+        with pytest.raises(WebSocketDisconnect) as closed:
+            ws.receive_json()
+
+    assert closed.value.code == 1013
+
+
+def test_lifespan_loads_and_releases_the_chatbot(faq_csv, monkeypatch, tmp_path):
+    for name in ("DSPY_API_KEY", "DSPY_MODEL", "DSPY_API_BASE"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setenv("LAZARUS_FAQ_FILE", str(faq_csv))
+    monkeypatch.setenv("LAZARUS_HANDOFF_DB", str(tmp_path / "handoffs.sqlite3"))
+    # La configuracion de registros es global al proceso: aqui no se toca
+    monkeypatch.setattr(server, "configure_logging", lambda: None)
+    monkeypatch.setattr(server, "shutdown_logging", lambda: None)
+
+    with TestClient(server.app) as client:
+        body = client.get("/health").json()
+        assert body["status"] == "ok"
+        assert not body["llm_enabled"]
+        assert client.post("/answer", json={"question": "hola"}).json()["source"] == "small_talk"
+
+    assert not server.app.state.ready